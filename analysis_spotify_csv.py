@@ -1,21 +1,41 @@
 import csv
-from dende_statistics import Statistics
+import glob
+import hashlib
+import io
+import json
+import os
+import pickle
+import re
+import sys
+import threading
+from array import array
+from dende_statistics import ColumnView, MultiValueColumn, Statistics
+
+def _silencioso(*args, **kwargs):
+    """Substitui o print quando a saída no console está desligada (execuções em lote)"""
 
 # FUNÇÃO PARA LER O CSV E CRIAR O DICIONÁRIO
 
-def ler_csv_para_dicionario(nome_arquivo):
+# Colunas com vários valores separados por vírgula (ex.: "country hip hop, southern hip hop")
+COLUNAS_MULTIVALORADAS = ['artist_genres']
+
 
-    print(f"Lendo arquivo: {nome_arquivo}")
+def ler_csv_para_dicionario(nome_arquivo, verbose=True, colunas_multivaloradas=None):
+
+    if verbose:
+        print(f"Lendo arquivo: {nome_arquivo}")
     
     with open(nome_arquivo, mode='r', encoding='utf-8') as arquivo:
         leitor = csv.DictReader(arquivo, delimiter=',')
         
         colunas = leitor.fieldnames
         if not colunas:
-            print("Arquivo vazio ou sem cabeçalho!")
+            if verbose:
+                print("Arquivo vazio ou sem cabeçalho!")
             return None, None, None
             
-        print(f"Colunas encontradas: {colunas}")
+        if verbose:
+            print(f"Colunas encontradas: {colunas}")
         
         dados_dict = {coluna: [] for coluna in colunas}
         linhas_originais = []
@@ -37,200 +57,351 @@ def ler_csv_para_dicionario(nome_arquivo):
                     valor_limpo = valor.strip().strip('"').strip("'") if valor else ''
                     dados_dict[coluna].append(valor_limpo)
         
-        print(f"Total de linhas lidas: {len(linhas_originais)}")
+        converter_multivaloradas(dados_dict, colunas_multivaloradas)
+
+        if verbose:
+            print(f"Total de linhas lidas: {len(linhas_originais)}")
         return dados_dict, linhas_originais, colunas
 
+
+def converter_multivaloradas(dados_dict, colunas_multivaloradas):
+    """Separa as colunas multivaloradas uma única vez (MultiValueColumn)"""
+    for coluna in colunas_multivaloradas or []:
+        if coluna in dados_dict:
+            dados_dict[coluna] = MultiValueColumn.from_strings(dados_dict[coluna])
+
+# FUNÇÕES PARA CARREGAR VÁRIAS PARTIÇÕES (ARQUIVOS CSV) DE UMA VEZ
+
+def listar_particoes(caminho):
+    """Lista os arquivos CSV de um diretório, de um padrão glob ou um arquivo único"""
+    if os.path.isdir(caminho):
+        return sorted(glob.glob(os.path.join(caminho, '*.csv')))
+    if glob.has_magic(caminho):
+        return sorted(glob.glob(caminho))
+    return [caminho]
+
+
+def _ler_particao(nome_arquivo):
+    """Lê uma partição em um processo filho (sem imprimir e sem as linhas originais)"""
+    dados_dict, linhas, colunas = ler_csv_para_dicionario(nome_arquivo, verbose=False)
+    if dados_dict is None:
+        return nome_arquivo, {}, [], 0
+    return nome_arquivo, dados_dict, colunas, len(linhas)
+
+
+def unificar_esquema(particoes):
+    """
+    Completa cada partição com as colunas que faltam (preenchidas com None).
+
+    As colunas seguem a ordem em que aparecem pela primeira vez nas partições.
+    """
+    colunas = []
+    for _, _, colunas_particao, _ in particoes:
+        for coluna in colunas_particao:
+            if coluna not in colunas:
+                colunas.append(coluna)
+
+    for _, dados_dict, _, total in particoes:
+        for coluna in colunas:
+            if coluna not in dados_dict:
+                dados_dict[coluna] = [None] * total
+
+    return colunas
+
+
+def carregar_particoes(caminho, processos=None, por_particao=False, verbose=True,
+                       colunas_multivaloradas=None):
+    """
+    Carrega várias partições CSV em paralelo, com o esquema unificado.
+
+    As partições são lidas em um pool de processos (um por núcleo, por padrão).
+    Com `por_particao=False` as colunas são concatenadas em um único dicionário,
+    reaproveitando as listas da primeira partição (sem cópia); com
+    `por_particao=True` retorna uma lista de (arquivo, dicionário).
+    As colunas multivaloradas são separadas depois da concatenação.
+    """
+    arquivos = listar_particoes(caminho)
+    if not arquivos:
+        raise FileNotFoundError(f"Nenhum arquivo CSV encontrado em '{caminho}'")
+
+    if verbose:
+        print(f"Carregando {len(arquivos)} partição(ões) de: {caminho}")
+
+    if len(arquivos) == 1:
+        particoes = [_ler_particao(arquivos[0])]
+    else:
+        from concurrent.futures import ProcessPoolExecutor  # importado só com várias partições
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            particoes = list(executor.map(_ler_particao, arquivos))
+
+    colunas = unificar_esquema(particoes)
+
+    if por_particao:
+        for _, dados_particao, _, _ in particoes:
+            converter_multivaloradas(dados_particao, colunas_multivaloradas)
+        return [(arquivo, dados_dict) for arquivo, dados_dict, _, _ in particoes], colunas
+
+    # A primeira partição vira o acumulador; as demais são anexadas a ela
+    dados_dict = particoes[0][1]
+    for _, dados_particao, _, _ in particoes[1:]:
+        for coluna in colunas:
+            dados_dict[coluna].extend(dados_particao[coluna])
+
+    converter_multivaloradas(dados_dict, colunas_multivaloradas)
+
+    if verbose:
+        total = sum(total for _, _, _, total in particoes)
+        print(f"Total de linhas lidas: {total} ({len(colunas)} colunas)")
+    return dados_dict, colunas
+
 # FUNÇÃO PARA LIMPAR DADOS NÃO NUMÉRICOS
 
 def limpar_coluna_numerica(dados_dict, coluna):
-    valores_limpos = []
-    valores_removidos = 0
+    """
+    Seleciona os valores numéricos de uma coluna sem copiá-los.
+
+    Retorna uma ColumnView sobre a coluna original (apenas os índices das
+    linhas válidas são guardados) e a quantidade de valores ignorados.
+    """
+    valores = dados_dict[coluna]
+    indices_validos = array('q')
     
-    for valor in dados_dict[coluna]:
+    for i, valor in enumerate(valores):
         if isinstance(valor, (int, float)) and valor is not None:
-            valores_limpos.append(valor)
-        else:
-            valores_removidos += 1
+            indices_validos.append(i)
     
-    return valores_limpos, valores_removidos
+    valores_removidos = len(valores) - len(indices_validos)
+    if valores_removidos == 0:
+        return ColumnView(valores, range(len(valores))), 0
+    return ColumnView(valores, indices_validos), valores_removidos
 
 
-def criar_dataset_numerico(dados_dict, colunas_interesse):
+def criar_dataset_numerico(dados_dict, colunas_interesse, verbose=True):
     """Cria um novo dicionário apenas com colunas numéricas válidas"""
+    saida = print if verbose else _silencioso
     dataset_numerico = {}
     
-    print("\n Processando colunas numéricas:")
+    saida("\n Processando colunas numéricas:")
     for coluna in colunas_interesse:
         if coluna in dados_dict:
             valores_limpos, removidos = limpar_coluna_numerica(dados_dict, coluna)
             
             if len(valores_limpos) > 10:
                 dataset_numerico[coluna] = valores_limpos
-                print(f"{coluna}: {len(valores_limpos)} válidos ({removidos} ignorados)")
+                saida(f"{coluna}: {len(valores_limpos)} válidos ({removidos} ignorados)")
             else:
-                print(f"{coluna}: poucos valores ({len(valores_limpos)}), ignorando")
+                saida(f"{coluna}: poucos valores ({len(valores_limpos)}), ignorando")
         else:
-            print(f"{coluna}: não encontrada")
+            saida(f"{coluna}: não encontrada")
     
     return dataset_numerico
 
 # FUNÇÃO DE ANÁLISE COM SUA CLASSE STATISTICS
 
-def analisar_com_statistics(dataset_numerico):
+def analisar_coluna(stats, coluna, verbose=True):
+    """Calcula as métricas de uma única coluna (uma etapa do pipeline)"""
+    saida = print if verbose else _silencioso
+    saida(f"\n COLUNA: {coluna}")
+    saida("-" * 60)
+    
+    metricas = {}
+    
+    # 1. MÉDIA (mean)
+    try:
+        media = stats.mean(coluna)
+        if media is not None:
+            metricas['média'] = round(media, 4)
+            saida(f"  Média (mean)............: {media:.4f}")
+    except Exception as e:
+        saida(f"Erro na média: {e}")
+    
+    # 2. MEDIANA (median)
+    try:
+        mediana = stats.median(coluna)
+        if mediana is not None:
+            metricas['mediana'] = round(mediana, 4)
+            saida(f"  Mediana (median)........: {mediana:.4f}")
+    except Exception as e:
+        saida(f"Erro na mediana: {e}")
+    
+    # 3. MODA (mode)
+    try:
+        moda = stats.mode(coluna)
+        if moda:
+            if len(moda) > 3:
+                moda_str = f"{moda[:3]}... (total: {len(moda)})"
+            else:
+                moda_str = str(moda)
+            metricas['moda'] = moda
+            saida(f"  Moda (mode).............: {moda_str}")
+    except Exception as e:
+        saida(f"Erro na moda: {e}")
+    
+    # 4. VARIÂNCIA (variance)
+    try:
+        variancia = stats.variance(coluna)
+        if variancia is not None:
+            metricas['variância'] = round(variancia, 4)
+            saida(f"  Variância (variance)....: {variancia:.4f}")
+    except Exception as e:
+        saida(f"Erro na variância: {e}")
+    
+    # 5. DESVIO PADRÃO (stdev)
+    try:
+        desvio = stats.stdev(coluna)
+        if desvio is not None:
+            metricas['desvio padrão'] = round(desvio, 4)
+            saida(f"  Desvio Padrão (stdev)...: {desvio:.4f}")
+    except Exception as e:
+        saida(f"Erro no desvio padrão: {e}")
+    
+    # 6. VALORES ÚNICOS (a tabela de frequência absoluta, usada também no passo 7,
+    #    já tem a contagem exata; sem ela, só a estimativa HyperLogLog)
+    try:
+        freq_abs = stats.absolute_frequency(coluna)
+    except Exception as e:
+        freq_abs = None
+        saida(f"Erro na frequência absoluta: {e}")
+    try:
+        if freq_abs is not None:
+            qtd_unicos = len(freq_abs)
+            rotulo = "Valores únicos (exato)..."
+        else:
+            qtd_unicos = stats.cardinality(coluna, method='hll')
+            rotulo = "Valores únicos (≈ HLL)..."
+        if qtd_unicos:
+            metricas['valores únicos'] = qtd_unicos
+            saida(f"  {rotulo}: {qtd_unicos}")
+    except Exception as e:
+        saida(f"Erro na contagem de valores únicos: {e}")
+    
+    # 7. FREQUÊNCIA ABSOLUTA
+    try:
+        if freq_abs:
+            # Pega as 5 ocorrências mais comuns
+            top5 = sorted(freq_abs.items(), key=lambda x: x[1], reverse=True)[:5]
+            metricas['frequência absoluta (top5)'] = dict(top5)
+            saida(f"  Frequência Absoluta (top5):")
+            for valor, contagem in top5:
+                saida(f"    {valor}: {contagem} ocorrências")
+    except Exception as e:
+        saida(f"Erro na frequência absoluta: {e}")
+    
+    # 8. FREQUÊNCIA RELATIVA 
+    try:
+        freq_rel = stats.relative_frequency(coluna)
+        if freq_rel:
+            top5_rel = sorted(freq_rel.items(), key=lambda x: x[1], reverse=True)[:5]
+            metricas['frequência relativa (top5)'] = {
+                str(k): round(v*100, 2) for k, v in top5_rel
+            }
+            saida(f"  Frequência Relativa (top5 %):")
+            for valor, proporcao in top5_rel:
+                saida(f"    {valor}: {proporcao*100:.2f}%")
+    except Exception as e:
+        saida(f"Erro na frequência relativa: {e}")
+    
+    # 9. FREQUÊNCIA ACUMULADA 
+    try:
+        # Absoluta acumulada
+        freq_acum_abs = stats.cumulative_frequency(coluna, 'absolute')
+        if freq_acum_abs:
+            items = list(freq_acum_abs.items())
+            metricas['freq acumulada final'] = items[-1][1] if items else 0
+            saida(f"  Frequência Acumulada (final): {items[-1][1] if items else 0}")
+            
+            freq_acum_rel = stats.cumulative_frequency(coluna, 'relative')
+            if freq_acum_rel:
+                items_rel = list(freq_acum_rel.items())
+                metricas['freq acumulada rel final'] = round(items_rel[-1][1] * 100, 2) if items_rel else 0
+                saida(f"  Frequência Acumulada Relativa: {items_rel[-1][1]*100:.2f}%")
+    except Exception as e:
+        saida(f"Erro na frequência acumulada: {e}")
+    
+    # 10. MÍNIMO E MÁXIMO
+    valores = stats.dataset[coluna]
+    minimo = min(valores)
+    maximo = max(valores)
+    metricas['mínimo'] = round(minimo, 4)
+    metricas['máximo'] = round(maximo, 4)
+    saida(f"  Mínimo.................: {minimo:.4f}")
+    saida(f"  Máximo..................: {maximo:.4f}")
+    
+    # 11. ESTATÍSTICAS ROBUSTAS (reaproveitam a ordenação já feita para mediana e quartis)
+    try:
+        mad = stats.mad(coluna)
+        media_aparada = stats.trimmed_mean(coluna, 0.1)
+        outliers = stats.iqr_outliers(coluna)
+        metricas['MAD'] = round(mad, 4)
+        metricas['média aparada (10%)'] = round(media_aparada, 4)
+        metricas['outliers (IQR)'] = len(outliers)
+        saida(f"  MAD.....................: {mad:.4f}")
+        saida(f"  Média aparada (10%).....: {media_aparada:.4f}")
+        saida(f"  Outliers (IQR)..........: {len(outliers)}")
+    except Exception as e:
+        saida(f"Erro nas estatísticas robustas: {e}")
+    
+    # 12. CONTAGEM
+    metricas['total amostras'] = len(valores)
+    saida(f"  Total amostras..........: {len(valores)}")
+    
+    # 13. AMPLITUDE
+    amplitude = maximo - minimo
+    metricas['amplitude'] = round(amplitude, 4)
+    saida(f"  Amplitude...............: {amplitude:.4f}")
+    
+    return metricas
+
+
+def analisar_com_statistics(dataset_numerico, verbose=True, checkpoint=None):
     """
     Aplica todos os métodos da sua classe Statistics no dataset
     Agora incluindo absolute_frequency, relative_frequency e cumulative_frequency
+    Com um checkpoint, as colunas já analisadas são retomadas sem recálculo
     """
-    print("\n" + "="*80)
-    print("ANÁLISE EXPLORATÓRIA COM CLASSE STATISTICS")
-    print("="*80)
+    saida = print if verbose else _silencioso
+    saida("\n" + "="*80)
+    saida("ANÁLISE EXPLORATÓRIA COM CLASSE STATISTICS")
+    saida("="*80)
     
     stats = Statistics(dataset_numerico)
     resultados = {}
     
     for coluna in dataset_numerico.keys():
-        print(f"\n COLUNA: {coluna}")
-        print("-" * 60)
-        
-        resultados[coluna] = {}
-        
-        # 1. MÉDIA (mean)
-        try:
-            media = stats.mean(coluna)
-            if media is not None:
-                resultados[coluna]['média'] = round(media, 4)
-                print(f"  Média (mean)............: {media:.4f}")
-        except Exception as e:
-            print(f"Erro na média: {e}")
-        
-        # 2. MEDIANA (median)
-        try:
-            mediana = stats.median(coluna)
-            if mediana is not None:
-                resultados[coluna]['mediana'] = round(mediana, 4)
-                print(f"  Mediana (median)........: {mediana:.4f}")
-        except Exception as e:
-            print(f"Erro na mediana: {e}")
+        if checkpoint is not None and checkpoint.concluida(f'metricas:{coluna}'):
+            resultados[coluna] = checkpoint.carregar(f'metricas:{coluna}')
+            saida(f"\n COLUNA: {coluna} (retomada do checkpoint)")
+            continue
         
-        # 3. MODA (mode)
-        try:
-            moda = stats.mode(coluna)
-            if moda:
-                if len(moda) > 3:
-                    moda_str = f"{moda[:3]}... (total: {len(moda)})"
-                else:
-                    moda_str = str(moda)
-                resultados[coluna]['moda'] = moda
-                print(f"  Moda (mode).............: {moda_str}")
-        except Exception as e:
-            print(f"Erro na moda: {e}")
-        
-        # 4. VARIÂNCIA (variance)
-        try:
-            variancia = stats.variance(coluna)
-            if variancia is not None:
-                resultados[coluna]['variância'] = round(variancia, 4)
-                print(f"  Variância (variance)....: {variancia:.4f}")
-        except Exception as e:
-            print(f"Erro na variância: {e}")
-        
-        # 5. DESVIO PADRÃO (stdev)
-        try:
-            desvio = stats.stdev(coluna)
-            if desvio is not None:
-                resultados[coluna]['desvio padrão'] = round(desvio, 4)
-                print(f"  Desvio Padrão (stdev)...: {desvio:.4f}")
-        except Exception as e:
-            print(f"Erro no desvio padrão: {e}")
-        
-        # 6. VALORES ÚNICOS (itemset)
-        try:
-            unicos = stats.itemset(coluna)
-            if unicos:
-                qtd_unicos = len(unicos)
-                resultados[coluna]['valores únicos'] = qtd_unicos
-                print(f"  Valores únicos (itemset).: {qtd_unicos}")
-        except Exception as e:
-            print(f"Erro no itemset: {e}")
-        
-        # 7. FREQUÊNCIA ABSOLUTA
-        try:
-            freq_abs = stats.absolute_frequency(coluna)
-            if freq_abs:
-                # Pega as 5 ocorrências mais comuns
-                top5 = sorted(freq_abs.items(), key=lambda x: x[1], reverse=True)[:5]
-                resultados[coluna]['frequência absoluta (top5)'] = dict(top5)
-                print(f"  Frequência Absoluta (top5):")
-                for valor, contagem in top5:
-                    print(f"    {valor}: {contagem} ocorrências")
-        except Exception as e:
-            print(f"Erro na frequência absoluta: {e}")
-        
-        # 8. FREQUÊNCIA RELATIVA 
-        try:
-            freq_rel = stats.relative_frequency(coluna)
-            if freq_rel:
-                top5_rel = sorted(freq_rel.items(), key=lambda x: x[1], reverse=True)[:5]
-                resultados[coluna]['frequência relativa (top5)'] = {
-                    str(k): round(v*100, 2) for k, v in top5_rel
-                }
-                print(f"  Frequência Relativa (top5 %):")
-                for valor, proporcao in top5_rel:
-                    print(f"    {valor}: {proporcao*100:.2f}%")
-        except Exception as e:
-            print(f"Erro na frequência relativa: {e}")
-        
-        # 9. FREQUÊNCIA ACUMULADA 
-        try:
-            # Absoluta acumulada
-            freq_acum_abs = stats.cumulative_frequency(coluna, 'absolute')
-            if freq_acum_abs:
-                items = list(freq_acum_abs.items())
-                resultados[coluna]['freq acumulada final'] = items[-1][1] if items else 0
-                print(f"  Frequência Acumulada (final): {items[-1][1] if items else 0}")
-                
-                freq_acum_rel = stats.cumulative_frequency(coluna, 'relative')
-                if freq_acum_rel:
-                    items_rel = list(freq_acum_rel.items())
-                    resultados[coluna]['freq acumulada rel final'] = round(items_rel[-1][1] * 100, 2) if items_rel else 0
-                    print(f"  Frequência Acumulada Relativa: {items_rel[-1][1]*100:.2f}%")
-        except Exception as e:
-            print(f"Erro na frequência acumulada: {e}")
-        
-        # 10. MÍNIMO E MÁXIMO
-        valores = dataset_numerico[coluna]
-        minimo = min(valores)
-        maximo = max(valores)
-        resultados[coluna]['mínimo'] = round(minimo, 4)
-        resultados[coluna]['máximo'] = round(maximo, 4)
-        print(f"  Mínimo.................: {minimo:.4f}")
-        print(f"  Máximo..................: {maximo:.4f}")
-        
-        # 11. CONTAGEM
-        resultados[coluna]['total amostras'] = len(valores)
-        print(f"  Total amostras..........: {len(valores)}")
-        
-        # 12. AMPLITUDE
-        amplitude = maximo - minimo
-        resultados[coluna]['amplitude'] = round(amplitude, 4)
-        print(f"  Amplitude...............: {amplitude:.4f}")
+        resultados[coluna] = analisar_coluna(stats, coluna, verbose)
+        if checkpoint is not None:
+            checkpoint.salvar(f'metricas:{coluna}', resultados[coluna])
     
     return resultados, stats
 
 # FUNÇÃO PARA ANALISAR COVARIÂNCIAS
 
-def analisar_covariancias(stats, colunas):
-    """Calcula a covariância entre pares de colunas"""
-    print("\n" + "="*80)
-    print("ANÁLISE DE COVARIÂNCIA ENTRE COLUNAS")
-    print("="*80)
+def analisar_covariancias(stats, colunas, verbose=True):
+    """Calcula a covariância e as correlações (Pearson e Spearman) entre pares de colunas"""
+    saida = print if verbose else _silencioso
+    saida("\n" + "="*80)
+    saida("ANÁLISE DE COVARIÂNCIA ENTRE COLUNAS")
+    saida("="*80)
     
     if len(colunas) < 2:
-        print("Menos de 2 colunas disponíveis")
+        saida("Menos de 2 colunas disponíveis")
         return []
     
     covariancias = []
     
+    # Matrizes calculadas uma única vez (co-momentos e postos compartilhados por todos os pares)
+    try:
+        pearson = stats.correlation_matrix(colunas, 'pearson')
+        spearman = stats.correlation_matrix(colunas, 'spearman')
+    except Exception as e:
+        saida(f"\n Erro nas correlações: {e}")
+        pearson = spearman = None
+    
     for i in range(len(colunas)):
         for j in range(i+1, len(colunas)):
             col_a = colunas[i]
@@ -240,129 +411,466 @@ def analisar_covariancias(stats, colunas):
                 cov = stats.covariance(col_a, col_b)
                 
                 if cov is not None:
-                    print(f"\n  {col_a}  x  {col_b}")
-                    print(f"  Covariância: {cov:.4f}")
+                    saida(f"\n  {col_a}  x  {col_b}")
+                    saida(f"  Covariância: {cov:.4f}")
+                    if pearson is not None:
+                        saida(f"  Correlação de Pearson: {pearson[col_a][col_b]:.4f}")
+                        saida(f"  Correlação de Spearman: {spearman[col_a][col_b]:.4f}")
                     
                     if cov > 0:
-                        print(f"    → Relação POSITIVA")
+                        saida(f"    → Relação POSITIVA")
                     elif cov < 0:
-                        print(f"    → Relação NEGATIVA")
+                        saida(f"    → Relação NEGATIVA")
                     else:
-                        print(f"    → Sem relação linear")
+                        saida(f"    → Sem relação linear")
                     
-                    covariancias.append({
+                    item = {
                         'coluna_a': col_a,
                         'coluna_b': col_b,
                         'covariancia': round(cov, 4)
-                    })
+                    }
+                    if pearson is not None:
+                        item['pearson'] = round(pearson[col_a][col_b], 4)
+                        item['spearman'] = round(spearman[col_a][col_b], 4)
+                    covariancias.append(item)
             except Exception as e:
-                print(f"\n Erro: {e}")
+                saida(f"\n Erro: {e}")
     
     return covariancias
 
-# FUNÇÃO PARA GERAR RELATÓRIO EM TXT
+# FUNÇÃO PARA ANALISAR OS GÊNEROS (COLUNA MULTIVALORADA)
 
-def gerar_relatorio_txt(resultados, covariancias, nome_arquivo="resultados_analise_spotify.txt"):
-    """Gera um arquivo de relatório detalhado"""
+def analisar_generos(dados_dict, coluna='artist_genres', coluna_valor='track_popularity', verbose=True):
+    """Frequência, moda, coocorrência, popularidade média e participação ponderada por gênero"""
+    saida = print if verbose else _silencioso
+    saida("\n" + "="*80)
+    saida("ANÁLISE DE GÊNEROS")
+    saida("="*80)
     
-    with open(nome_arquivo, 'w', encoding='utf-8') as f:
-        f.write("="*90 + "\n")
-        f.write("RELATÓRIO DE ANÁLISE EXPLORATÓRIA - SPOTIFY DATASET\n")
-        f.write("="*90 + "\n\n")
-        
-        f.write("ANÁLISE REALIZADA COM CLASSE STATISTICS (dende_statistics.py)\n")
-        f.write("-"*90 + "\n")
-        f.write("Métodos utilizados:\n")
-        f.write("  • mean()     → Média aritmética\n")
-        f.write("  • median()   → Mediana\n")
-        f.write("  • mode()     → Moda\n")
-        f.write("  • variance() → Variância populacional\n")
-        f.write("  • stdev()    → Desvio padrão populacional\n")
-        f.write("  • itemset()  → Valores únicos\n")
-        f.write("  • covariance() → Covariância entre colunas\n")
-        f.write("  • absolute_frequency() → Frequência absoluta (NOVO!)\n")
-        f.write("  • relative_frequency() → Frequência relativa (NOVO!)\n")
-        f.write("  • cumulative_frequency() → Frequência acumulada (NOVO!)\n")
-        f.write("-"*90 + "\n\n")
-        
-        f.write("\n" + "="*90 + "\n")
-        f.write("ESTATÍSTICAS DESCRITIVAS POR COLUNA\n")
-        f.write("="*90 + "\n")
+    if coluna not in dados_dict:
+        saida(f"Coluna '{coluna}' não encontrada")
+        return {}
+    
+    stats = Statistics(dados_dict)
+    frequencia = stats.absolute_frequency(coluna)
+    top10 = sorted(frequencia.items(), key=lambda x: x[1], reverse=True)[:10]
+    pares = sorted(stats.cooccurrence(coluna).items(), key=lambda x: x[1], reverse=True)[:5]
+    
+    saida(f"  Gêneros distintos.......: {len(frequencia)}")
+    saida(f"  Moda....................: {stats.mode(coluna)}")
+    saida(f"  Frequência (top10):")
+    for genero, contagem in top10:
+        saida(f"    {genero}: {contagem} faixas")
+    saida(f"  Coocorrência (top5):")
+    for (genero_a, genero_b), contagem in pares:
+        saida(f"    {genero_a} + {genero_b}: {contagem} faixas")
+    
+    resultado = {
+        'gêneros distintos': len(frequencia),
+        'frequência (top10)': dict(top10),
+        'coocorrência (top5)': {f"{a} + {b}": c for (a, b), c in pares},
+    }
+    
+    if coluna_valor in dados_dict:
+        validos = [isinstance(v, float) for v in dados_dict[coluna_valor]]
+        com_valor = stats.view(validos)
+        media_por_genero = com_valor.group_by(coluna, coluna_valor, 'mean')
+        saida(f"  Média de {coluna_valor} (top10 gêneros):")
+        for genero, _ in top10:
+            saida(f"    {genero}: {media_por_genero[genero]:.2f}")
+        resultado[f'média de {coluna_valor} (top10)'] = {
+            genero: round(media_por_genero[genero], 2) for genero, _ in top10
+        }
         
-        for coluna, metricas in resultados.items():
-            f.write(f"\n{'─'*60}\n")
-            f.write(f"COLUNA: {coluna}\n")
-            f.write(f"{'─'*60}\n")
-            
-            ordem = [
-                'média', 'mediana', 'moda', 'desvio padrão', 'variância',
-                'mínimo', 'máximo', 'amplitude', 'valores únicos', 
-                'frequência absoluta (top5)', 'frequência relativa (top5)',
-                'freq acumulada final', 'freq acumulada rel final',
-                'total amostras'
-            ]
-            
-            for metrica in ordem:
-                if metrica in metricas:
-                    valor = metricas[metrica]
-                    
-                    if metrica == 'moda' and isinstance(valor, list):
-                        if len(valor) > 5:
-                            f.write(f"  {metrica.upper():<25}: {valor[:5]} ... (total: {len(valor)} modas)\n")
-                        else:
-                            f.write(f"  {metrica.upper():<25}: {valor}\n")
-                    elif metrica in ['frequência absoluta (top5)', 'frequência relativa (top5)']:
-                        f.write(f"  {metrica.upper():<25}:\n")
-                        for k, v in valor.items():
-                            if '%' in str(v) or isinstance(v, float):
-                                f.write(f"    {k}: {v}%\n")
-                            else:
-                                f.write(f"    {k}: {v}\n")
-                    else:
-                        f.write(f"  {metrica.upper():<25}: {valor}\n")
+        # Participação de cada gênero com as faixas ponderadas pela popularidade
+        participacao = com_valor.relative_frequency(coluna, weights=coluna_valor)
+        top10_ponderado = sorted(participacao.items(), key=lambda x: x[1], reverse=True)[:10]
+        saida(f"  Participação ponderada por {coluna_valor} (top10):")
+        for genero, proporcao in top10_ponderado:
+            saida(f"    {genero}: {proporcao:.2%}")
+        resultado[f'participação ponderada por {coluna_valor} (top10)'] = {
+            genero: round(proporcao, 4) for genero, proporcao in top10_ponderado
+        }
+    
+    return resultado
+
+# FUNÇÕES PARA GERAR O RELATÓRIO (TXT, JSON, CSV E HTML)
+
+ORDEM_METRICAS = [
+    'média', 'mediana', 'moda', 'desvio padrão', 'variância',
+    'mínimo', 'máximo', 'amplitude', 'valores únicos', 
+    'frequência absoluta (top5)', 'frequência relativa (top5)',
+    'freq acumulada final', 'freq acumulada rel final',
+    'MAD', 'média aparada (10%)', 'outliers (IQR)',
+    'total amostras'
+]
+
+EXTENSOES_RELATORIO = {'txt': 'txt', 'json': 'json', 'csv': 'csv', 'html': 'html'}
+
+
+def _relacao(covariancia):
+    if covariancia > 0:
+        return "Relação POSITIVA"
+    if covariancia < 0:
+        return "Relação NEGATIVA"
+    return "Sem relação linear"
+
+
+def _renderizar_txt(resultados, covariancias, generos, gerado_em):
+    partes = []
+    escrever = partes.append
+    
+    escrever("="*90 + "\n")
+    escrever("RELATÓRIO DE ANÁLISE EXPLORATÓRIA - SPOTIFY DATASET\n")
+    escrever("="*90 + "\n\n")
+    
+    escrever("ANÁLISE REALIZADA COM CLASSE STATISTICS (dende_statistics.py)\n")
+    escrever("-"*90 + "\n")
+    escrever("Métodos utilizados:\n")
+    escrever("  • mean()     → Média aritmética\n")
+    escrever("  • median()   → Mediana\n")
+    escrever("  • mode()     → Moda\n")
+    escrever("  • variance() → Variância populacional\n")
+    escrever("  • stdev()    → Desvio padrão populacional\n")
+    escrever("  • absolute_frequency() → Valores únicos (tamanho da tabela, exato)\n")
+    escrever("  • covariance() → Covariância entre colunas\n")
+    escrever("  • correlation_matrix() → Correlações de Pearson e Spearman\n")
+    escrever("  • absolute_frequency() → Frequência absoluta (NOVO!)\n")
+    escrever("  • relative_frequency() → Frequência relativa (NOVO!)\n")
+    escrever("  • cumulative_frequency() → Frequência acumulada (NOVO!)\n")
+    escrever("  • mad(), trimmed_mean(), iqr_outliers() → Estatísticas robustas\n")
+    escrever("-"*90 + "\n\n")
+    
+    escrever("\n" + "="*90 + "\n")
+    escrever("ESTATÍSTICAS DESCRITIVAS POR COLUNA\n")
+    escrever("="*90 + "\n")
+    
+    for coluna, metricas in resultados.items():
+        escrever(f"\n{'─'*60}\n")
+        escrever(f"COLUNA: {coluna}\n")
+        escrever(f"{'─'*60}\n")
         
-        if covariancias:
-            f.write("\n" + "="*90 + "\n")
-            f.write("ANÁLISE DE COVARIÂNCIA\n")
-            f.write("="*90 + "\n")
-            
-            for cov in covariancias:
-                f.write(f"\n{'-'*60}\n")
-                f.write(f"{cov['coluna_a']}  x  {cov['coluna_b']}\n")
-                f.write(f"Covariância: {cov['covariancia']}\n")
+        for metrica in ORDEM_METRICAS:
+            if metrica in metricas:
+                valor = metricas[metrica]
                 
-                if cov['covariancia'] > 0:
-                    f.write(f"→ Relação POSITIVA\n")
-                elif cov['covariancia'] < 0:
-                    f.write(f"→ Relação NEGATIVA\n")
+                if metrica == 'moda' and isinstance(valor, list):
+                    if len(valor) > 5:
+                        escrever(f"  {metrica.upper():<25}: {valor[:5]} ... (total: {len(valor)} modas)\n")
+                    else:
+                        escrever(f"  {metrica.upper():<25}: {valor}\n")
+                elif metrica in ['frequência absoluta (top5)', 'frequência relativa (top5)']:
+                    escrever(f"  {metrica.upper():<25}:\n")
+                    for k, v in valor.items():
+                        if '%' in str(v) or isinstance(v, float):
+                            escrever(f"    {k}: {v}%\n")
+                        else:
+                            escrever(f"    {k}: {v}\n")
                 else:
-                    f.write(f"→ Sem relação linear\n")
+                    escrever(f"  {metrica.upper():<25}: {valor}\n")
+    
+    if covariancias:
+        escrever("\n" + "="*90 + "\n")
+        escrever("ANÁLISE DE COVARIÂNCIA\n")
+        escrever("="*90 + "\n")
         
-        f.write("\n" + "="*90 + "\n")
-        f.write("FIM DO RELATÓRIO\n")
-        f.write(f"Gerado em: {__import__('datetime').datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n")
-        f.write("="*90 + "\n")
+        for cov in covariancias:
+            escrever(f"\n{'-'*60}\n")
+            escrever(f"{cov['coluna_a']}  x  {cov['coluna_b']}\n")
+            escrever(f"Covariância: {cov['covariancia']}\n")
+            if 'pearson' in cov:
+                escrever(f"Correlação de Pearson: {cov['pearson']}\n")
+                escrever(f"Correlação de Spearman: {cov['spearman']}\n")
+            escrever(f"→ {_relacao(cov['covariancia'])}\n")
     
-    print(f"\n Relatório gerado: {nome_arquivo}")
+    if generos:
+        escrever("\n" + "="*90 + "\n")
+        escrever("ANÁLISE DE GÊNEROS\n")
+        escrever("="*90 + "\n")
+        for metrica, valor in generos.items():
+            if isinstance(valor, dict):
+                escrever(f"  {metrica.upper()}:\n")
+                for k, v in valor.items():
+                    escrever(f"    {k}: {v}\n")
+            else:
+                escrever(f"  {metrica.upper():<25}: {valor}\n")
+    
+    escrever("\n" + "="*90 + "\n")
+    escrever("FIM DO RELATÓRIO\n")
+    escrever(f"Gerado em: {gerado_em}\n")
+    escrever("="*90 + "\n")
+    return "".join(partes)
 
-# FUNÇÃO PRINCIPAL
 
-def main():
-    print("ANÁLISE EXPLORATÓRIA - SPOTIFY SONGS DATASET")
-    print("="*80)
+def _renderizar_json(resultados, covariancias, generos, gerado_em):
+    return json.dumps({
+        'gerado_em': gerado_em,
+        'colunas': resultados,
+        'covariancias': covariancias,
+        'generos': generos or {},
+    }, ensure_ascii=False, indent=2, default=str)
+
+
+def _renderizar_csv(resultados, covariancias, generos, gerado_em):
+    """Formato longo: uma linha por (seção, coluna, métrica, valor)"""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(['secao', 'coluna', 'metrica', 'valor'])
     
-    arquivo_csv = "spotify_data clean.csv"
+    for coluna, metricas in resultados.items():
+        for metrica in ORDEM_METRICAS:
+            if metrica not in metricas:
+                continue
+            valor = metricas[metrica]
+            if isinstance(valor, dict):
+                escritor.writerows(('coluna', coluna, f"{metrica}[{k}]", v) for k, v in valor.items())
+            elif isinstance(valor, list):
+                escritor.writerow(('coluna', coluna, metrica, ' | '.join(map(str, valor))))
+            else:
+                escritor.writerow(('coluna', coluna, metrica, valor))
     
-    try:
-        dados_dict, linhas, colunas = ler_csv_para_dicionario(arquivo_csv)
-        if dados_dict is None:
-            return
-    except FileNotFoundError:
-        print(f"Arquivo '{arquivo_csv}' não encontrado!")
-        return
-    except Exception as e:
-        print(f"Erro: {e}")
-        return
+    for cov in covariancias:
+        par = f"{cov['coluna_a']} x {cov['coluna_b']}"
+        escritor.writerows(('covariancia', par, chave, valor)
+                           for chave, valor in cov.items() if chave not in ('coluna_a', 'coluna_b'))
+    
+    for metrica, valor in (generos or {}).items():
+        if isinstance(valor, dict):
+            escritor.writerows(('generos', '', f"{metrica}[{k}]", v) for k, v in valor.items())
+        else:
+            escritor.writerow(('generos', '', metrica, valor))
+    
+    escritor.writerow(('relatorio', '', 'gerado em', gerado_em))
+    return buffer.getvalue()
+
+
+def _renderizar_html(resultados, covariancias, generos, gerado_em):
+    import html  # importado só quando o relatório HTML é pedido
+    e = html.escape
+    partes = ['<!DOCTYPE html>\n<html lang="pt-BR">\n<head><meta charset="utf-8">'
+              '<title>Relatório de Análise Exploratória - Spotify Dataset</title></head>\n<body>\n'
+              '<h1>Relatório de Análise Exploratória - Spotify Dataset</h1>\n'
+              '<h2>Estatísticas descritivas por coluna</h2>\n']
+    
+    for coluna, metricas in resultados.items():
+        partes.append(f'<h3>{e(coluna)}</h3>\n<table border="1">\n')
+        for metrica in ORDEM_METRICAS:
+            if metrica not in metricas:
+                continue
+            valor = metricas[metrica]
+            if isinstance(valor, dict):
+                valor = '<br>'.join(f"{e(str(k))}: {e(str(v))}" for k, v in valor.items())
+            else:
+                valor = e(str(valor))
+            partes.append(f'<tr><th>{e(metrica)}</th><td>{valor}</td></tr>\n')
+        partes.append('</table>\n')
+    
+    if covariancias:
+        chaves = [c for c in covariancias[0] if c not in ('coluna_a', 'coluna_b')]
+        partes.append('<h2>Análise de covariância</h2>\n<table border="1">\n<tr><th>coluna a</th><th>coluna b</th>')
+        partes.extend(f'<th>{e(c)}</th>' for c in chaves)
+        partes.append('<th>relação</th></tr>\n')
+        for cov in covariancias:
+            partes.append(f"<tr><td>{e(cov['coluna_a'])}</td><td>{e(cov['coluna_b'])}</td>")
+            partes.extend(f"<td>{e(str(cov.get(c, '')))}</td>" for c in chaves)
+            partes.append(f"<td>{_relacao(cov['covariancia'])}</td></tr>\n")
+        partes.append('</table>\n')
+    
+    if generos:
+        partes.append('<h2>Análise de gêneros</h2>\n<table border="1">\n')
+        for metrica, valor in generos.items():
+            if isinstance(valor, dict):
+                valor = '<br>'.join(f"{e(str(k))}: {e(str(v))}" for k, v in valor.items())
+            else:
+                valor = e(str(valor))
+            partes.append(f'<tr><th>{e(metrica)}</th><td>{valor}</td></tr>\n')
+        partes.append('</table>\n')
+    
+    partes.append(f'<p>Gerado em: {e(gerado_em)}</p>\n</body>\n</html>\n')
+    return "".join(partes)
+
+
+RENDERIZADORES = {
+    'txt': _renderizar_txt,
+    'json': _renderizar_json,
+    'csv': _renderizar_csv,
+    'html': _renderizar_html,
+}
+
+
+def renderizar_relatorio(resultados, covariancias, formato='txt', generos=None):
+    """
+    Monta o relatório inteiro em memória, em uma única passada pelos resultados.
+
+    Formatos: 'txt', 'json', 'csv' (formato longo) e 'html'.
+    """
+    if formato not in RENDERIZADORES:
+        raise ValueError(f"Formato de relatório desconhecido: {formato}")
+    from datetime import datetime  # importado só quando um relatório é gerado
+    gerado_em = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+    return RENDERIZADORES[formato](resultados, covariancias, generos, gerado_em)
+
+
+def gerar_relatorio(resultados, covariancias, nome_arquivo=None, formato='txt', generos=None,
+                    em_segundo_plano=False, verbose=True):
+    """
+    Renderiza o relatório e grava o arquivo com uma única escrita.
+
+    Com `em_segundo_plano=True` a renderização e a gravação rodam em uma
+    thread, e a função retorna a thread (use `.join()` para esperar).
+    """
+    if nome_arquivo is None:
+        nome_arquivo = f"resultados_analise_spotify.{EXTENSOES_RELATORIO.get(formato, formato)}"
+    
+    def tarefa():
+        conteudo = renderizar_relatorio(resultados, covariancias, formato, generos)
+        with open(nome_arquivo, 'w', encoding='utf-8', newline='') as f:
+            f.write(conteudo)
+        if verbose:
+            print(f"\n Relatório gerado: {nome_arquivo}")
+    
+    if em_segundo_plano:
+        thread = threading.Thread(target=tarefa, name=f"relatorio-{formato}")
+        thread.start()
+        return thread
+    tarefa()
+    return None
+
+
+def gerar_relatorio_txt(resultados, covariancias, nome_arquivo="resultados_analise_spotify.txt"):
+    """Gera um arquivo de relatório detalhado"""
+    gerar_relatorio(resultados, covariancias, nome_arquivo, formato='txt')
+
+# CHECKPOINTS DO PIPELINE (RETOMADA DE EXECUÇÕES LONGAS)
+
+def assinatura_arquivos(arquivos):
+    """Assinatura dos arquivos de entrada (caminho, tamanho e data de modificação)"""
+    partes = []
+    for arquivo in sorted(arquivos):
+        info = os.stat(arquivo)
+        partes.append(f"{os.path.abspath(arquivo)}|{info.st_size}|{info.st_mtime_ns}")
+    return hashlib.sha1("\n".join(partes).encode('utf-8')).hexdigest()
+
+
+class Checkpoint:
+    """
+    Diretório local com os resultados intermediários do pipeline.
+
+    Cada etapa concluída (carregamento, colunas numéricas, métricas de cada
+    coluna, covariâncias, gêneros) é gravada em um arquivo próprio e
+    registrada no manifesto. Colunas numéricas são gravadas como arrays
+    binários de float64; as demais etapas, com pickle. Cada conjunto de
+    arquivos de entrada (pelos caminhos) tem um subdiretório próprio, de modo
+    que alternar entre entradas diferentes não apaga o cache das outras. A
+    assinatura dos arquivos fica no manifesto: se o conteúdo da entrada mudar,
+    as etapas daquele subdiretório são invalidadas.
+    """
+    MANIFESTO = 'manifesto.json'
+
+    def __init__(self, diretorio, arquivos):
+        caminhos = "\n".join(sorted(os.path.abspath(a) for a in arquivos))
+        self.diretorio = os.path.join(diretorio, hashlib.sha1(caminhos.encode('utf-8')).hexdigest()[:16])
+        os.makedirs(self.diretorio, exist_ok=True)
+        self.assinatura = assinatura_arquivos(arquivos)
+        self.manifesto = self._ler_manifesto()
+        if self.manifesto.get('assinatura') != self.assinatura:
+            self.limpar()
+
+    def _caminho(self, nome):
+        return os.path.join(self.diretorio, nome)
+
+    def _ler_manifesto(self):
+        try:
+            with open(self._caminho(self.MANIFESTO), encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _gravar(self, nome, modo, escrever):
+        """Grava em um arquivo temporário e renomeia (um arquivo nunca fica pela metade)"""
+        temporario = self._caminho(nome + '.tmp')
+        with open(temporario, modo, **({} if 'b' in modo else {'encoding': 'utf-8'})) as f:
+            escrever(f)
+        os.replace(temporario, self._caminho(nome))
+
+    def _gravar_manifesto(self):
+        self._gravar(self.MANIFESTO, 'w', lambda f: json.dump(self.manifesto, f, ensure_ascii=False, indent=2))
+
+    def limpar(self):
+        """Remove todas as etapas gravadas"""
+        for registro in self.manifesto.get('etapas', {}).values():
+            for arquivo in registro['arquivos']:
+                if os.path.exists(self._caminho(arquivo)):
+                    os.remove(self._caminho(arquivo))
+        self.manifesto = {'assinatura': self.assinatura, 'etapas': {}}
+        self._gravar_manifesto()
+
+    def concluida(self, etapa, parametros=None):
+        """Indica se a etapa já foi gravada (com os mesmos parâmetros)"""
+        registro = self.manifesto['etapas'].get(etapa)
+        return (registro is not None
+                and registro.get('parametros') == parametros
+                and all(os.path.exists(self._caminho(a)) for a in registro['arquivos']))
+
+    def salvar(self, etapa, objeto, parametros=None, formato='pickle'):
+        """
+        Grava o resultado de uma etapa.
+
+        Com formato='colunas', `objeto` é um dicionário de colunas numéricas,
+        gravadas uma a uma como arrays binários de float64.
+        """
+        base = re.sub(r'[^\w.-]', '_', etapa)
+        if formato == 'colunas':
+            arquivos, tamanhos = [], {}
+            for i, (coluna, valores) in enumerate(objeto.items()):
+                dados = array('d', valores)
+                arquivos.append(f"{base}.{i}.bin")
+                tamanhos[coluna] = len(dados)
+                self._gravar(arquivos[-1], 'wb', dados.tofile)
+            extra = {'colunas': tamanhos}
+        else:
+            arquivos, extra = [f"{base}.pkl"], {}
+            self._gravar(arquivos[0], 'wb', lambda f: pickle.dump(objeto, f, protocol=pickle.HIGHEST_PROTOCOL))
+
+        self.manifesto['etapas'][etapa] = dict(arquivos=arquivos, formato=formato, parametros=parametros, **extra)
+        self._gravar_manifesto()
+
+    def carregar(self, etapa):
+        """Lê o resultado gravado de uma etapa"""
+        registro = self.manifesto['etapas'][etapa]
+        if registro['formato'] == 'colunas':
+            colunas = {}
+            for arquivo, (coluna, tamanho) in zip(registro['arquivos'], registro['colunas'].items()):
+                dados = array('d')
+                with open(self._caminho(arquivo), 'rb') as f:
+                    dados.fromfile(f, tamanho)
+                colunas[coluna] = dados
+            return colunas
+        with open(self._caminho(registro['arquivos'][0]), 'rb') as f:
+            return pickle.load(f)
+
+
+def _etapa(checkpoint, nome, calcular, parametros=None, formato='pickle'):
+    """Executa uma etapa do pipeline, ou a retoma do checkpoint se já estiver concluída"""
+    if checkpoint is not None and checkpoint.concluida(nome, parametros):
+        return checkpoint.carregar(nome)
+    resultado = calcular()
+    if checkpoint is not None:
+        checkpoint.salvar(nome, resultado, parametros, formato)
+    return resultado
+
+# FUNÇÃO PRINCIPAL
+
+def main(arquivo_csv="spotify_data clean.csv", formatos=('txt',), verbose=True, diretorio_checkpoint=None):
+    """
+    Executa o pipeline: carregamento → limpeza → métricas por coluna →
+    covariâncias → gêneros → relatório. Com `diretorio_checkpoint`, cada
+    etapa concluída é gravada e uma nova execução retoma de onde parou
+    (refazendo tudo se o arquivo de entrada mudar).
+    """
+    saida = print if verbose else _silencioso
+    saida("ANÁLISE EXPLORATÓRIA - SPOTIFY SONGS DATASET")
+    saida("="*80)
     
     colunas_interesse = [
         'track_popularity',
@@ -373,29 +881,73 @@ def main():
         'track_number'
     ]
     
-    dataset_numerico = criar_dataset_numerico(dados_dict, colunas_interesse)
+    carregados = {}
+    
+    def obter_dados():
+        """Carrega o CSV (ou a etapa gravada) só quando alguma etapa precisar dele"""
+        if 'dados' not in carregados:
+            carregados['dados'] = _etapa(checkpoint, 'carregamento', carregar)
+        return carregados['dados']
+    
+    def carregar():
+        if len(arquivos) != 1:
+            dados_dict, colunas = carregar_particoes(
+                arquivo_csv, verbose=verbose, colunas_multivaloradas=COLUNAS_MULTIVALORADAS)
+        else:  # arquivo único, ou diretório/padrão glob com uma só partição
+            dados_dict, linhas, colunas = ler_csv_para_dicionario(
+                arquivos[0], verbose=verbose, colunas_multivaloradas=COLUNAS_MULTIVALORADAS)
+        if dados_dict is None:
+            raise ValueError(f"Arquivo '{arquivo_csv}' vazio ou sem cabeçalho")
+        return dados_dict
+    
+    try:
+        arquivos = listar_particoes(arquivo_csv)
+        checkpoint = Checkpoint(diretorio_checkpoint, arquivos) if diretorio_checkpoint else None
+        dataset_numerico = _etapa(
+            checkpoint, 'numericas',
+            lambda: criar_dataset_numerico(obter_dados(), colunas_interesse, verbose),
+            parametros=colunas_interesse, formato='colunas')
+    except FileNotFoundError:
+        print(f"Arquivo '{arquivo_csv}' não encontrado!")
+        return
+    except Exception as e:
+        print(f"Erro: {e}")
+        return
     
     if not dataset_numerico:
         print("Nenhuma coluna numérica válida encontrada!")
         return
     
-    resultados, stats = analisar_com_statistics(dataset_numerico)
+    resultados, stats = analisar_com_statistics(dataset_numerico, verbose, checkpoint)
     
     colunas_analisadas = list(dataset_numerico.keys())
     covariancias = []
     
     if len(colunas_analisadas) >= 2:
-        covariancias = analisar_covariancias(stats, colunas_analisadas)
+        covariancias = _etapa(checkpoint, 'covariancias',
+                              lambda: analisar_covariancias(stats, colunas_analisadas, verbose),
+                              parametros=colunas_analisadas)
+    
+    generos = _etapa(checkpoint, 'generos', lambda: analisar_generos(obter_dados(), verbose=verbose))
+    
+    # Cada formato é renderizado e gravado em sua própria thread
+    threads = [gerar_relatorio(resultados, covariancias, formato=formato, generos=generos,
+                               em_segundo_plano=True, verbose=verbose)
+               for formato in formatos]
     
-    gerar_relatorio_txt(resultados, covariancias)
+    saida("\n" + "="*80)
+    saida("ANÁLISE CONCLUÍDA COM SUCESSO!")
+    saida("="*80)
+    saida(f"\n Colunas analisadas: {', '.join(colunas_analisadas)}")
+    saida(f"Relatório(s): {', '.join(f'resultados_analise_spotify.{f}' for f in formatos)}")
     
-    print("\n" + "="*80)
-    print("ANÁLISE CONCLUÍDA COM SUCESSO!")
-    print("="*80)
-    print(f"\n Colunas analisadas: {', '.join(colunas_analisadas)}")
-    print(f"Relatório: 'resultados_analise_spotify.txt'")
+    for thread in threads:
+        thread.join()
 
 # EXECUTAR O PROGRAMA
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1:
+        main(sys.argv[1], diretorio_checkpoint='.checkpoints')  # arquivo, diretório ou padrão glob (ex.: "dados/*.csv")
+    else:
+        main(diretorio_checkpoint='.checkpoints')
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""
+Benchmarks da classe Statistics.
+
+Uso:
+    python benchmarks.py
+"""
+import math
+import random
+import time
+import tracemalloc
+from fractions import Fraction
+
+import dende_kernels
+from dende_statistics import Statistics
+
+
+def gerar_coluna_seguidores(n, semente=42):
+    """Gera uma coluna sintética na escala de `artist_followers` (10^7 a 10^8)."""
+    aleatorio = random.Random(semente)
+    return [float(aleatorio.randint(10_000_000, 100_000_000)) + aleatorio.random() for _ in range(n)]
+
+
+def gerar_dataset_escala(n, semente=42):
+    """
+    Gera um dataset sintético com duas colunas numéricas correlacionadas
+    ('x' e 'y') e duas categóricas ('genero', com ~n/10 valores distintos,
+    e 'tipo', com 3 valores).
+    """
+    aleatorio = random.Random(semente)
+    x = [aleatorio.lognormvariate(10, 1.5) for _ in range(n)]
+    return {
+        'x': x,
+        'y': [v * 0.5 + aleatorio.gauss(0, 1000) for v in x],
+        'genero': [f"g{aleatorio.randrange(max(1, n // 10))}" for _ in range(n)],
+        'tipo': [aleatorio.choice(('album', 'single', 'compilation')) for _ in range(n)],
+    }
+
+
+# (nome, opções do construtor de Statistics, consulta)
+CASOS_ESCALA = [
+    ('mean', {}, lambda s: s.mean('x')),
+    ('variance', {}, lambda s: s.variance('x')),
+    ('variance stable', {'precision': 'stable'}, lambda s: s.variance('x')),
+    ('covariance', {}, lambda s: s.covariance('x', 'y')),
+    ('median', {}, lambda s: s.median('x')),
+    ('quartiles', {}, lambda s: s.quartiles('x')),
+    ('mad', {}, lambda s: s.mad('x')),
+    ('spearman', {}, lambda s: s.correlation('x', 'y', 'spearman')),
+    ('kendall', {}, lambda s: s.correlation('x', 'y', 'kendall')),
+    ('view mean', {}, lambda s: s.view(slice(0, len(s.dataset['x']) // 2)).mean('x')),
+    ('sample', {}, lambda s: s.sample(1000, seed=1)),
+    ('cardinality hll', {}, lambda s: s.cardinality('genero', method='hll')),
+    ('crosstab', {}, lambda s: s.crosstab('genero', 'tipo', sparse=True)),
+]
+
+# Expoente (inclinação log-log) acima do qual a curva é marcada como superlinear.
+# Os caminhos O(n log n) sobre objetos Python (ordenação, Kendall) chegam a ~1.35
+# nestes tamanhos, pelo fator log e pelas falhas de cache; O(n^2) fica perto de 2.
+LIMITE_EXPOENTE = 1.5
+
+
+def _expoente(tamanhos, medidas):
+    """Inclinação da reta de mínimos quadrados de log(medida) contra log(n)."""
+    xs = [math.log(n) for n in tamanhos]
+    ys = [math.log(m) for m in medidas]
+    media_x = sum(xs) / len(xs)
+    media_y = sum(ys) / len(ys)
+    return (sum((x - media_x) * (y - media_y) for x, y in zip(xs, ys))
+            / sum((x - media_x) ** 2 for x in xs))
+
+
+def _pico_memoria(funcao):
+    tracemalloc.start()
+    try:
+        funcao()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_escalabilidade(tamanhos=(50_000, 100_000, 200_000, 400_000), repeticoes=3, verbose=True):
+    """
+    Mede a curva de tempo e de memória de cada caminho acelerado.
+
+    Cada consulta roda sobre um Statistics recém-criado (sem caches), em cada
+    backend disponível. O pico de memória é medido com `tracemalloc`, sem
+    contar o dataset. Curvas com expoente log-log acima de `LIMITE_EXPOENTE`
+    (tempo ou memória) são marcadas como superlineares.
+
+    Retorno
+    -------
+    list[dict]
+        Uma entrada por (caso, backend) com os tempos, os picos de memória,
+        os expoentes e a lista `superlinear` (vazia quando a curva é linear).
+    """
+    saida = print if verbose else (lambda *args, **kwargs: None)
+    datasets = {n: gerar_dataset_escala(n) for n in tamanhos}
+    backends = ['python'] + (['numpy'] if dende_kernels.disponivel() else [])
+
+    saida(f"Escalabilidade: n = {', '.join(str(n) for n in tamanhos)} (expoentes de tempo / memória)")
+    curvas = []
+    for nome, opcoes, consulta in CASOS_ESCALA:
+        for backend in backends:
+            tempos, picos = [], []
+            for n in tamanhos:
+                def executar(dados=datasets[n]):
+                    return consulta(Statistics(dados, backend=backend, **opcoes))
+                tempos.append(_cronometrar(executar, repeticoes))
+                picos.append(_pico_memoria(executar))
+
+            expoente_tempo = _expoente(tamanhos, [max(t, 1e-6) for t in tempos])
+            expoente_memoria = _expoente(tamanhos, [max(p, 1 << 16) for p in picos])
+            superlinear = [medida for medida, expoente in (('tempo', expoente_tempo), ('memória', expoente_memoria))
+                           if expoente > LIMITE_EXPOENTE]
+            curvas.append({'caso': nome, 'backend': backend, 'tamanhos': list(tamanhos),
+                           'tempos': tempos, 'picos': picos, 'expoente_tempo': expoente_tempo,
+                           'expoente_memoria': expoente_memoria, 'superlinear': superlinear})
+            alerta = f"   SUPERLINEAR ({', '.join(superlinear)})" if superlinear else ""
+            saida(f"  {nome:<16} {backend:<7} {tempos[-1] * 1000:9.2f} ms {picos[-1] / 2**20:8.2f} MB"
+                  f"   {expoente_tempo:5.2f} / {expoente_memoria:5.2f}{alerta}")
+    return curvas
+
+
+def _cronometrar(funcao, repeticoes):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def _variancia_exata(valores):
+    fracoes = [Fraction(v) for v in valores]
+    media = sum(fracoes) / len(fracoes)
+    return float(sum((x - media) ** 2 for x in fracoes) / len(fracoes))
+
+
+def bench_precisao(n=1_000_000, repeticoes=3):
+    """
+    Compara o modo 'fast' com o modo 'stable' (tempo e erro da variância).
+
+    O erro é medido contra a variância exata calculada com `fractions` em uma
+    amostra de 100 mil valores, para que a referência termine em segundos.
+    """
+    valores = gerar_coluna_seguidores(n)
+    amostra = valores[:100_000]
+    exata = _variancia_exata(amostra)
+
+    backends = ['python'] + (['numpy'] if dende_kernels.disponivel() else [])
+    print(f"Precisão: n = {n}, valores entre 1e7 e 1e8")
+    for backend in backends:
+        tempos = {}
+        for precisao in ('fast', 'stable'):
+            stats = Statistics({"x": valores}, backend=backend, precision=precisao)
+            stats.variance("x")  # aquece o buffer do backend
+            tempos[precisao] = _cronometrar(lambda: stats.variance("x"), repeticoes)
+            erro = abs(Statistics({"x": amostra}, backend=backend, precision=precisao).variance("x") - exata) / exata
+            print(f"  {backend:<7} {precisao:<7} {tempos[precisao] * 1000:9.2f} ms   erro relativo {erro:.2e}")
+        print(f"  {backend:<7} custo do modo stable: {tempos['stable'] / tempos['fast']:.2f}x")
+
+
+if __name__ == "__main__":
+    bench_precisao()
+    bench_escalabilidade()
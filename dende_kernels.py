@@ -0,0 +1,417 @@
+"""
+Kernels numéricos para as reduções da classe Statistics.
+
+Quando o NumPy está disponível, cada coluna numérica é convertida uma única
+vez em um buffer contíguo de float64 e as reduções (soma, soma dos quadrados
+dos desvios e co-momento) são executadas em blocos distribuídos entre
+threads. As reduções do NumPy liberam o GIL, então os blocos rodam de fato
+em paralelo, e várias consultas podem ser atendidas ao mesmo tempo no mesmo
+processo.
+
+Sem o NumPy, `disponivel()` retorna False e a classe Statistics segue pelo
+caminho em Python puro.
+
+Para o modo de precisão ('stable') há também as versões compensadas: a soma
+usa `math.fsum` (somas parciais exatas) e os momentos de cada bloco são
+combinados pelas fórmulas de Welford/Chan, que não sofrem cancelamento
+catastrófico em colunas de grande magnitude.
+"""
+import math
+import os
+import threading
+from array import array
+
+# Abaixo deste tamanho não compensa dividir a coluna entre threads
+TAMANHO_MINIMO_BLOCO = 1 << 16
+
+_numpy = None
+_numpy_carregado = False
+_executor = None
+_trava = threading.Lock()
+
+
+def carregar_numpy():
+    """
+    Importa o NumPy sob demanda (apenas na primeira chamada).
+
+    Retorno
+    -------
+    module ou None
+        O módulo numpy, ou None caso ele não esteja instalado.
+    """
+    global _numpy, _numpy_carregado
+    if not _numpy_carregado:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy = numpy
+        _numpy_carregado = True
+    return _numpy
+
+
+def disponivel():
+    """Indica se o backend de kernels (NumPy) pode ser usado."""
+    return carregar_numpy() is not None
+
+
+def threads_padrao():
+    """Quantidade de threads usada quando nenhuma é informada."""
+    return os.cpu_count() or 1
+
+
+def criar_buffer(valores, copiar=True):
+    """
+    Converte uma coluna em um buffer contíguo de float64.
+
+    Parâmetros
+    ----------
+    valores : sequence
+        Os valores da coluna.
+    copiar : bool, opcional
+        Se False, um array('d') é usado sem cópia. O buffer NumPy prende o
+        array enquanto existir (um array que exporta o buffer não pode
+        crescer), então só deve ser usado em buffers que vivem durante uma
+        chamada ou sobre arrays internos; o padrão copia.
+
+    Retorno
+    -------
+    numpy.ndarray ou None
+        O buffer, ou None se a coluna tiver valores não numéricos (textos,
+        None) ou se o backend não estiver disponível.
+    """
+    np = carregar_numpy()
+    if np is None:
+        return None
+    if isinstance(valores, array) and valores.typecode == 'd':
+        if not copiar:
+            return np.frombuffer(valores, dtype=np.float64)  # mesmo buffer, sem cópia
+        return np.array(valores, dtype=np.float64)  # cópia direta da memória, sem converter valor a valor
+    if any(isinstance(v, (str, bytes)) or v is None for v in valores):
+        return None
+    try:
+        if isinstance(valores, (list, tuple)):
+            return np.ascontiguousarray(valores, dtype=np.float64)
+        return np.fromiter(valores, dtype=np.float64, count=len(valores))
+    except (TypeError, ValueError):
+        return None
+
+
+def selecionar(buffer, indices):
+    """
+    Seleciona linhas de um buffer.
+
+    Um `range` vira uma fatia do próprio buffer (sem cópia); um array de
+    índices é aplicado diretamente, sem passar pelos objetos Python.
+    """
+    np = carregar_numpy()
+    if isinstance(indices, range) and indices.step > 0:
+        return buffer[indices.start:indices.stop:indices.step]
+    return buffer[np.asarray(indices, dtype=np.int64)]
+
+
+def blocos(n, threads):
+    """
+    Divide o intervalo [0, n) em blocos contíguos, um por thread.
+
+    Parâmetros
+    ----------
+    n : int
+        Tamanho da coluna.
+    threads : int
+        Quantidade máxima de blocos.
+
+    Retorno
+    -------
+    list[tuple[int, int]]
+        Lista de pares (início, fim) cobrindo todo o intervalo.
+    """
+    if n == 0:
+        return []
+    partes = max(1, min(threads, n // TAMANHO_MINIMO_BLOCO))
+    tamanho = -(-n // partes)  # divisão arredondando para cima
+    return [(inicio, min(inicio + tamanho, n)) for inicio in range(0, n, tamanho)]
+
+
+def _pool():
+    global _executor
+    with _trava:
+        if _executor is None:
+            from concurrent.futures import ThreadPoolExecutor  # importado só quando há mais de um bloco
+
+            _executor = ThreadPoolExecutor(max_workers=threads_padrao(),
+                                           thread_name_prefix="dende-kernel")
+    return _executor
+
+
+def executar_em_blocos(funcao, n, threads):
+    """
+    Aplica `funcao(inicio, fim)` em cada bloco e devolve os resultados parciais.
+
+    Com um único bloco a função roda na própria thread que chamou.
+    """
+    partes = blocos(n, threads)
+    if len(partes) <= 1:
+        return [funcao(inicio, fim) for inicio, fim in partes]
+    return list(_pool().map(lambda bloco: funcao(*bloco), partes))
+
+
+def soma(buffer, threads):
+    """Soma dos valores do buffer."""
+    parciais = executar_em_blocos(lambda i, j: float(buffer[i:j].sum()), len(buffer), threads)
+    return sum(parciais)
+
+
+def soma_desvios_quadrados(buffer, media, threads):
+    """Soma de (x - media) ** 2 para os valores do buffer."""
+    np = carregar_numpy()
+
+    def parcial(i, j):
+        desvios = buffer[i:j] - media
+        return float(np.dot(desvios, desvios))
+
+    return sum(executar_em_blocos(parcial, len(buffer), threads))
+
+
+def co_momento(buffer_a, buffer_b, media_a, media_b, threads):
+    """Soma de (a - media_a) * (b - media_b) para dois buffers do mesmo tamanho."""
+    np = carregar_numpy()
+
+    def parcial(i, j):
+        return float(np.dot(buffer_a[i:j] - media_a, buffer_b[i:j] - media_b))
+
+    return sum(executar_em_blocos(parcial, len(buffer_a), threads))
+
+
+def soma_ponderada(buffer, pesos, threads):
+    """Soma de peso * valor para um buffer e seus pesos."""
+    np = carregar_numpy()
+    return sum(executar_em_blocos(lambda i, j: float(np.dot(buffer[i:j], pesos[i:j])), len(buffer), threads))
+
+
+def soma_compensada(valores):
+    """Soma com compensação de erro (`math.fsum`), correta até o arredondamento final."""
+    return math.fsum(valores)
+
+
+def combinar_momentos(a, b):
+    """
+    Combina os momentos (n, media, m2) de dois blocos (fórmula de Chan).
+
+    `m2` é a soma dos quadrados dos desvios em relação à média do bloco.
+    """
+    n_a, media_a, m2_a = a
+    n_b, media_b, m2_b = b
+    if n_a == 0:
+        return b
+    if n_b == 0:
+        return a
+    n = n_a + n_b
+    delta = media_b - media_a
+    media = media_a + delta * n_b / n
+    m2 = m2_a + m2_b + delta * delta * n_a * n_b / n
+    return (n, media, m2)
+
+
+def combinar_co_momentos(a, b):
+    """
+    Combina os co-momentos (n, media_x, media_y, c) de dois blocos.
+
+    `c` é a soma dos produtos dos desvios de x e y em relação às médias do bloco.
+    """
+    n_a, mx_a, my_a, c_a = a
+    n_b, mx_b, my_b, c_b = b
+    if n_a == 0:
+        return b
+    if n_b == 0:
+        return a
+    n = n_a + n_b
+    delta_x = mx_b - mx_a
+    delta_y = my_b - my_a
+    mx = mx_a + delta_x * n_b / n
+    my = my_a + delta_y * n_b / n
+    c = c_a + c_b + delta_x * delta_y * n_a * n_b / n
+    return (n, mx, my, c)
+
+
+def momentos(buffer, threads):
+    """
+    Momentos (n, media, m2) do buffer, calculados bloco a bloco e combinados.
+
+    Os valores são deslocados por uma média piloto antes dos blocos: perto da
+    média a subtração é exata, e as médias dos blocos (pequenas) combinam sem
+    perder os dígitos que a magnitude dos valores (10^8, 10^12) consumiria.
+    Dentro de cada bloco os desvios são tomados em relação à média local.
+    """
+    np = carregar_numpy()
+    n = len(buffer)
+    if n == 0:
+        return (0, 0.0, 0.0)
+    piloto = soma(buffer, threads) / n
+
+    def parcial(i, j):
+        bloco = buffer[i:j] - piloto
+        media = float(bloco.mean())
+        bloco -= media
+        return (j - i, media, float(np.dot(bloco, bloco)))
+
+    resultado = (0, 0.0, 0.0)
+    for parte in executar_em_blocos(parcial, n, threads):
+        resultado = combinar_momentos(resultado, parte)
+    return (resultado[0], piloto + resultado[1], resultado[2])
+
+
+def co_momentos(buffer_a, buffer_b, threads):
+    """
+    Co-momentos (n, media_a, media_b, c) de dois buffers, combinados bloco a
+    bloco (com o mesmo deslocamento por médias piloto de `momentos`).
+    """
+    np = carregar_numpy()
+    n = len(buffer_a)
+    if n == 0:
+        return (0, 0.0, 0.0, 0.0)
+    piloto_a = soma(buffer_a, threads) / n
+    piloto_b = soma(buffer_b, threads) / n
+
+    def parcial(i, j):
+        bloco_a = buffer_a[i:j] - piloto_a
+        bloco_b = buffer_b[i:j] - piloto_b
+        media_a = float(bloco_a.mean())
+        media_b = float(bloco_b.mean())
+        bloco_a -= media_a
+        bloco_b -= media_b
+        return (j - i, media_a, media_b, float(np.dot(bloco_a, bloco_b)))
+
+    resultado = (0, 0.0, 0.0, 0.0)
+    for parte in executar_em_blocos(parcial, n, threads):
+        resultado = combinar_co_momentos(resultado, parte)
+    return (resultado[0], piloto_a + resultado[1], piloto_b + resultado[2], resultado[3])
+
+
+def momentos_ponderados(buffer, pesos, threads):
+    """
+    Momentos ponderados (W, media, m2) de um buffer, com W a soma dos pesos.
+
+    Mesmo esquema de `momentos`: deslocamento pela média piloto, momentos
+    de cada bloco em relação à média local e combinação pela fórmula de
+    Chan, com a soma dos pesos de cada bloco no lugar da contagem.
+    """
+    np = carregar_numpy()
+    total = soma(pesos, threads)
+    if total == 0:
+        return (0.0, 0.0, 0.0)
+    piloto = soma_ponderada(buffer, pesos, threads) / total
+
+    def parcial(i, j):
+        bloco_pesos = pesos[i:j]
+        peso = float(bloco_pesos.sum())
+        if peso == 0:
+            return (0.0, 0.0, 0.0)
+        bloco = buffer[i:j] - piloto
+        media = float(np.dot(bloco, bloco_pesos)) / peso
+        bloco -= media
+        return (peso, media, float(np.dot(bloco_pesos, bloco * bloco)))
+
+    resultado = (0.0, 0.0, 0.0)
+    for parte in executar_em_blocos(parcial, len(buffer), threads):
+        resultado = combinar_momentos(resultado, parte)
+    return (resultado[0], piloto + resultado[1], resultado[2])
+
+
+def co_momentos_ponderados(buffer_a, buffer_b, pesos, threads):
+    """Co-momentos ponderados (W, media_a, media_b, c) de dois buffers (ver `momentos_ponderados`)."""
+    np = carregar_numpy()
+    total = soma(pesos, threads)
+    if total == 0:
+        return (0.0, 0.0, 0.0, 0.0)
+    piloto_a = soma_ponderada(buffer_a, pesos, threads) / total
+    piloto_b = soma_ponderada(buffer_b, pesos, threads) / total
+
+    def parcial(i, j):
+        bloco_pesos = pesos[i:j]
+        peso = float(bloco_pesos.sum())
+        if peso == 0:
+            return (0.0, 0.0, 0.0, 0.0)
+        bloco_a = buffer_a[i:j] - piloto_a
+        bloco_b = buffer_b[i:j] - piloto_b
+        media_a = float(np.dot(bloco_a, bloco_pesos)) / peso
+        media_b = float(np.dot(bloco_b, bloco_pesos)) / peso
+        bloco_a -= media_a
+        bloco_b -= media_b
+        return (peso, media_a, media_b, float(np.dot(bloco_pesos, bloco_a * bloco_b)))
+
+    resultado = (0.0, 0.0, 0.0, 0.0)
+    for parte in executar_em_blocos(parcial, len(buffer_a), threads):
+        resultado = combinar_co_momentos(resultado, parte)
+    return (resultado[0], piloto_a + resultado[1], piloto_b + resultado[2], resultado[3])
+
+
+def matriz_co_momentos(buffers):
+    """
+    Matriz de co-momentos (somas dos produtos dos desvios) entre vários buffers.
+
+    Os buffers são empilhados em uma matriz n x k já centrada e a matriz
+    k x k sai de um único produto de matrizes (que também libera o GIL).
+    """
+    np = carregar_numpy()
+    dados = np.column_stack(buffers)
+    dados = dados - dados.mean(axis=0)
+    return dados.T @ dados
+
+
+def ordenacao(buffer):
+    """Índices que ordenam o buffer (ordenação estável), como um array('q')."""
+    np = carregar_numpy()
+    indices = array('q')
+    indices.frombytes(np.argsort(buffer, kind='stable').astype(np.int64).tobytes())
+    return indices
+
+
+def contar_combinacoes(codigos_por_coluna, larguras):
+    """
+    Conta as combinações de códigos de dicionário de várias colunas.
+
+    Os códigos de cada linha são empacotados em um único inteiro (base
+    mista: chave = (c0 * L1 + c1) * L2 + c2 ...) e as chaves são contadas
+    com `bincount` quando o espaço de chaves é pequeno, ou com `unique`
+    caso contrário.
+
+    Parâmetros
+    ----------
+    codigos_por_coluna : list[array('i')]
+        Os códigos de cada coluna, todos com o mesmo tamanho.
+    larguras : list[int]
+        A quantidade de níveis de cada coluna.
+
+    Retorno
+    -------
+    tuple[list[int], list[int]]
+        As chaves observadas (em ordem crescente) e as contagens de cada uma.
+    """
+    np = carregar_numpy()
+    chaves = np.zeros(len(codigos_por_coluna[0]), dtype=np.int64)
+    for codigos, largura in zip(codigos_por_coluna, larguras):
+        chaves *= largura
+        chaves += np.frombuffer(codigos, dtype=np.intc)
+
+    espaco = math.prod(larguras)
+    if espaco <= max(len(chaves), TAMANHO_MINIMO_BLOCO):
+        contagens = np.bincount(chaves, minlength=espaco)
+        observadas = np.flatnonzero(contagens)
+        return observadas.tolist(), contagens[observadas].tolist()
+    observadas, contagens = np.unique(chaves, return_counts=True)
+    return observadas.tolist(), contagens.tolist()
+
+
+def pesos_acumulados(pesos, ordem):
+    """Soma acumulada dos pesos na ordem dada (array('q') de índices), como um array('d')."""
+    np = carregar_numpy()
+    acumulados = array('d')
+    acumulados.frombytes(np.cumsum(pesos[np.frombuffer(ordem, dtype=np.int64)]).tobytes())
+    return acumulados
+
+
+def somar_por_codigo(codigos, pesos, quantidade):
+    """Soma dos pesos de cada código de dicionário (lista indexada pelo código)."""
+    np = carregar_numpy()
+    return np.bincount(np.frombuffer(codigos, dtype=np.intc), weights=pesos, minlength=quantidade).tolist()
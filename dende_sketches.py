@@ -0,0 +1,125 @@
+"""
+Sketches (resumos probabilísticos) para colunas muito grandes.
+
+`HyperLogLog` estima a quantidade de valores distintos de uma coluna usando
+apenas 2^precision registradores de um byte (4 KB com a precisão padrão),
+em vez de materializar um `set` com todos os valores. Sketches criados com a
+mesma precisão podem ser combinados (`merge`), então blocos e partições
+diferentes podem ser processados separadamente e unidos no final.
+"""
+import math
+import struct
+from hashlib import blake2b
+
+PRECISAO_PADRAO = 12
+
+_empacotar_double = struct.Struct('<d').pack
+
+
+def hash64(valor):
+    """
+    Hash determinístico de 64 bits de um valor.
+
+    Diferente de `hash()`, não muda entre processos, o que permite combinar
+    sketches calculados em processos ou máquinas diferentes. Números inteiros
+    e reais iguais (1 e 1.0) têm o mesmo hash, como em um `set`.
+    """
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        dados = b'n' + _empacotar_double(float(valor))
+    elif isinstance(valor, str):
+        dados = b's' + valor.encode('utf-8')
+    else:
+        dados = b'r' + repr(valor).encode('utf-8')
+    return int.from_bytes(blake2b(dados, digest_size=8).digest(), 'little')
+
+
+class HyperLogLog:
+    """
+    Estimador de cardinalidade HyperLogLog.
+
+    Atributos
+    ----------
+    precision : int
+        Número de bits do hash usados para escolher o registrador (4 a 18).
+        O erro padrão relativo é cerca de 1.04 / sqrt(2 ** precision):
+        1.6% com 12 (4 KB) e 0.8% com 14 (16 KB).
+    registers : bytearray
+        Os 2 ** precision registradores.
+    """
+
+    def __init__(self, precision=PRECISAO_PADRAO):
+        """
+        Parâmetros
+        ----------
+        precision : int, opcional
+            Precisão do sketch (padrão é 12).
+        """
+        if not 4 <= precision <= 18:
+            raise ValueError("A precisão do HyperLogLog deve estar entre 4 e 18")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, valor):
+        """Adiciona um valor ao sketch."""
+        self.add_hash(hash64(valor))
+
+    def add_hash(self, h):
+        """Adiciona um hash de 64 bits já calculado (ver `hash64`)."""
+        bits_restantes = 64 - self.precision
+        indice = h >> bits_restantes
+        resto = h & ((1 << bits_restantes) - 1)
+        posicao = bits_restantes - resto.bit_length() + 1  # zeros à esquerda + 1
+        if posicao > self.registers[indice]:
+            self.registers[indice] = posicao
+
+    def update(self, valores):
+        """Adiciona todos os valores de um iterável."""
+        registradores = self.registers
+        bits_restantes = 64 - self.precision
+        mascara = (1 << bits_restantes) - 1
+        for valor in valores:
+            h = hash64(valor)
+            indice = h >> bits_restantes
+            posicao = bits_restantes - (h & mascara).bit_length() + 1
+            if posicao > registradores[indice]:
+                registradores[indice] = posicao
+        return self
+
+    def merge(self, outro):
+        """
+        Combina outro sketch a este (união dos conjuntos de valores).
+
+        Retorno
+        -------
+        HyperLogLog
+            O próprio objeto, já combinado.
+        """
+        if outro.precision != self.precision:
+            raise ValueError("Só é possível combinar sketches com a mesma precisão")
+        self.registers = bytearray(map(max, self.registers, outro.registers))
+        return self
+
+    def count(self):
+        """
+        Estima a quantidade de valores distintos.
+
+        Retorno
+        -------
+        int
+            A cardinalidade estimada.
+        """
+        m = len(self.registers)
+        if m == 16:
+            alfa = 0.673
+        elif m == 32:
+            alfa = 0.697
+        elif m == 64:
+            alfa = 0.709
+        else:
+            alfa = 0.7213 / (1 + 1.079 / m)
+
+        estimativa = alfa * m * m / math.fsum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimativa <= 2.5 * m and zeros:  # correção para cardinalidades pequenas
+            estimativa = m * math.log(m / zeros)
+        return int(round(estimativa))
@@ -1,3 +1,174 @@
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, product
+from operator import mul
+
+_INICIO = time.perf_counter()  # usado pela CLI para medir o próprio tempo de inicialização
+_EPSILON = sys.float_info.epsilon  # folga relativa das somas acumuladas de pesos
+
+import dende_kernels
+
+
+class ColumnView:
+    """
+    Uma visão somente leitura sobre as linhas de uma coluna, sem copiar dados.
+
+    Guarda apenas a coluna de origem e os índices das linhas selecionadas: um
+    `range` (fatias contíguas, custo zero) ou um `array('q')` compacto (máscaras
+    e listas de índices). Comporta-se como uma sequência (len, índice, fatia,
+    iteração), então todos os métodos de Statistics funcionam sobre ela.
+    """
+    __slots__ = ('source', 'indices')
+
+    def __init__(self, source, indices):
+        """
+        Parâmetros
+        ----------
+        source : sequence
+            A coluna de origem (lista, array, memoryview ou outra visão).
+        indices : range ou array
+            Os índices das linhas da origem que fazem parte da visão.
+        """
+        if isinstance(source, ColumnView):  # visão de visão: compõe os índices
+            indices = _compor_indices(source.indices, indices)
+            source = source.source
+        self.source = source
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return ColumnView(self.source, self.indices[i])
+        return self.source[self.indices[i]]
+
+    def __iter__(self):
+        return map(self.source.__getitem__, self.indices)
+
+    def __repr__(self):
+        return f"ColumnView({len(self)} de {len(self.source)} linhas)"
+
+
+class MultiValueColumn:
+    """
+    Uma coluna categórica com vários valores por linha (ex.: 'artist_genres').
+
+    Os valores são separados uma única vez, no carregamento, e guardados de
+    forma compacta: `codes` é um buffer plano com o código inteiro de cada
+    valor e `offsets` indica onde começa cada linha (a linha i ocupa
+    codes[offsets[i]:offsets[i + 1]]). `vocabulary` traduz código → valor.
+    Como sequência, cada linha é vista como uma tupla de valores.
+    """
+    __slots__ = ('offsets', 'codes', 'vocabulary')
+
+    def __init__(self, offsets, codes, vocabulary):
+        self.offsets = offsets
+        self.codes = codes
+        self.vocabulary = vocabulary
+
+    @classmethod
+    def from_strings(cls, values, separator=','):
+        """
+        Constrói a coluna a partir de textos como "country hip hop, southern hip hop".
+
+        Valores vazios ou None viram linhas sem nenhum item. Itens repetidos
+        na mesma linha ("pop, rock, pop") entram uma única vez, na ordem da
+        primeira aparição: cada linha conta no máximo uma vez por item em
+        todas as operações (frequências, moda, coocorrência, group_by).
+        """
+        offsets = array('q', [0])
+        codes = array('i')
+        vocabulary = []
+        codigo_de = {}  # valor -> código
+
+        for texto in values:
+            if isinstance(texto, str):
+                na_linha = set()  # códigos já vistos nesta linha
+                for item in texto.split(separator):
+                    item = item.strip()
+                    if not item:
+                        continue
+                    codigo = codigo_de.get(item)
+                    if codigo is None:
+                        codigo = codigo_de[item] = len(vocabulary)
+                        vocabulary.append(item)
+                    if codigo not in na_linha:
+                        na_linha.add(codigo)
+                        codes.append(codigo)
+            offsets.append(len(codes))
+
+        return cls(offsets, codes, vocabulary)
+
+    def row_codes(self, i):
+        """Os códigos da linha i (fatia do buffer plano)."""
+        return self.codes[self.offsets[i]:self.offsets[i + 1]]
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return ColumnView(self, range(len(self))[i])
+        if i < 0:
+            i += len(self)
+        return tuple(self.vocabulary[c] for c in self.row_codes(i))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        return f"MultiValueColumn({len(self)} linhas, {len(self.codes)} valores, {len(self.vocabulary)} distintos)"
+
+
+def _compor_indices(externos, internos):
+    """Índices na origem de uma visão `internos` aplicada sobre a visão `externos`."""
+    if isinstance(externos, range) and isinstance(internos, range):
+        return externos[internos.start:internos.stop:internos.step]
+    return array('q', (externos[i] for i in internos))
+
+
+def _explodir_linhas(codificadas, multivaloradas):
+    """
+    Uma linha de códigos por item das colunas multivaloradas.
+
+    `codificadas` traz (códigos, níveis) de cada coluna; nas multivaloradas,
+    os códigos são uma sequência de códigos por linha. Cada linha vira o
+    produto dos seus itens, repetindo os códigos das demais colunas; linhas
+    sem itens desaparecem.
+    """
+    explodidas = [array('i') for _ in codificadas]
+    for linha in zip(*(codigos for codigos, _ in codificadas)):
+        itens = [codigo if multi else (codigo,) for codigo, multi in zip(linha, multivaloradas)]
+        for combinacao in product(*itens):
+            for destino, codigo in zip(explodidas, combinacao):
+                destino.append(codigo)
+    return [(codigos, niveis) for codigos, (_, niveis) in zip(explodidas, codificadas)]
+
+
+def _booleano(valor):
+    """Indica se o valor é um booleano do Python ou um escalar booleano do NumPy (dtype 'b')."""
+    return isinstance(valor, bool) or getattr(getattr(valor, 'dtype', None), 'kind', None) == 'b'
+
+
+def _indices_linhas(rows, n):
+    """Converte uma fatia, máscara booleana ou lista de índices em índices de linhas."""
+    if isinstance(rows, slice):
+        return range(n)[rows]
+    if isinstance(rows, range):
+        return rows
+    mascara = getattr(getattr(rows, 'dtype', None), 'kind', None) == 'b'  # ex.: array booleano do NumPy
+    rows = list(rows) if not isinstance(rows, (list, tuple, array)) else rows
+    if mascara or (len(rows) and all(_booleano(m) for m in rows)):  # máscara booleana
+        if len(rows) != n:
+            raise ValueError(f"A máscara tem {len(rows)} posições, mas o dataset tem {n} linhas")
+        return array('q', (i for i, m in enumerate(rows) if m))
+    return array('q', rows)
+
+
 class Statistics:
     """
     Uma classe para realizar cálculos estatísticos em um conjunto de dados.
@@ -7,8 +178,40 @@ class Statistics:
     dataset : dict[str, list]
         O conjunto de dados, estruturado como um dicionário onde as chaves
         são os nomes das colunas e os valores são listas com os dados.
+    backend : str
+        'auto' usa os kernels de `dende_kernels` (NumPy, em blocos paralelos)
+        quando disponíveis; 'python' força o caminho em Python puro.
+    threads : int
+        Quantidade máxima de threads usada pelos kernels.
+    precision : str
+        'fast' usa somas simples; 'stable' usa somas compensadas e a
+        combinação de momentos de Welford/Chan (média, variância e covariância).
+    population_size : int ou None
+        Em objetos criados por `sample`, o número de linhas da população de
+        origem (usado na correção para população finita); None caso contrário.
+
+    Pesos
+    -----
+    Média, variância, covariância, mediana, quartis, histograma e os métodos
+    de frequência aceitam `weights`: o nome de uma coluna (ex.:
+    'track_popularity') ou uma sequência de números não negativos, um por
+    linha. Os pesos são convertidos uma vez em um array('d') compacto (em
+    cache quando dados pelo nome da coluna) e nenhuma linha é repetida: com
+    pesos inteiros, média, variância, covariância, mediana, histograma e
+    frequências dão o mesmo resultado de repetir cada linha pelo seu peso.
+    Mediana e quartis dependem apenas das proporções dos pesos, então pesos
+    iguais (de qualquer tamanho) dão o mesmo resultado de não usar pesos.
+
+    Caches
+    ------
+    Buffers, ordenações, postos, códigos de dicionário e pesos convertidos
+    ficam em cache por coluna. Cada cache vale para a lista e o tamanho que a
+    coluna tinha quando foi criado: trocar `dataset[coluna]` por outra lista
+    ou acrescentar linhas refaz os caches na próxima chamada. Alterações no
+    lugar que mantêm o tamanho (ex.: dataset['x'][0] = 5) não são percebidas;
+    nesse caso chame `invalidate(coluna)`.
     """
-    def __init__(self, dataset):
+    def __init__(self, dataset, backend='auto', threads=None, precision='fast'):
         """
         Inicializa o objeto Statistics.
 
@@ -17,10 +220,227 @@ class Statistics:
         dataset : dict[str, list]
             O conjunto de dados, onde as chaves representam os nomes das
             colunas e os valores são as listas de dados correspondentes.
+        backend : str, opcional
+            'auto' (padrão), 'numpy' ou 'python'. Com 'numpy' o NumPy é
+            obrigatório; com 'auto' ele é usado apenas se estiver instalado.
+        threads : int, opcional
+            Quantidade máxima de threads dos kernels (padrão: número de CPUs).
+        precision : str, opcional
+            'fast' (padrão) ou 'stable'. O modo 'stable' mantém a precisão em
+            colunas grandes e de grande magnitude, a um custo constante pequeno.
         """
+        if backend not in ('auto', 'numpy', 'python'):
+            raise ValueError(f"Backend desconhecido: {backend}")
+        if precision not in ('fast', 'stable'):
+            raise ValueError(f"Modo de precisão desconhecido: {precision}")
+        if backend == 'numpy' and not dende_kernels.disponivel():
+            raise ImportError("O backend 'numpy' requer o pacote numpy instalado")
+
         self.dataset = dataset
+        self.backend = backend
+        self.threads = threads or dende_kernels.threads_padrao()
+        self.precision = precision
+        self.population_size = None
+        self._buffers = {}  # buffers contíguos por coluna, criados sob demanda
+        self._order = {}  # ordenação (índices das linhas) por coluna, compartilhada por mediana, quartis, postos e estatísticas robustas
+        self._ranks = {}  # postos (ranks) por coluna, usados por Spearman e Kendall
+        self._codes = {}  # códigos de dicionário por coluna, usados pelas tabelas de contingência e pelas frequências ponderadas
+        self._weights = {}  # colunas de pesos convertidas em array('d')
+        self._weight_cdf = {}  # pesos acumulados na ordenação, por (coluna, coluna de pesos)
+        self._joint = {}  # contagens conjuntas (chaves empacotadas) por grupo de colunas
+        self._contingency = {}  # tabelas cruzadas por grupos de colunas e formato
+        self._sources = {}  # coluna -> (lista, tamanho) de quando os caches da coluna foram criados
+        self._parent = None  # em visões: o Statistics de origem
+        self._rows = None  # em visões: os índices das linhas na origem
+
+    def _derivar(self, dataset):
+        """Cria um novo Statistics sobre `dataset` com a mesma configuração."""
+        return Statistics(dataset, backend=self.backend, threads=self.threads, precision=self.precision)
+
+    def _numero_linhas(self):
+        """Número de linhas do dataset (todas as colunas devem ter o mesmo tamanho)."""
+        tamanhos = {len(valores) for valores in self.dataset.values()}
+        if len(tamanhos) > 1:
+            raise ValueError("As colunas do dataset têm tamanhos diferentes")
+        return tamanhos.pop() if tamanhos else 0
+
+    def invalidate(self, column=None):
+        """
+        Descarta os caches de uma coluna (ou de todas, sem `column`).
+
+        Necessário apenas depois de alterar uma coluna no lugar sem mudar o
+        seu tamanho; colunas trocadas ou que ganharam linhas são percebidas
+        automaticamente.
+
+        Parâmetros
+        ----------
+        column : str, opcional
+            A coluna alterada (padrão: todas as colunas).
+        """
+        if column is None:
+            for cache in (self._buffers, self._order, self._ranks, self._codes, self._weights,
+                          self._weight_cdf, self._joint, self._contingency, self._sources):
+                cache.clear()
+            return
+        for cache in (self._buffers, self._order, self._ranks, self._codes, self._weights, self._sources):
+            cache.pop(column, None)
+        for cache, colunas in ((self._weight_cdf, lambda chave: chave),
+                               (self._joint, lambda chave: chave),
+                               (self._contingency, lambda chave: chave[0] + chave[1])):
+            for chave in [chave for chave in cache if column in colunas(chave)]:
+                del cache[chave]
+
+    def _conferir(self, *columns):
+        """Descarta os caches das colunas que foram trocadas ou mudaram de tamanho desde que foram criados."""
+        for column in columns:
+            valores = self.dataset.get(column)
+            origem = self._sources.get(column)
+            if origem is not None and (origem[0] is not valores or origem[1] != len(valores)):
+                self.invalidate(column)
+                origem = None
+            if origem is None and valores is not None:
+                self._sources[column] = (valores, len(valores))
+
+    def _mesma_origem(self, column):
+        """Em visões: indica se a coluna ainda é uma visão da coluna atual da origem."""
+        valores, origem = self.dataset[column], self._parent.dataset.get(column)
+        if isinstance(origem, ColumnView):
+            origem = origem.source
+        return isinstance(valores, ColumnView) and valores.source is origem
+
+    def _buffer(self, column):
+        """
+        Retorna o buffer contíguo (float64) de uma coluna numérica.
+
+        O buffer é criado na primeira chamada e reaproveitado nas seguintes.
+        Retorna None quando o backend não está em uso ou a coluna não é
+        numérica, indicando que o cálculo deve seguir em Python puro.
+        """
+        if self.backend == 'python':
+            return None
+        self._conferir(column)
+        if column not in self._buffers:
+            buffer = None
+            if self._parent is not None and self._mesma_origem(column):  # reaproveita o buffer da origem
+                buffer_origem = self._parent._buffer(column)
+                if buffer_origem is not None:
+                    buffer = dende_kernels.selecionar(buffer_origem, self._rows)
+            if buffer is None:
+                buffer = dende_kernels.criar_buffer(self.dataset[column])
+            self._buffers[column] = buffer
+        return self._buffers[column]
+
+    def view(self, rows):
+        """
+        Cria um Statistics sobre um subconjunto das linhas, sem copiar as colunas.
+
+        As colunas do novo objeto são `ColumnView` sobre as listas deste
+        objeto, e os buffers numéricos já criados aqui são reaproveitados
+        (fatias contíguas viram visões do próprio buffer, sem cópia).
+
+        Parâmetros
+        ----------
+        rows : slice, sequence[bool] ou sequence[int]
+            Uma fatia (ex.: slice(0, 1000)), uma máscara booleana com uma
+            posição por linha ou uma lista/array de índices de linhas.
+
+        Retorno
+        -------
+        Statistics
+            Um novo objeto com a mesma configuração, restrito às linhas.
+        """
+        indices = _indices_linhas(rows, self._numero_linhas())
+        derivado = self._derivar({coluna: ColumnView(valores, indices)
+                                  for coluna, valores in self.dataset.items()})
+        derivado._parent = self
+        derivado._rows = indices
+        return derivado
+
+    def where(self, column, value):
+        """
+        Cria uma visão com as linhas em que `column` é igual a `value`.
+
+        Ex.: stats.where('album_type', 'single') ou stats.where('explicit', 'TRUE').
+        """
+        return self.view(array('q', (i for i, v in enumerate(self.dataset[column]) if v == value)))
+
+    def _multivalorada(self, column):
+        """
+        Retorna (MultiValueColumn, índices das linhas) se a coluna tiver vários
+        valores por linha, ou (None, None) caso contrário. Os índices são None
+        quando todas as linhas da coluna são usadas.
+        """
+        valores = self.dataset[column]
+        if isinstance(valores, MultiValueColumn):
+            return valores, None
+        if isinstance(valores, ColumnView) and isinstance(valores.source, MultiValueColumn):
+            return valores.source, valores.indices
+        return None, None
+
+    def _contar_codigos(self, column):
+        """Contagem por código de uma coluna multivalorada (lista indexada pelo código)."""
+        coluna, linhas = self._multivalorada(column)
+        contagens = [0] * len(coluna.vocabulary)
+        if linhas is None:
+            for codigo in coluna.codes:  # percorre direto o buffer plano
+                contagens[codigo] += 1
+        else:
+            for i in linhas:
+                for codigo in coluna.row_codes(i):
+                    contagens[codigo] += 1
+        return contagens
+
+    def _pesos(self, weights, n):
+        """
+        Converte `weights` (nome de coluna ou sequência) em um array('d') com `n` pesos.
+
+        Pesos dados pelo nome de uma coluna são convertidos uma única vez.
+        """
+        if isinstance(weights, str):
+            self._conferir(weights)
+            if weights not in self._weights:
+                self._weights[weights] = _converter_pesos(self.dataset[weights])
+            pesos = self._weights[weights]
+        else:
+            pesos = _converter_pesos(weights)
+        if len(pesos) != n:
+            raise ValueError("Os pesos precisam ter o mesmo número de linhas da coluna")
+        return pesos
+
+    def _buffer_pesos(self, pesos):
+        """Buffer NumPy dos pesos (sem cópia; vive só durante a chamada), ou None fora do backend de kernels."""
+        if self.backend == 'python':
+            return None
+        return dende_kernels.criar_buffer(pesos, copiar=False)
+
+    def _posicao_ponderada(self, column, weights):
+        """
+        Base dos quantis ponderados.
 
-    def mean(self, column):
+        Retorna (valores, acumulados, positivos, tolerancia): os valores
+        ordenados, a soma acumulada dos pesos ao longo da ordenação
+        (`sort_order`), a quantidade de linhas com peso positivo e a folga
+        usada para reconhecer um corte exatamente na fronteira entre dois
+        valores apesar do arredondamento das somas (ver `_corte_ponderado`).
+        """
+        valores = self.sorted_values(column)
+        pesos = self._pesos(weights, len(valores))
+        chave = (column, weights) if isinstance(weights, str) else None
+        acumulados = self._weight_cdf.get(chave)
+        if acumulados is None:
+            ordem = self.sort_order(column)
+            buffer_pesos = self._buffer_pesos(pesos)
+            if buffer_pesos is not None:
+                acumulados = dende_kernels.pesos_acumulados(buffer_pesos, ordem)
+            else:
+                acumulados = array('d', accumulate(map(pesos.__getitem__, ordem)))
+            if chave is not None:
+                self._weight_cdf[chave] = acumulados
+        total = _peso_total(acumulados[-1] if acumulados else 0.0)
+        positivos = sum(1 for peso in pesos if peso > 0)
+        return valores, acumulados, positivos, total * len(acumulados) * _EPSILON
+
+    def mean(self, column, weights=None):
         """
         Calcula a média aritmética de uma coluna.
 
@@ -28,6 +448,9 @@ class Statistics:
         ----------
         column : str
             O nome da coluna (chave do dicionário do dataset).
+        weights : str ou sequence, opcional
+            Pesos das linhas (ver a seção Pesos da classe); com pesos, a
+            média ponderada soma(peso * valor) / soma(pesos).
 
         Retorno
         -------
@@ -43,10 +466,69 @@ class Statistics:
 
         if not values: # caso a coluna esteja vazia
             return 0.0
-        
+
+        buffer = self._buffer(column)
+        if weights is not None: # média ponderada, sem repetir linhas
+            pesos = self._pesos(weights, len(values))
+            buffer_pesos = self._buffer_pesos(pesos)
+            if buffer is not None and buffer_pesos is not None:
+                if self.precision == 'stable':
+                    return dende_kernels.momentos_ponderados(buffer, buffer_pesos, self.threads)[1]
+                total = _peso_total(dende_kernels.soma(buffer_pesos, self.threads))
+                return dende_kernels.soma_ponderada(buffer, buffer_pesos, self.threads) / total
+            somar = dende_kernels.soma_compensada if self.precision == 'stable' else sum
+            return somar(map(mul, values, pesos)) / _peso_total(somar(pesos))
+
+        if self.precision == 'stable': # soma compensada / momentos combinados
+            if buffer is not None:
+                return dende_kernels.momentos(buffer, self.threads)[1]
+            return dende_kernels.soma_compensada(values) / len(values)
+
+        if buffer is not None: # soma em blocos paralelos pelos kernels
+            return dende_kernels.soma(buffer, self.threads) / len(buffer)
+
         return sum(values) / len(values) # calculando a média (soma dos valores dividido pela quantidade de valores)
 
-    def median(self, column):
+    def sort_order(self, column):
+        """
+        Retorna a ordenação das linhas de uma coluna (índices em ordem crescente de valor).
+
+        A ordenação é calculada uma única vez por coluna e reaproveitada pela
+        mediana, pelos quartis, pelos postos e pelas estatísticas robustas,
+        e refeita se a coluna for trocada ou mudar de tamanho.
+
+        Parâmetros
+        ----------
+        column : str
+            O nome da coluna (chave do dicionário do dataset).
+
+        Retorno
+        -------
+        array
+            Um array('q') com os índices das linhas, do menor para o maior valor.
+        """
+        self._conferir(column)
+        if column not in self._order:
+            buffer = self._buffer(column)
+            if buffer is not None:
+                self._order[column] = dende_kernels.ordenacao(buffer)
+            else:
+                valores = self.dataset[column]
+                self._order[column] = array('q', sorted(range(len(valores)), key=valores.__getitem__))
+        return self._order[column]
+
+    def sorted_values(self, column):
+        """
+        Retorna os valores de uma coluna em ordem crescente, sem copiá-los.
+
+        Retorno
+        -------
+        ColumnView
+            Uma visão sobre a coluna na ordem de `sort_order`.
+        """
+        return ColumnView(self.dataset[column], self.sort_order(column))
+
+    def median(self, column, weights=None):
         """
         Calcula a mediana de uma coluna.
 
@@ -56,6 +538,10 @@ class Statistics:
         ----------
         column : str
             O nome da coluna (chave do dicionário do dataset).
+        weights : str ou sequence, opcional
+            Pesos das linhas: a mediana passa a ser o ponto em que o peso
+            acumulado chega à metade do total (média dos dois valores vizinhos
+            quando cai exatamente na fronteira entre eles).
 
         Retorno
         -------
@@ -63,7 +549,16 @@ class Statistics:
             O valor da mediana da coluna.
         """
 
-        values = sorted(self.dataset[column]) # extraindo os dados da coluna e ordenando
+        if weights is not None: # ponto em que o peso acumulado chega à metade do total
+            valores, acumulados, _, tolerancia = self._posicao_ponderada(column, weights)
+            k, proximo = _corte_ponderado(acumulados, acumulados[-1] / 2, tolerancia)
+            if proximo is None:
+                return valores[k]
+            if not isinstance(valores[k], (int, float)):
+                return valores[proximo] # como sem pesos, o valor de cima para dados não numéricos
+            return (valores[k] + valores[proximo]) / 2
+
+        values = self.sorted_values(column) # extraindo os dados da coluna já ordenados (ordenação em cache)
         n = len(values) # quantidade de valores
         mid = n // 2 # índice do meio
         if all(isinstance(v, (int, float)) for v in values): # validando dados
@@ -74,7 +569,7 @@ class Statistics:
         else:
             return values[mid] # para dados não numéricos, a mediana é o valor do meio (ou um dos dois do meio)
 
-    def mode(self, column):
+    def mode(self, column, weights=None):
         """
         Encontra a moda (ou modas) de uma coluna.
 
@@ -84,12 +579,21 @@ class Statistics:
         ----------
         column : str
             O nome da coluna (chave do dicionário do dataset).
+        weights : str ou sequence, opcional
+            Pesos das linhas: a moda é o valor com a maior soma de pesos.
 
         Retorno
         -------
         list
             Uma lista contendo o(s) valor(es) da moda.
         """
+        if weights is not None or self._multivalorada(column)[0] is not None: # soma dos pesos / cada item da linha conta separadamente
+            frequency = self.absolute_frequency(column, weights)
+            if not frequency:
+                return []
+            max_freq = max(frequency.values())
+            return [key for key, freq in frequency.items() if freq == max_freq]
+
         values = self.dataset[column] # extraindo os dados da coluna
         frequency = {}
         for value in values: # contando a frequência de cada valor na coluna
@@ -97,7 +601,7 @@ class Statistics:
         max_freq = max(frequency.values()) # encontrando a frequência máxima
         return [key for key, freq in frequency.items() if freq == max_freq] # retornando uma lista com os valores que têm a frequência máxima (moda)
 
-    def variance(self, column):
+    def variance(self, column, weights=None):
         """
         Calcula a variância populacional de uma coluna.
 
@@ -105,6 +609,9 @@ class Statistics:
         ----------
         column : str
             O nome da coluna (chave do dicionário do dataset).
+        weights : str ou sequence, opcional
+            Pesos das linhas: soma(peso * (valor - média ponderada) ** 2) / soma(pesos).
+            Calculada em uma passada (algoritmo de West), nos dois modos de precisão.
 
         Retorno
         -------
@@ -118,7 +625,28 @@ class Statistics:
 
         if len(dados) == 0:#caso a coluna esteja vazia
             return None
-        
+
+        buffer = self._buffer(column)
+        if weights is not None:#momentos ponderados em uma passada
+            pesos = self._pesos(weights, len(dados))
+            buffer_pesos = self._buffer_pesos(pesos)
+            if buffer is not None and buffer_pesos is not None:
+                total, _, m2 = dende_kernels.momentos_ponderados(buffer, buffer_pesos, self.threads)
+            else:
+                total, _, m2 = _momentos_ponderados(dados, pesos)
+            return m2 / _peso_total(total)
+
+        if self.precision == 'stable':#momentos de Welford/Chan ou somas compensadas
+            if buffer is not None:
+                n, _, m2 = dende_kernels.momentos(buffer, self.threads)
+                return m2 / n
+            media = dende_kernels.soma_compensada(dados) / len(dados)
+            return dende_kernels.soma_compensada((x - media) ** 2 for x in dados) / len(dados)
+
+        if buffer is not None:#soma dos quadrados em blocos paralelos pelos kernels
+            media = dende_kernels.soma(buffer, self.threads) / len(buffer)
+            return dende_kernels.soma_desvios_quadrados(buffer, media, self.threads) / len(buffer)
+
         media = sum(dados) / len(dados)#tirando a média da coluna
 
         soma_quadrados = sum((x - media) ** 2 for x in dados)#ao quadrado de cada desvio
@@ -128,7 +656,7 @@ class Statistics:
         return variancia_populacional
         
 
-    def stdev(self, column):
+    def stdev(self, column, weights=None):
         """
         Calcula o desvio padrão populacional de uma coluna.
 
@@ -136,13 +664,15 @@ class Statistics:
         ----------
         column : str
             O nome da coluna (chave do dicionário do dataset).
+        weights : str ou sequence, opcional
+            Pesos das linhas (ver `variance`).
 
         Retorno
         -------
         float
             O desvio padrão dos valores na coluna.
         """
-        variancia_populacional = self.variance(column)#extraindo dados
+        variancia_populacional = self.variance(column, weights)#extraindo dados
 
         if variancia_populacional is None:#caso a coluna esteja vazia
             return None
@@ -151,7 +681,7 @@ class Statistics:
 
         return desvio
 
-    def covariance(self, column_a, column_b):
+    def covariance(self, column_a, column_b, weights=None):
         """
         Calcula a covariância entre duas colunas.
 
@@ -161,6 +691,9 @@ class Statistics:
             O nome da primeira coluna (X).
         column_b : str
             O nome da segunda coluna (Y).
+        weights : str ou sequence, opcional
+            Pesos das linhas: soma(peso * desvio_X * desvio_Y) / soma(pesos),
+            em uma passada (algoritmo de West).
 
         Retorno
         -------
@@ -171,6 +704,34 @@ class Statistics:
         valores_B = self.dataset[column_b]#extraindo os dados das colunas
 
         n = len(valores_A)#len para saber o tamanho
+
+        buffer_A = self._buffer(column_a)
+        buffer_B = self._buffer(column_b)
+        if weights is not None:#co-momentos ponderados em uma passada
+            if len(valores_B) != n:
+                raise ValueError("As colunas precisam ter o mesmo número de linhas")
+            pesos = self._pesos(weights, n)
+            buffer_pesos = self._buffer_pesos(pesos)
+            if buffer_A is not None and buffer_B is not None and buffer_pesos is not None:
+                total, _, _, c = dende_kernels.co_momentos_ponderados(buffer_A, buffer_B, buffer_pesos, self.threads)
+            else:
+                total, _, _, c = _co_momentos_ponderados(valores_A, valores_B, pesos)
+            return c / _peso_total(total)
+
+        if self.precision == 'stable':#co-momentos combinados ou somas compensadas
+            if buffer_A is not None and buffer_B is not None and len(buffer_A) == len(buffer_B):
+                n, _, _, c = dende_kernels.co_momentos(buffer_A, buffer_B, self.threads)
+                return c / n
+            media_A = dende_kernels.soma_compensada(valores_A) / len(valores_A)
+            media_B = dende_kernels.soma_compensada(valores_B) / len(valores_B)
+            return dende_kernels.soma_compensada(
+                (a - media_A) * (b - media_B) for a, b in zip(valores_A, valores_B)) / n
+
+        if buffer_A is not None and buffer_B is not None and len(buffer_A) == len(buffer_B):
+            media_A = dende_kernels.soma(buffer_A, self.threads) / n
+            media_B = dende_kernels.soma(buffer_B, self.threads) / n
+            return dende_kernels.co_momento(buffer_A, buffer_B, media_A, media_B, self.threads) / n
+
         media_A = sum(valores_A) / len(valores_A)#média
         media_B = sum(valores_B) / len(valores_B)#média
 
@@ -205,11 +766,68 @@ class Statistics:
         set
             Um conjunto com os valores únicos da coluna.
         """
+        coluna, _ = self._multivalorada(column)
+        if coluna is not None:# coluna multivalorada -> itens distintos (não as tuplas)
+            return set(self.absolute_frequency(column))
+
         valores_unicos = set(self.dataset[column])# set -> separa os valores únicos
 
         return valores_unicos
 
-    def absolute_frequency(self, column):
+    def cardinality(self, column, method='exact', precision=None):
+        """
+        Conta os valores distintos de uma coluna.
+
+        Parâmetros
+        ----------
+        column : str
+            O nome da coluna (chave do dicionário do dataset).
+        method : str, opcional
+            'exact' (padrão) conta com um `set`; 'hll' estima com um
+            HyperLogLog, usando poucos KB de memória em qualquer tamanho de
+            coluna. O HyperLogLog é mais lento que o `set` (um hash por
+            valor): serve quando a memória, e não o tempo, é o limite.
+            Colunas multivaloradas são sempre contadas de forma exata, pelo
+            vocabulário de códigos.
+        precision : int, opcional
+            Precisão do HyperLogLog (padrão é 12, erro padrão de ~1.6%).
+
+        Retorno
+        -------
+        int
+            A quantidade (exata ou estimada) de valores distintos.
+        """
+        if method == 'exact' or self._multivalorada(column)[0] is not None:
+            return len(self.itemset(column))
+        if method != 'hll':
+            raise ValueError(f"Método desconhecido: {method}")
+        return self.cardinality_sketch(column, precision).count()
+
+    def cardinality_sketch(self, column, precision=None):
+        """
+        Cria o sketch HyperLogLog de uma coluna.
+
+        Sketches de blocos ou partições diferentes (com a mesma precisão) podem
+        ser combinados com `HyperLogLog.merge` antes da contagem final.
+
+        Parâmetros
+        ----------
+        column : str
+            O nome da coluna (chave do dicionário do dataset).
+        precision : int, opcional
+            Precisão do HyperLogLog (padrão é 12).
+
+        Retorno
+        -------
+        dende_sketches.HyperLogLog
+            O sketch com todos os valores da coluna.
+        """
+        import dende_sketches  # importado só quando um sketch é pedido
+
+        sketch = dende_sketches.HyperLogLog(precision or dende_sketches.PRECISAO_PADRAO)
+        return sketch.update(self.dataset[column])
+
+    def absolute_frequency(self, column, weights=None):
         """
         Calcula a frequência absoluta de cada item em uma coluna.
 
@@ -217,13 +835,25 @@ class Statistics:
         ----------
         column : str
             O nome da coluna (chave do dicionário do dataset).
+        weights : str ou sequence, opcional
+            Pesos das linhas: cada linha soma o seu peso em vez de 1 (ex.:
+            gêneros ponderados por 'track_popularity').
 
         Retorno
         -------
         dict
             Um dicionário onde as chaves são os itens e os valores são
-            suas contagens (frequência absoluta).
+            suas contagens (frequência absoluta). Em colunas multivaloradas
+            (MultiValueColumn), cada item de cada linha é contado.
         """
+        if weights is not None:
+            return self._frequencia_ponderada(column, weights)
+
+        coluna, _ = self._multivalorada(column)
+        if coluna is not None:  # contagem direta sobre os códigos, sem separar textos
+            contagens = self._contar_codigos(column)
+            return {coluna.vocabulary[codigo]: total for codigo, total in enumerate(contagens) if total}
+
         dados = self.dataset[column]
 
         frequencia = {}  # espaço para os valores
@@ -236,7 +866,35 @@ class Statistics:
 
         return frequencia
 
-    def relative_frequency(self, column):
+    def _frequencia_ponderada(self, column, weights):
+        """
+        Soma dos pesos de cada item, em uma passada sobre os códigos de dicionário.
+
+        Em colunas multivaloradas, cada item da linha recebe o peso da linha.
+        Itens cuja soma de pesos é zero ficam de fora, como se as suas linhas
+        tivessem sido repetidas zero vezes.
+        """
+        coluna, linhas = self._multivalorada(column)
+        if coluna is not None:
+            pesos = self._pesos(weights, len(self.dataset[column]))
+            totais = {}  # código -> soma dos pesos
+            for peso, i in zip(pesos, range(len(coluna)) if linhas is None else linhas):
+                for codigo in coluna.row_codes(i):
+                    totais[codigo] = totais.get(codigo, 0.0) + peso
+            return {coluna.vocabulary[codigo]: total for codigo, total in sorted(totais.items()) if total}
+
+        codigos, niveis = self._encode(column)
+        pesos = self._pesos(weights, len(codigos))
+        buffer_pesos = self._buffer_pesos(pesos)
+        if buffer_pesos is not None:
+            totais = dende_kernels.somar_por_codigo(codigos, buffer_pesos, len(niveis))
+        else:
+            totais = [0.0] * len(niveis)
+            for codigo, peso in zip(codigos, pesos):
+                totais[codigo] += peso
+        return {nivel: total for nivel, total in zip(niveis, totais) if total}
+
+    def relative_frequency(self, column, weights=None):
         """
         Calcula a frequência relativa de cada item em uma coluna.
 
@@ -244,15 +902,21 @@ class Statistics:
         ----------
         column : str
             O nome da coluna (chave do dicionário do dataset).
+        weights : str ou sequence, opcional
+            Pesos das linhas: a proporção passa a ser sobre a soma dos pesos.
 
         Retorno
         -------
         dict
             Um dicionário onde as chaves são os itens e os valores são
-            suas proporções (frequência relativa).
+            suas proporções (frequência relativa). Em colunas multivaloradas
+            a proporção é sobre o número de linhas (ex.: fração das faixas
+            de cada gênero), então a soma pode passar de 1.
         """
-        frequencia_absoluta = self.absolute_frequency(column)  # chama a função criada acima para fazer a contagem
+        frequencia_absoluta = self.absolute_frequency(column, weights)  # chama a função criada acima para fazer a contagem
         total = len(self.dataset[column])  # puxa o valor total de itens
+        if weights is not None:  # com pesos, o total é a soma dos pesos
+            total = _peso_total(sum(self._pesos(weights, total)))
         frequencia_relativa = {}  # espaço para as porcentagens
 
         for chave, contagem in frequencia_absoluta.items():  # separa as informações de frequencia absoluta em 2 campos
@@ -261,7 +925,7 @@ class Statistics:
 
         return frequencia_relativa
 
-    def cumulative_frequency(self, column, frequency_method='absolute'):
+    def cumulative_frequency(self, column, frequency_method='absolute', weights=None):
         """
         Calcula a frequência acumulada (absoluta ou relativa) de uma coluna.
 
@@ -274,6 +938,8 @@ class Statistics:
         frequency_method : str, opcional
             O método a ser usado: 'absolute' para contagem acumulada ou
             'relative' para proporção acumulada (padrão é 'absolute').
+        weights : str ou sequence, opcional
+            Pesos das linhas, repassados à frequência absoluta ou relativa.
 
         Retorno
         -------
@@ -282,9 +948,9 @@ class Statistics:
             frequências acumuladas como valores.
         """
         if frequency_method == 'absolute':
-            dados = self.absolute_frequency(column)  # chama a função que conta, caso tenha sido solicitada
+            dados = self.absolute_frequency(column, weights)  # chama a função que conta, caso tenha sido solicitada
         else:
-            dados = self.relative_frequency(column)  # se não, chama a função de porcentagem
+            dados = self.relative_frequency(column, weights)  # se não, chama a função de porcentagem
 
         if column == 'priority':
             ordem = ['baixa', 'media', 'alta']  # força uma ordem especifica caso a coluna trabalhada seja prioridade
@@ -348,7 +1014,7 @@ class Statistics:
 
         return sucessos_ba / total_b
 
-    def quartiles(self, column):
+    def quartiles(self, column, weights=None):
         """
         Calcula os quartis (Q1, Q2 e Q3) de uma coluna.
 
@@ -356,6 +1022,9 @@ class Statistics:
         ----------
         column : str
             O nome da coluna (chave do dicionário do dataset).
+        weights : str ou sequence, opcional
+            Pesos das linhas: os quartis são os pontos em que o peso
+            acumulado chega às frações do total dadas pelo cálculo das metades.
 
         Retorno
         -------
@@ -363,8 +1032,26 @@ class Statistics:
             Um dicionário com os quartis Q1, Q2 (mediana) e Q3.
         """
 
-        # Recebendo os valores do dataset
-        values = sorted(self.dataset[column])
+        if weights is not None:
+            # Mesmo cálculo das metades, sobre os pesos acumulados: se a mediana cai
+            # na fronteira entre dois valores (n par), as metades são [0, W/2) e
+            # [W/2, W); se cai dentro de um valor (n ímpar), o peso de uma linha
+            # média (W/n) em volta da mediana fica fora das duas metades, como o
+            # valor do meio. Q1 e Q3 são os pontos centrais das metades.
+            valores, acumulados, positivos, tolerancia = self._posicao_ponderada(column, weights)
+            total = acumulados[-1]
+
+            def quantil(alvo):
+                k, proximo = _corte_ponderado(acumulados, alvo, tolerancia)
+                return valores[k] if proximo is None else (valores[k] + valores[proximo]) / 2
+
+            fronteira = _corte_ponderado(acumulados, total / 2, tolerancia)[1] is not None
+            excluido = 0.0 if fronteira else total / positivos / 2
+            metade = total / 2 - excluido
+            return {"Q1": quantil(metade / 2), "Q2": quantil(total / 2), "Q3": quantil(total - metade / 2)}
+
+        # Recebendo os valores do dataset (ordenação em cache, compartilhada com a mediana)
+        values = self.sorted_values(column)
         n = len(values)
 
         # Caso a quantidade de valores for igual a zero
@@ -403,7 +1090,7 @@ class Statistics:
 
         return {"Q1": q1, "Q2": q2, "Q3": q3}
 
-    def histogram(self, column, bins):
+    def histogram(self, column, bins, weights=None):
         """
         Gera um histograma baseado em buckets (intervalos).
 
@@ -413,6 +1100,8 @@ class Statistics:
             O nome da coluna (chave do dicionário do dataset).
         bins : int
             Número de buckets (intervalos).
+        weights : str ou sequence, opcional
+            Pesos das linhas: cada bucket soma os pesos dos seus valores.
 
         Retorno
         -------
@@ -422,6 +1111,7 @@ class Statistics:
         """
 
         valores = self.dataset[column]
+        pesos = self._pesos(weights, len(valores)) if weights is not None else None
         menor_valor,  valor_maior = min(valores), max(valores)
         numero_bins = 4
         tamanho_bin = (valor_maior - menor_valor) / numero_bins
@@ -440,7 +1130,7 @@ class Statistics:
             histograma[intervalo] = 0
 
         # Realização da contagem
-        for valor in valores:
+        for i, valor in enumerate(valores):
             indice = int((valor - menor_valor) / tamanho_bin)
 
             # Ajuste para o valor máximo
@@ -449,6 +1139,1176 @@ class Statistics:
 
             # Recupera a chave (tupla) correspondente ao índice para incrementar (Ex: (20.0, 35.0))
             chave_intervalo = (limites[indice], limites[indice + 1])
-            histograma[chave_intervalo] += 1
+            histograma[chave_intervalo] += 1 if pesos is None else pesos[i]
+
+        return histograma
+
+    def sample(self, size, strata=None, seed=None):
+        """
+        Sorteia uma amostra de linhas do dataset.
+
+        Sem `strata`, sorteia `size` índices de linhas sem reposição (custo
+        proporcional ao tamanho da amostra, não ao do dataset). Com `strata`,
+        faz amostragem estratificada com alocação
+        proporcional: cada valor da coluna de estratos recebe uma parte da
+        amostra proporcional ao seu tamanho, arredondada pelo método dos
+        maiores restos (as cotas somam exatamente `size`), sorteada dentro do
+        estrato. Estratos pequenos demais para a sua
+        cota chegar a uma linha podem ficar de fora. Como a alocação é
+        proporcional, as estimativas sobre a amostra não precisam de pesos.
+
+        Parâmetros
+        ----------
+        size : int
+            Tamanho desejado da amostra.
+        strata : str, opcional
+            Coluna usada para estratificar (ex.: 'album_type', 'explicit').
+        seed : int, opcional
+            Semente do gerador aleatório, para amostras reprodutíveis.
+
+        Retorno
+        -------
+        Statistics
+            Uma visão (ver `view`) sobre as linhas sorteadas, na ordem
+            original, com `population_size` igual ao número de linhas do dataset.
+        """
+        import random  # importado só quando uma amostra é pedida
+
+        n = self._numero_linhas()
+        aleatorio = random.Random(seed)
+
+        if strata is None:
+            indices = _sortear(range(n), size, aleatorio)
+        else:
+            grupos = {}  # índices das linhas de cada estrato
+            for i, valor in enumerate(self.dataset[strata]):
+                grupos.setdefault(valor, []).append(i)
+
+            indices = []
+            cotas = _alocacao_proporcional([len(linhas) for linhas in grupos.values()], min(size, n))
+            for linhas, cota in zip(grupos.values(), cotas):
+                indices.extend(_sortear(linhas, cota, aleatorio))
+
+        indices.sort()  # preserva a ordem original das linhas
+        amostra = self.view(array('q', indices))
+        amostra.population_size = n
+        return amostra
+
+    def confidence_interval(self, column, statistic='mean', level=0.95, method='analytic',
+                            resamples=200, seed=None):
+        """
+        Calcula uma estimativa com intervalo de confiança.
+
+        Pensado para objetos criados por `sample`: a resposta aproximada vem
+        da amostra e o cálculo exato continua disponível no objeto original.
+
+        Parâmetros
+        ----------
+        column : str
+            O nome da coluna (chave do dicionário do dataset).
+        statistic : str, opcional
+            'mean' (padrão), 'median', 'variance', 'stdev', 'Q1', 'Q2', 'Q3'
+            ou 'relative_frequency'.
+        level : float, opcional
+            Nível de confiança (padrão é 0.95).
+        method : str, opcional
+            'analytic' (aproximação normal, disponível para 'mean' e
+            'relative_frequency') ou 'bootstrap' (percentis das reamostras).
+        resamples : int, opcional
+            Quantidade de reamostras do bootstrap (padrão é 200).
+        seed : int, opcional
+            Semente do bootstrap.
+
+        Retorno
+        -------
+        dict
+            {'estimate', 'lower', 'upper', 'level', 'method'}. Para
+            'relative_frequency', um dicionário desses por categoria.
+        """
+        valores = self.dataset[column]
+        n = len(valores)
+
+        # Correção para população finita (amostras sem reposição)
+        correcao = 1.0
+        if self.population_size and self.population_size > 1:
+            correcao = max(0.0, (self.population_size - n) / (self.population_size - 1)) ** 0.5
+
+        def intervalo(estimativa, inferior, superior, metodo):
+            return {'estimate': estimativa, 'lower': inferior, 'upper': superior,
+                    'level': level, 'method': metodo}
+
+        if method == 'analytic':
+            from statistics import NormalDist  # importado só quando necessário
+            z = NormalDist().inv_cdf(0.5 + level / 2)
+
+            if statistic == 'mean':
+                media = self.mean(column)
+                desvio_amostral = (self.variance(column) * n / (n - 1)) ** 0.5 if n > 1 else 0.0
+                margem = z * desvio_amostral / n ** 0.5 * correcao
+                return intervalo(media, media - margem, media + margem, method)
+
+            if statistic == 'relative_frequency':
+                resultado = {}
+                for chave, p in self.relative_frequency(column).items():
+                    margem = z * (p * (1 - p) / n) ** 0.5 * correcao
+                    resultado[chave] = intervalo(p, max(0.0, p - margem), min(1.0, p + margem), method)
+                return resultado
+
+            raise ValueError(f"Intervalo analítico não disponível para '{statistic}'; use method='bootstrap'")
+
+        if method != 'bootstrap':
+            raise ValueError(f"Método desconhecido: {method}")
+
+        def calcular(stats):
+            if statistic in ('Q1', 'Q2', 'Q3'):
+                return stats.quartiles(column)[statistic]
+            return getattr(stats, statistic)(column)
+
+        if statistic == 'relative_frequency':
+            raise ValueError("Use method='analytic' para 'relative_frequency'")
+
+        import random
+
+        aleatorio = random.Random(seed)
+        estimativas = sorted(
+            calcular(Statistics({column: aleatorio.choices(valores, k=n)}, backend='python'))
+            for _ in range(resamples)
+        )
+        alfa = (1 - level) / 2
+        inferior = estimativas[int(alfa * (resamples - 1))]
+        superior = estimativas[int(round((1 - alfa) * (resamples - 1)))]
+        return intervalo(calcular(self), inferior, superior, method)
+
+
+    def cooccurrence(self, column):
+        """
+        Conta quantas linhas têm cada par de itens de uma coluna multivalorada.
+
+        Parâmetros
+        ----------
+        column : str
+            O nome de uma coluna MultiValueColumn (ex.: 'artist_genres').
+
+        Retorno
+        -------
+        dict
+            Um dicionário {(item_a, item_b): contagem}, com cada par não
+            ordenado aparecendo uma única vez.
+        """
+        coluna, linhas = self._multivalorada(column)
+        if coluna is None:
+            raise ValueError(f"A coluna '{column}' não é multivalorada")
+
+        tamanho = len(coluna.vocabulary)
+        contagens = {}  # chave empacotada: menor_codigo * tamanho + maior_codigo
+        for i in (range(len(coluna)) if linhas is None else linhas):
+            codigos = sorted(set(coluna.row_codes(i)))
+            for a in range(len(codigos)):
+                base = codigos[a] * tamanho
+                for b in range(a + 1, len(codigos)):
+                    chave = base + codigos[b]
+                    contagens[chave] = contagens.get(chave, 0) + 1
+
+        vocabulario = coluna.vocabulary
+        return {(vocabulario[chave // tamanho], vocabulario[chave % tamanho]): total
+                for chave, total in contagens.items()}
+
+    def group_by(self, column, value_column, statistic='mean'):
+        """
+        Calcula uma estatística de `value_column` para cada categoria de `column`.
+
+        Em colunas multivaloradas, cada linha entra no grupo de cada um dos
+        seus itens (ex.: popularidade média por gênero). Os grupos são visões
+        (ver `view`) sobre as linhas, sem cópia das colunas.
+
+        Parâmetros
+        ----------
+        column : str
+            A coluna que define os grupos.
+        value_column : str
+            A coluna sobre a qual a estatística é calculada.
+        statistic : str, opcional
+            O nome de um método de Statistics que recebe uma coluna
+            (padrão é 'mean').
+
+        Retorno
+        -------
+        dict
+            Um dicionário {categoria: resultado}.
+        """
+        grupos = {}  # categoria (ou código) -> índices das linhas
+        coluna, linhas = self._multivalorada(column)
+        if coluna is not None:
+            origem = range(len(coluna)) if linhas is None else linhas
+            for posicao, i in enumerate(origem):
+                for codigo in set(coluna.row_codes(i)):
+                    grupos.setdefault(codigo, array('q')).append(posicao)
+            grupos = {coluna.vocabulary[c]: idx for c, idx in grupos.items()}
+        else:
+            for i, valor in enumerate(self.dataset[column]):
+                grupos.setdefault(valor, array('q')).append(i)
+
+        return {categoria: getattr(self.view(indices), statistic)(value_column)
+                for categoria, indices in grupos.items()}
+
+    def _numerica(self, column):
+        """Indica se todos os valores da coluna são números (int ou float)."""
+        if self._buffer(column) is not None:
+            return True
+        return all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in self.dataset[column])
+
+    def rank(self, column):
+        """
+        Calcula os postos (ranks) de uma coluna, com a média dos postos nos empates.
+
+        O resultado é calculado uma vez por coluna e reaproveitado por
+        Spearman, Kendall e pelas matrizes de correlação.
+
+        Parâmetros
+        ----------
+        column : str
+            O nome da coluna (chave do dicionário do dataset).
+
+        Retorno
+        -------
+        array
+            Os postos (1 a n), na ordem das linhas.
+        """
+        self._conferir(column)
+        if column not in self._ranks:
+            self._ranks[column] = _postos_medios(self.dataset[column], self.sort_order(column))
+        return self._ranks[column]
+
+    def _encode(self, column):
+        """Códigos de dicionário (array de inteiros) e níveis de uma coluna, em cache."""
+        self._conferir(column)
+        if column not in self._codes:
+            niveis = {}  # valor -> código, na ordem de primeira aparição
+            codigos = array('i', (niveis.setdefault(v, len(niveis)) for v in self.dataset[column]))
+            self._codes[column] = (codigos, list(niveis))
+        return self._codes[column]
+
+    def covariance_matrix(self, columns):
+        """
+        Calcula a matriz de covariâncias (co-momentos) entre várias colunas.
+
+        Os desvios de cada coluna são calculados uma única vez e compartilhados
+        por todos os pares; com o backend NumPy a matriz inteira sai de um único
+        produto de matrizes.
 
-        return histograma
\ No newline at end of file
+        Parâmetros
+        ----------
+        columns : list[str]
+            As colunas numéricas (todas com o mesmo número de linhas).
+
+        Retorno
+        -------
+        dict
+            Um dicionário {coluna_a: {coluna_b: covariância}}.
+        """
+        return self._matriz_co_momentos(columns, {c: self.dataset[c] for c in columns},
+                                        [self._buffer(c) for c in columns])
+
+    def _matriz_co_momentos(self, columns, valores, buffers):
+        n = len(valores[columns[0]])
+        if any(len(valores[c]) != n for c in columns):
+            raise ValueError("As colunas precisam ter o mesmo número de linhas")
+
+        if all(b is not None for b in buffers):
+            matriz = dende_kernels.matriz_co_momentos(buffers)
+            return {a: {b: float(matriz[i][j]) / n for j, b in enumerate(columns)}
+                    for i, a in enumerate(columns)}
+
+        somar = dende_kernels.soma_compensada if self.precision == 'stable' else sum
+        desvios = {}
+        for c in columns:  # desvios calculados uma vez por coluna
+            media = somar(valores[c]) / n
+            desvios[c] = [x - media for x in valores[c]]
+
+        resultado = {c: {} for c in columns}
+        for i, a in enumerate(columns):
+            for b in columns[i:]:
+                resultado[a][b] = resultado[b][a] = somar(map(mul, desvios[a], desvios[b])) / n
+        return resultado
+
+    def correlation_matrix(self, columns, method='pearson'):
+        """
+        Calcula a matriz de correlações entre várias colunas numéricas.
+
+        Parâmetros
+        ----------
+        columns : list[str]
+            As colunas (todas com o mesmo número de linhas).
+        method : str, opcional
+            'pearson' (padrão), 'spearman' (Pearson sobre os postos) ou
+            'kendall' (tau-b). Os postos de cada coluna são calculados uma
+            única vez e reaproveitados em todos os pares.
+
+        Retorno
+        -------
+        dict
+            Um dicionário {coluna_a: {coluna_b: correlação}}, entre -1 e 1.
+        """
+        if method == 'kendall':
+            postos = {c: self.rank(c) for c in columns}
+            resultado = {c: {c: 1.0} for c in columns}
+            for i, a in enumerate(columns):
+                for b in columns[i + 1:]:
+                    resultado[a][b] = resultado[b][a] = _kendall_tau_b(postos[a], postos[b])
+            return resultado
+
+        if method == 'spearman':
+            postos = {c: self.rank(c) for c in columns}
+            buffers = [dende_kernels.criar_buffer(postos[c], copiar=False) if self.backend != 'python' else None
+                       for c in columns]
+            covariancias = self._matriz_co_momentos(columns, postos, buffers)
+        elif method == 'pearson':
+            covariancias = self.covariance_matrix(columns)
+        else:
+            raise ValueError(f"Método desconhecido: {method}")
+
+        desvios = {c: covariancias[c][c] ** 0.5 for c in columns}
+        resultado = {c: {} for c in columns}
+        for a in columns:
+            for b in columns:
+                denominador = desvios[a] * desvios[b]
+                resultado[a][b] = covariancias[a][b] / denominador if denominador else 0.0
+        return resultado
+
+    def correlation(self, column_a, column_b, method='pearson'):
+        """
+        Calcula a correlação entre duas colunas numéricas.
+
+        Parâmetros
+        ----------
+        column_a : str
+            O nome da primeira coluna (X).
+        column_b : str
+            O nome da segunda coluna (Y).
+        method : str, opcional
+            'pearson' (padrão), 'spearman' ou 'kendall'.
+
+        Retorno
+        -------
+        float
+            O coeficiente de correlação, entre -1 e 1.
+        """
+        return self.correlation_matrix([column_a, column_b], method)[column_a][column_b]
+
+    def _contar_combinacoes(self, columns):
+        """
+        Contagens conjuntas de várias colunas, em cache.
+
+        Cada linha vira uma chave inteira empacotada a partir dos códigos de
+        dicionário das colunas (base mista), e as chaves são contadas em uma
+        única passada. Colunas multivaloradas são explodidas: cada item da
+        linha gera a sua própria chave (com duas ou mais dessas colunas, uma
+        chave por combinação de itens), como em `absolute_frequency`.
+
+        Retorno
+        -------
+        tuple[dict, list[list], list[int]]
+            ({chave empacotada: contagem} só das combinações observadas,
+            níveis de cada coluna, quantidade de níveis de cada coluna).
+        """
+        chave_cache = tuple(columns)
+        self._conferir(*columns)
+        if chave_cache not in self._joint:
+            codificadas, multivaloradas = [], []
+            for c in columns:
+                coluna, linhas = self._multivalorada(c)
+                multivaloradas.append(coluna is not None)
+                if coluna is None:
+                    codificadas.append(self._encode(c))
+                else:  # os códigos de cada linha, explodidos abaixo
+                    linhas = range(len(coluna)) if linhas is None else linhas
+                    codificadas.append(([coluna.row_codes(i) for i in linhas], coluna.vocabulary))
+            n = len(codificadas[0][0])
+            if any(len(codigos) != n for codigos, _ in codificadas):
+                raise ValueError("As colunas precisam ter o mesmo número de linhas")
+            if any(multivaloradas):
+                codificadas = _explodir_linhas(codificadas, multivaloradas)
+                n = len(codificadas[0][0])
+            larguras = [len(niveis) for _, niveis in codificadas]
+            espaco = 1
+            for largura in larguras:
+                espaco *= largura
+            if espaco >= 1 << 63:
+                raise ValueError("Combinações demais para empacotar em uma chave de 64 bits")
+
+            if self.backend != 'python' and n and dende_kernels.disponivel():
+                chaves, totais = dende_kernels.contar_combinacoes([c for c, _ in codificadas], larguras)
+                contagens = dict(zip(chaves, totais))
+            else:
+                chaves = codificadas[0][0]
+                for (codigos, _), largura in zip(codificadas[1:], larguras[1:]):
+                    chaves = [k * largura + c for k, c in zip(chaves, codigos)]
+                if espaco <= max(n, 1 << 16):  # espaço pequeno: contagem densa, indexada pela chave
+                    densa = [0] * espaco
+                    for k in chaves:
+                        densa[k] += 1
+                    contagens = {k: total for k, total in enumerate(densa) if total}
+                else:  # espaço grande e esparso: apenas as combinações observadas
+                    contagens = {}
+                    for k in chaves:
+                        contagens[k] = contagens.get(k, 0) + 1
+
+            self._joint[chave_cache] = (contagens, [niveis for _, niveis in codificadas], larguras)
+        return self._joint[chave_cache]
+
+    def joint_frequency(self, columns):
+        """
+        Calcula a frequência absoluta conjunta de várias colunas.
+
+        Ex.: stats.joint_frequency(['album_type', 'explicit']) conta as faixas
+        de cada combinação (tipo de álbum, explícita).
+
+        Parâmetros
+        ----------
+        columns : list[str]
+            As colunas (todas com o mesmo número de linhas).
+
+        Retorno
+        -------
+        dict
+            Um dicionário {tupla de valores: contagem} apenas com as
+            combinações que aparecem nos dados. Em colunas multivaloradas,
+            cada item da linha conta separadamente.
+        """
+        contagens, niveis, larguras = self._contar_combinacoes(columns)
+        return {_desempacotar(chave, niveis, larguras): total for chave, total in sorted(contagens.items())}
+
+    def crosstab(self, rows, columns, sparse=False, margins=True):
+        """
+        Constrói uma tabela cruzada (contingência) entre grupos de colunas.
+
+        Ex.: stats.crosstab('album_type', 'explicit') ou
+        stats.crosstab(['album_type', 'explicit'], 'album_total_tracks').
+
+        Parâmetros
+        ----------
+        rows : str ou list[str]
+            A(s) coluna(s) que formam as linhas da tabela.
+        columns : str ou list[str]
+            A(s) coluna(s) que formam as colunas da tabela.
+        sparse : bool, opcional
+            Se True, 'counts' traz apenas as células não nulas, em um
+            dicionário {(linha, coluna): contagem}; se False (padrão), uma
+            lista de listas densa.
+        margins : bool, opcional
+            Se True (padrão), inclui os totais das linhas, das colunas e o geral.
+
+        Retorno
+        -------
+        dict
+            {'rows': níveis das linhas, 'columns': níveis das colunas,
+            'counts': contagens} e, com margins, 'row_totals',
+            'column_totals' e 'total'. Com várias colunas em um eixo, os
+            níveis desse eixo são tuplas, e só entram as combinações que
+            aparecem nos dados. Em colunas multivaloradas, cada item da linha
+            conta separadamente (os totais somam itens, não linhas).
+        """
+        colunas_linhas = [rows] if isinstance(rows, str) else list(rows)
+        colunas_colunas = [columns] if isinstance(columns, str) else list(columns)
+        chave_cache = (tuple(colunas_linhas), tuple(colunas_colunas), sparse, margins)
+        self._conferir(*colunas_linhas, *colunas_colunas)
+        if chave_cache in self._contingency:
+            return self._contingency[chave_cache]
+
+        contagens, niveis, larguras = self._contar_combinacoes(colunas_linhas + colunas_colunas)
+        k = len(colunas_linhas)
+        largura_colunas = 1
+        for largura in larguras[k:]:
+            largura_colunas *= largura
+
+        # Posição de cada chave de linha/coluna observada, na ordem dos códigos
+        celulas = [divmod(chave, largura_colunas) for chave in contagens]
+        posicao_linha = {chave: i for i, chave in enumerate(sorted({a for a, _ in celulas}))}
+        posicao_coluna = {chave: j for j, chave in enumerate(sorted({b for _, b in celulas}))}
+
+        def niveis_eixo(posicoes, niveis_eixo, larguras_eixo):
+            if len(niveis_eixo) == 1:
+                return [niveis_eixo[0][chave] for chave in posicoes]
+            return [_desempacotar(chave, niveis_eixo, larguras_eixo) for chave in posicoes]
+
+        tabela = {
+            'rows': niveis_eixo(posicao_linha, niveis[:k], larguras[:k]),
+            'columns': niveis_eixo(posicao_coluna, niveis[k:], larguras[k:]),
+        }
+        if sparse:
+            tabela['counts'] = {
+                (tabela['rows'][posicao_linha[a]], tabela['columns'][posicao_coluna[b]]): total
+                for (a, b), total in sorted(zip(celulas, contagens.values()))
+            }
+        else:
+            densa = [[0] * len(posicao_coluna) for _ in posicao_linha]
+            for (a, b), total in zip(celulas, contagens.values()):
+                densa[posicao_linha[a]][posicao_coluna[b]] = total
+            tabela['counts'] = densa
+
+        if margins:
+            totais_linhas = [0] * len(posicao_linha)
+            totais_colunas = [0] * len(posicao_coluna)
+            for (a, b), total in zip(celulas, contagens.values()):
+                totais_linhas[posicao_linha[a]] += total
+                totais_colunas[posicao_coluna[b]] += total
+            tabela['row_totals'] = totais_linhas
+            tabela['column_totals'] = totais_colunas
+            tabela['total'] = sum(totais_linhas)
+
+        self._contingency[chave_cache] = tabela
+        return tabela
+
+    def contingency_table(self, column_a, column_b):
+        """
+        Constrói a tabela de contingência (contagens conjuntas) de duas colunas.
+
+        Atalho para `crosstab(column_a, column_b)`: as colunas são codificadas
+        uma vez (códigos de dicionário) e a tabela fica em cache para o par.
+
+        Parâmetros
+        ----------
+        column_a : str
+            A coluna das linhas da tabela.
+        column_b : str
+            A coluna das colunas da tabela.
+
+        Retorno
+        -------
+        dict
+            {'rows': níveis de column_a, 'columns': níveis de column_b,
+            'counts': lista de listas com as contagens}, além das margens
+            (ver `crosstab`).
+        """
+        return self.crosstab(column_a, column_b)
+
+    def chi_square(self, column_a, column_b):
+        """
+        Calcula a estatística qui-quadrado de independência entre duas colunas categóricas.
+
+        Retorno
+        -------
+        dict
+            {'chi2': estatística, 'dof': graus de liberdade, 'n': total de linhas}.
+        """
+        contingencia = self.contingency_table(column_a, column_b)
+        tabela = contingencia['counts']
+        totais_linhas = contingencia['row_totals']
+        totais_colunas = contingencia['column_totals']
+        n = contingencia['total']
+
+        qui2 = 0.0
+        for i, linha in enumerate(tabela):
+            for j, observado in enumerate(linha):
+                esperado = totais_linhas[i] * totais_colunas[j] / n
+                if esperado:
+                    qui2 += (observado - esperado) ** 2 / esperado
+
+        graus = (len(totais_linhas) - 1) * (len(totais_colunas) - 1)
+        return {'chi2': qui2, 'dof': graus, 'n': n}
+
+    def cramers_v(self, column_a, column_b):
+        """
+        Calcula o V de Cramér (associação entre colunas categóricas, de 0 a 1).
+
+        Retorno
+        -------
+        float
+            0 indica independência e 1 associação perfeita.
+        """
+        resultado = self.chi_square(column_a, column_b)
+        tabela = self.contingency_table(column_a, column_b)
+        k = min(len(tabela['rows']), len(tabela['columns'])) - 1
+        if k <= 0 or resultado['n'] == 0:
+            return 0.0
+        return min(1.0, (resultado['chi2'] / (resultado['n'] * k)) ** 0.5)  # o arredondamento pode passar de 1
+
+    def correlation_ratio(self, categorical, numeric):
+        """
+        Calcula a razão de correlação (eta) entre uma coluna categórica e uma numérica.
+
+        É a raiz da fração da variância de `numeric` explicada pelas médias de
+        cada categoria: 0 quando todas as categorias têm a mesma média e 1
+        quando os valores são constantes dentro de cada categoria. As somas
+        por categoria saem de uma passada sobre os códigos de dicionário.
+
+        Parâmetros
+        ----------
+        categorical : str
+            A coluna categórica (os grupos).
+        numeric : str
+            A coluna numérica.
+
+        Retorno
+        -------
+        float
+            A razão de correlação, de 0 a 1.
+        """
+        codigos, niveis = self._encode(categorical)
+        valores = self.dataset[numeric]
+        n = len(valores)
+        if len(codigos) != n:
+            raise ValueError("As colunas precisam ter o mesmo número de linhas")
+        variancia = self.variance(numeric)
+        if not variancia:  # coluna vazia ou constante: nada a explicar
+            return 0.0
+
+        buffer = self._buffer(numeric)
+        if buffer is not None:
+            somas = dende_kernels.somar_por_codigo(codigos, buffer, len(niveis))
+        else:
+            somas = [0.0] * len(niveis)
+            for codigo, valor in zip(codigos, valores):
+                somas[codigo] += valor
+        contagens = [0] * len(niveis)
+        for codigo in codigos:
+            contagens[codigo] += 1
+
+        media = sum(somas) / n
+        entre_grupos = sum(c * (s / c - media) ** 2 for s, c in zip(somas, contagens) if c)
+        return min(1.0, (entre_grupos / (n * variancia)) ** 0.5)
+
+    def association_matrix(self, columns, method='pearson'):
+        """
+        Calcula a matriz de associação entre várias colunas.
+
+        Pares de colunas numéricas usam a correlação `method` (calculada em
+        uma única matriz); pares de uma coluna numérica com uma categórica
+        usam a razão de correlação (`correlation_ratio`), e pares de colunas
+        categóricas, o V de Cramér.
+
+        Parâmetros
+        ----------
+        columns : list[str]
+            As colunas (todas com o mesmo número de linhas).
+        method : str, opcional
+            Correlação usada nos pares numéricos (padrão é 'pearson').
+
+        Retorno
+        -------
+        dict
+            Um dicionário {coluna_a: {coluna_b: associação}}.
+        """
+        numericas = [c for c in columns if self._numerica(c)]
+        correlacoes = self.correlation_matrix(numericas, method) if numericas else {}
+
+        resultado = {c: {} for c in columns}
+        for i, a in enumerate(columns):
+            for b in columns[i:]:
+                if a in correlacoes and b in correlacoes:
+                    valor = correlacoes[a][b]
+                elif a == b:
+                    valor = 1.0
+                elif a in correlacoes:
+                    valor = self.correlation_ratio(b, a)
+                elif b in correlacoes:
+                    valor = self.correlation_ratio(a, b)
+                else:
+                    valor = self.cramers_v(a, b)
+                resultado[a][b] = resultado[b][a] = valor
+        return resultado
+
+    def _limites_ordenados(self, column, inferior, superior):
+        """
+        Índices das linhas com valor < inferior ou > superior.
+
+        Como os valores estão ordenados, esses valores formam o começo e o fim
+        da ordenação; os limites são achados por busca binária.
+        """
+        ordenados = self.sorted_values(column)
+        ordem = self.sort_order(column)
+        inicio = bisect_left(ordenados, inferior)
+        fim = bisect_right(ordenados, superior)
+        indices = array('q', sorted(ordem[:inicio] + ordem[fim:]))
+        return indices
+
+    def iqr_outliers(self, column, k=1.5):
+        """
+        Identifica outliers pelas cercas do intervalo interquartil (IQR).
+
+        São outliers os valores abaixo de Q1 - k * IQR ou acima de Q3 + k * IQR.
+
+        Parâmetros
+        ----------
+        column : str
+            O nome da coluna (chave do dicionário do dataset).
+        k : float, opcional
+            Multiplicador do IQR (padrão é 1.5).
+
+        Retorno
+        -------
+        array
+            Um array('q') com os índices das linhas consideradas outliers.
+        """
+        quartis = self.quartiles(column)
+        iqr = quartis["Q3"] - quartis["Q1"]
+        return self._limites_ordenados(column, quartis["Q1"] - k * iqr, quartis["Q3"] + k * iqr)
+
+    def zscore_outliers(self, column, threshold=3.0):
+        """
+        Identifica outliers pelo escore-z: |x - média| / desvio padrão > threshold.
+
+        Parâmetros
+        ----------
+        column : str
+            O nome da coluna (chave do dicionário do dataset).
+        threshold : float, opcional
+            Limite do escore-z (padrão é 3.0).
+
+        Retorno
+        -------
+        array
+            Um array('q') com os índices das linhas consideradas outliers.
+        """
+        media = self.mean(column)
+        desvio = self.stdev(column)
+        if not desvio:
+            return array('q')
+        margem = threshold * desvio
+        return self._limites_ordenados(column, media - margem, media + margem)
+
+    def mad(self, column, scale=1.0):
+        """
+        Calcula o desvio absoluto mediano (MAD): a mediana de |x - mediana|.
+
+        Com os valores ordenados, os desvios à esquerda da mediana decrescem e
+        os da direita crescem; a mediana dos desvios sai de uma intercalação
+        dessas duas sequências, sem uma nova ordenação.
+
+        Parâmetros
+        ----------
+        column : str
+            O nome da coluna (chave do dicionário do dataset).
+        scale : float, opcional
+            Fator multiplicativo (use 1.4826 para estimar o desvio padrão em
+            dados normais). Padrão é 1.0.
+
+        Retorno
+        -------
+        float
+            O MAD da coluna.
+        """
+        ordenados = self.sorted_values(column)
+        n = len(ordenados)
+        if n == 0:
+            return None
+        mediana = self.median(column)
+
+        # Intercala os desvios da esquerda (do centro para o início) e da direita
+        esquerda = bisect_left(ordenados, mediana) - 1
+        direita = esquerda + 1
+        alvo = (n - 1) // 2, n // 2  # posições centrais da sequência de desvios
+        desvios_centrais = []
+        for posicao in range(alvo[1] + 1):
+            if esquerda >= 0 and (direita >= n or mediana - ordenados[esquerda] <= ordenados[direita] - mediana):
+                desvio = mediana - ordenados[esquerda]
+                esquerda -= 1
+            else:
+                desvio = ordenados[direita] - mediana
+                direita += 1
+            if posicao in alvo:
+                desvios_centrais.append(desvio)
+
+        return scale * sum(desvios_centrais) / len(desvios_centrais)
+
+    def trimmed_mean(self, column, proportion=0.1):
+        """
+        Calcula a média aparada: descarta `proportion` dos valores em cada extremo.
+
+        Parâmetros
+        ----------
+        column : str
+            O nome da coluna (chave do dicionário do dataset).
+        proportion : float, opcional
+            Fração descartada em cada extremo, entre 0 e 0.5 (padrão é 0.1).
+
+        Retorno
+        -------
+        float
+            A média dos valores centrais.
+        """
+        ordenados = self.sorted_values(column)
+        n = len(ordenados)
+        corte = _corte_extremos(n, proportion)
+        centrais = ordenados[corte:n - corte]
+        return sum(centrais) / len(centrais)
+
+    def winsorized_mean(self, column, proportion=0.1):
+        """
+        Calcula a média winsorizada: os valores em cada extremo (`proportion`
+        deles) são substituídos pelo valor mais próximo que não foi cortado.
+
+        Parâmetros
+        ----------
+        column : str
+            O nome da coluna (chave do dicionário do dataset).
+        proportion : float, opcional
+            Fração substituída em cada extremo, entre 0 e 0.5 (padrão é 0.1).
+
+        Retorno
+        -------
+        float
+            A média winsorizada.
+        """
+        ordenados = self.sorted_values(column)
+        n = len(ordenados)
+        corte = _corte_extremos(n, proportion)
+        soma = sum(ordenados[corte:n - corte])
+        soma += corte * (ordenados[corte] + ordenados[n - corte - 1])
+        return soma / n
+
+def _alocacao_proporcional(tamanhos, total):
+    """
+    Divide `total` entre grupos proporcionalmente aos seus tamanhos.
+
+    Cada grupo recebe a parte inteira da sua cota exata, e as unidades que
+    sobram vão para os maiores restos (nos empates, para o primeiro grupo),
+    de modo que as cotas somam exatamente `total`. As contas são inteiras.
+    """
+    n = sum(tamanhos)
+    partes = [divmod(total * tamanho, n) for tamanho in tamanhos]
+    cotas = [inteira for inteira, _ in partes]
+    sobra = total - sum(cotas)
+    for i in sorted(range(len(partes)), key=lambda i: -partes[i][1])[:sobra]:
+        cotas[i] += 1
+    return cotas
+
+
+def _sortear(itens, k, aleatorio):
+    """
+    Sorteia até k itens sem reposição.
+
+    Sequências de tamanho conhecido (range, listas) usam `random.sample`, que
+    custa O(k); os demais iteráveis passam pelo reservatório.
+    """
+    if hasattr(itens, '__len__') and hasattr(itens, '__getitem__'):
+        return aleatorio.sample(itens, min(k, len(itens)))
+    return _reservatorio(itens, k, aleatorio)
+
+
+def _reservatorio(itens, k, aleatorio):
+    """
+    Amostragem por reservatório (algoritmo R): sorteia k itens de um iterável
+    em uma única passada, sem precisar conhecer o tamanho total.
+    """
+    reservatorio = []
+    for i, item in enumerate(itens):
+        if i < k:
+            reservatorio.append(item)
+        else:
+            j = aleatorio.randint(0, i)
+            if j < k:
+                reservatorio[j] = item
+    return reservatorio
+
+
+def _postos_medios(valores, ordem):
+    """Postos de 1 a n, com a média dos postos para valores empatados (`ordem` é a ordenação das linhas)."""
+    postos = array('d', bytes(8 * len(valores)))
+    i = 0
+    while i < len(ordem):
+        j = i
+        while j + 1 < len(ordem) and valores[ordem[j + 1]] == valores[ordem[i]]:
+            j += 1
+        posto = (i + j) / 2 + 1  # média dos postos i+1 .. j+1
+        for k in range(i, j + 1):
+            postos[ordem[k]] = posto
+        i = j + 1
+    return postos
+
+
+def _pares_empatados(valores_ordenados):
+    """Quantidade de pares com valores iguais em uma sequência ordenada."""
+    total = 0
+    seguidos = 1
+    for anterior, atual in zip(valores_ordenados, valores_ordenados[1:]):
+        if atual == anterior:
+            seguidos += 1
+        else:
+            total += seguidos * (seguidos - 1) // 2
+            seguidos = 1
+    return total + seguidos * (seguidos - 1) // 2
+
+
+def _contar_inversoes(valores):
+    """
+    Ordena `valores` (merge sort de baixo para cima) e conta as inversões,
+    isto é, os pares i < j com valores[i] > valores[j]. O(n log n).
+    """
+    valores = list(valores)
+    n = len(valores)
+    inversoes = 0
+    largura = 1
+    auxiliar = [None] * n
+    while largura < n:
+        for inicio in range(0, n, 2 * largura):
+            meio = min(inicio + largura, n)
+            fim = min(inicio + 2 * largura, n)
+            i, j, k = inicio, meio, inicio
+            while i < meio and j < fim:
+                if valores[j] < valores[i]:
+                    auxiliar[k] = valores[j]
+                    inversoes += meio - i
+                    j += 1
+                else:
+                    auxiliar[k] = valores[i]
+                    i += 1
+                k += 1
+            auxiliar[k:fim] = valores[i:meio] if i < meio else valores[j:fim]
+        valores, auxiliar = auxiliar, valores
+        largura *= 2
+    return inversoes, valores
+
+
+def _kendall_tau_b(x, y):
+    """Tau-b de Kendall pelo algoritmo de Knight (O(n log n))."""
+    n = len(x)
+    pares = sorted(zip(x, y))
+    total = n * (n - 1) // 2
+    empates_x = _pares_empatados([a for a, _ in pares])
+    empates_xy = _pares_empatados(pares)
+    discordantes, y_ordenado = _contar_inversoes([b for _, b in pares])
+    empates_y = _pares_empatados(y_ordenado)
+
+    denominador = ((total - empates_x) * (total - empates_y)) ** 0.5
+    if denominador == 0:
+        return 0.0
+    return (total - empates_x - empates_y + empates_xy - 2 * discordantes) / denominador
+
+
+def _converter_pesos(valores):
+    """Converte uma coluna de pesos em um array('d') (sem cópia se já for um) e valida os valores."""
+    if isinstance(valores, array) and valores.typecode == 'd':
+        pesos = valores
+    else:
+        try:
+            pesos = array('d', valores)
+        except TypeError:
+            raise ValueError("Os pesos devem ser números, sem valores nulos") from None
+    if pesos and min(pesos) < 0:
+        raise ValueError("Os pesos não podem ser negativos")
+    return pesos
+
+
+def _peso_total(total):
+    """Valida a soma dos pesos (divisor das estatísticas ponderadas)."""
+    if not total > 0:
+        raise ValueError("A soma dos pesos deve ser positiva")
+    return total
+
+
+def _corte_ponderado(acumulados, alvo, tolerancia):
+    """
+    Acha onde o peso acumulado chega a `alvo` em uma ordenação ponderada.
+
+    Retorna (k, proximo): `k` é a posição do valor em que o alvo cai e
+    `proximo` é None quando o alvo fica dentro do peso de k, ou a posição do
+    próximo valor com peso quando o alvo cai exatamente na fronteira entre os
+    dois (o quantil é então a média dos dois valores). Como só as proporções
+    importam, pesos iguais reproduzem o resultado sem pesos.
+    """
+    fim = len(acumulados)
+    k = bisect_left(acumulados, alvo - tolerancia)
+    if k < fim and acumulados[k] <= tolerancia:  # alvo no zero: primeiro valor com peso
+        k = bisect_right(acumulados, tolerancia)
+    k = min(k, fim - 1)
+    if acumulados[k] > alvo + tolerancia:
+        return k, None
+    proximo = bisect_right(acumulados, acumulados[k] + tolerancia, k + 1)  # pula pesos zero
+    return (k, proximo) if proximo < fim else (k, None)
+
+
+def _momentos_ponderados(valores, pesos):
+    """
+    Momentos ponderados (W, media, m2) em uma única passada (algoritmo de West).
+
+    A média é atualizada a cada valor e m2 acumula peso * desvio * novo desvio,
+    sem a subtração de somas grandes do cálculo ingênuo.
+    """
+    total = media = m2 = 0.0
+    for x, peso in zip(valores, pesos):
+        if peso:
+            total += peso
+            delta = x - media
+            media += delta * peso / total
+            m2 += peso * delta * (x - media)
+    return total, media, m2
+
+
+def _co_momentos_ponderados(valores_a, valores_b, pesos):
+    """Co-momentos ponderados (W, media_a, media_b, c) em uma única passada (West)."""
+    total = media_a = media_b = c = 0.0
+    for a, b, peso in zip(valores_a, valores_b, pesos):
+        if peso:
+            total += peso
+            delta_a = a - media_a
+            media_a += delta_a * peso / total
+            media_b += (b - media_b) * peso / total
+            c += peso * delta_a * (b - media_b)
+    return total, media_a, media_b, c
+
+
+def _desempacotar(chave, niveis, larguras):
+    """Converte uma chave empacotada de volta na tupla de valores das colunas."""
+    valores = []
+    for niveis_coluna, largura in zip(reversed(niveis), reversed(larguras)):
+        chave, codigo = divmod(chave, largura)
+        valores.append(niveis_coluna[codigo])
+    return tuple(reversed(valores))
+
+
+def _corte_extremos(n, proporcao):
+    """Quantidade de valores cortados em cada extremo (sempre deixando ao menos um valor)."""
+    if not 0 <= proporcao < 0.5:
+        raise ValueError("A proporção deve estar entre 0 e 0.5")
+    if n == 0:
+        raise ValueError("Coluna vazia")
+    return min(int(n * proporcao), (n - 1) // 2)
+
+
+# INTERFACE DE LINHA DE COMANDO
+#
+#   python -m dende_statistics analyze "spotify_data clean.csv" --columns track_popularity artist_followers
+#
+# Os módulos pesados (leitura do CSV, NumPy, sketches) só são importados quando
+# a consulta precisa deles. As colunas numéricas ficam em cache como arrays
+# binários no diretório de checkpoints, então consultas repetidas respondem sem
+# ler o CSV.
+
+METRICAS_CLI = ('mean', 'median', 'mode', 'variance', 'stdev', 'quartiles', 'cardinality',
+                'mad', 'trimmed_mean', 'winsorized_mean')
+
+
+def _coluna_numerica(valores):
+    """Indica se os valores não nulos de uma coluna (do CSV) são todos números."""
+    if not isinstance(valores, list):
+        return False
+    preenchidos = [v for v in valores if v is not None]
+    return bool(preenchidos) and all(isinstance(v, float) for v in preenchidos)
+
+
+def _carregar_colunas_cli(arquivo, colunas, diretorio_cache):
+    """
+    Retorna ({coluna: valores}, origem), com origem 'cache' ou 'csv'.
+
+    Lê o CSV apenas se alguma coluna pedida ainda não estiver no cache.
+    """
+    import analysis_spotify_csv as analise  # importado só na primeira consulta que precisa de dados
+
+    arquivos = analise.listar_particoes(arquivo)
+    checkpoint = analise.Checkpoint(diretorio_cache, arquivos) if diretorio_cache else None
+
+    if colunas is None and checkpoint is not None and checkpoint.concluida('colunas-numericas'):
+        colunas = checkpoint.carregar('colunas-numericas')
+
+    if (colunas is not None and checkpoint is not None
+            and all(checkpoint.concluida(f'coluna:{c}') for c in colunas)):
+        return {c: checkpoint.carregar(f'coluna:{c}')[c] for c in colunas}, 'cache'
+
+    if len(arquivos) != 1:
+        dados_dict, _ = analise.carregar_particoes(arquivo, verbose=False)
+    else:  # arquivo único, ou diretório/padrão glob com uma só partição
+        dados_dict, _, _ = analise.ler_csv_para_dicionario(arquivos[0], verbose=False)
+        if dados_dict is None:
+            raise ValueError(f"Arquivo '{arquivo}' vazio ou sem cabeçalho")
+
+    numericas = [c for c, valores in dados_dict.items() if _coluna_numerica(valores)]
+    if colunas is None:
+        colunas = numericas
+    for coluna in colunas:
+        if coluna not in dados_dict:
+            raise KeyError(f"Coluna '{coluna}' não encontrada")
+
+    dataset = {c: analise.limpar_coluna_numerica(dados_dict, c)[0] for c in colunas}
+    if checkpoint is not None:
+        for coluna in colunas:
+            if coluna in numericas:
+                checkpoint.salvar(f'coluna:{coluna}', {coluna: dataset[coluna]}, formato='colunas')
+        checkpoint.salvar('colunas-numericas', numericas)
+    return dataset, 'csv'
+
+
+def main(argv=None, inicio=None):
+    """
+    Ponto de entrada da CLI (`python -m dende_statistics analyze ARQUIVO ...`).
+
+    Retorno
+    -------
+    int
+        O código de saída do processo.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m dende_statistics',
+                                     description='Estatísticas descritivas sobre arquivos CSV.')
+    comandos = parser.add_subparsers(dest='comando', required=True)
+    analyze = comandos.add_parser('analyze', help='calcula métricas das colunas numéricas de um CSV')
+    analyze.add_argument('arquivo', help='arquivo CSV, diretório ou padrão glob de partições')
+    analyze.add_argument('--columns', nargs='+', help='colunas analisadas (padrão: todas as numéricas)')
+    analyze.add_argument('--metrics', nargs='+', choices=METRICAS_CLI,
+                         default=['mean', 'median', 'stdev', 'quartiles'], help='métricas calculadas')
+    analyze.add_argument('--format', choices=['text', 'json'], default='text', help='formato da saída')
+    analyze.add_argument('--backend', choices=['python', 'numpy', 'auto'], default='python',
+                         help="backend dos kernels; 'numpy' e 'auto' importam o NumPy (padrão: python)")
+    analyze.add_argument('--precision', choices=['fast', 'stable'], default='fast')
+    analyze.add_argument('--cache-dir', default='.checkpoints', help='diretório do cache de colunas binárias')
+    analyze.add_argument('--no-cache', action='store_true', help='sempre lê o CSV e não grava o cache')
+    analyze.add_argument('--timing', action='store_true', help='mostra os tempos de cada fase em stderr')
+    args = parser.parse_args(argv)
+
+    inicio = inicio if inicio is not None else _INICIO
+    tempos = {'inicialização': time.perf_counter() - inicio}
+
+    marca = time.perf_counter()
+    try:
+        dataset, origem = _carregar_colunas_cli(args.arquivo, args.columns,
+                                                None if args.no_cache else args.cache_dir)
+    except FileNotFoundError as e:
+        print(f"Arquivo não encontrado: {e.filename or args.arquivo}", file=sys.stderr)
+        return 1
+    except OSError as e:
+        print(f"Erro ao ler '{e.filename or args.arquivo}': {e.strerror or e}", file=sys.stderr)
+        return 1
+    except (KeyError, ValueError) as e:
+        print(f"Erro: {e.args[0] if e.args else e}", file=sys.stderr)
+        return 1
+    tempos[f'carregamento ({origem})'] = time.perf_counter() - marca
+
+    marca = time.perf_counter()
+    stats = Statistics(dataset, backend=args.backend, precision=args.precision)
+    resultados = {}
+    for coluna in dataset:
+        resultados[coluna] = {}
+        for metrica in args.metrics:
+            try:
+                resultados[coluna][metrica] = getattr(stats, metrica)(coluna)
+            except Exception as e:
+                resultados[coluna][metrica] = f"erro: {e}"
+    tempos['cálculo'] = time.perf_counter() - marca
+
+    if args.format == 'json':
+        import json
+        print(json.dumps(resultados, ensure_ascii=False, indent=2, default=str))
+    else:
+        for coluna, metricas in resultados.items():
+            print(coluna)
+            for metrica, valor in metricas.items():
+                if isinstance(valor, float):
+                    valor = f"{valor:.4f}"
+                elif isinstance(valor, dict):
+                    valor = ", ".join(f"{k}={v:.4f}" if isinstance(v, float) else f"{k}={v}"
+                                      for k, v in valor.items())
+                print(f"  {metrica:<16}: {valor}")
+
+    if args.timing:
+        tempos['total'] = time.perf_counter() - inicio
+        print(" | ".join(f"{fase}: {segundos * 1000:.1f} ms" for fase, segundos in tempos.items()),
+              file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    # Executa pela versão importável do módulo, para que as classes sejam as
+    # mesmas usadas pelo cache e por analysis_spotify_csv
+    import dende_statistics
+    sys.exit(dende_statistics.main(inicio=_INICIO))
@@ -1,5 +1,22 @@
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import tempfile
 import unittest
-from dende_statistics import Statistics
+from array import array
+from collections import Counter
+from fractions import Fraction
+from unittest import mock
+import benchmarks
+import dende_kernels
+import dende_sketches
+import dende_statistics
+from analysis_spotify_csv import (Checkpoint, _etapa, analisar_coluna, carregar_particoes, gerar_relatorio,
+                                  limpar_coluna_numerica, main, renderizar_relatorio)
+from dende_statistics import ColumnView, MultiValueColumn, Statistics
 
 
 class TestStatistics(unittest.TestCase):
@@ -155,6 +172,988 @@ class TestStatistics(unittest.TestCase):
         histogram = self.stats.histogram("ticket_price", bins=4)
         self.assertEqual(sum(histogram.values()), 10)
 
+    # ---------- Kernels / backend ----------
+
+    def test_backend_python_matches_auto(self):
+        puro = Statistics(self.dataset, backend='python')
+        self.assertAlmostEqual(puro.mean("participants"), self.stats.mean("participants"))
+        self.assertAlmostEqual(puro.variance("ticket_price"), self.stats.variance("ticket_price"))
+        self.assertAlmostEqual(
+            puro.covariance("participants", "ticket_price"),
+            self.stats.covariance("participants", "ticket_price")
+        )
+
+    def test_backend_invalid(self):
+        with self.assertRaises(ValueError):
+            Statistics(self.dataset, backend='cuda')
+
+    def test_kernel_blocks_cover_range(self):
+        n = dende_kernels.TAMANHO_MINIMO_BLOCO * 5 + 7
+        partes = dende_kernels.blocos(n, 4)
+        self.assertEqual(len(partes), 4)
+        self.assertEqual(partes[0][0], 0)
+        self.assertEqual(partes[-1][1], n)
+        for (_, fim), (inicio, _) in zip(partes, partes[1:]):
+            self.assertEqual(fim, inicio)
+
+    def test_caches_follow_column_changes(self):
+        self.stats.mean("participants")
+        self.stats.absolute_frequency("category", weights="duration_hours")
+        self.stats.contingency_table("category", "priority")
+        visao = self.stats.view(slice(0, 5))
+
+        self.dataset["participants"] = [1] * 10  # coluna trocada
+        self.assertEqual(self.stats.mean("participants"), 1.0)
+        self.assertEqual(visao.mean("participants"), 118.0)  # a visão continua sobre a lista antiga
+        self.dataset["participants"].append(12)  # linha acrescentada
+        self.assertEqual(self.stats.mean("participants"), 2.0)
+
+        binaria = Statistics({"x": array('d', [1.0, 2.0, 3.0])})  # como as colunas do cache
+        self.assertEqual(binaria.mean("x"), 2.0)
+        self.assertEqual(binaria.median("x", weights="x"), 2.5)
+        binaria.dataset["x"].append(6.0)  # o buffer em cache não prende o array
+        self.assertEqual(binaria.mean("x"), 3.0)
+
+        self.dataset["duration_hours"] = [1] * 10
+        self.assertEqual(self.stats.absolute_frequency("category", weights="duration_hours"),
+                         {"Show": 5, "Palestra": 2, "Workshop": 3})
+        self.dataset["priority"] = ["alta"] * 10
+        self.assertEqual(self.stats.contingency_table("category", "priority")["counts"], [[5], [2], [3]])
+
+        self.dataset["category"][0] = "Palestra"  # alteração no lugar: só com invalidate
+        self.stats.invalidate("category")
+        tabela = self.stats.contingency_table("category", "priority")
+        self.assertEqual(tabela["rows"], ["Palestra", "Show", "Workshop"])
+        self.assertEqual(tabela["counts"], [[3], [4], [3]])
+
+    # ---------- Precisão (modo stable) ----------
+
+    def test_stable_mean_compensated(self):
+        dados = {"x": [1e16, 1.0, -1e16, 1.0]}
+        self.assertEqual(Statistics(dados, backend='python', precision='stable').mean("x"), 0.5)
+
+    def test_stable_matches_fast(self):
+        stable = Statistics(self.dataset, backend='python', precision='stable')
+        self.assertAlmostEqual(stable.variance("ticket_price"), 525.25)
+        self.assertAlmostEqual(stable.covariance("participants", "ticket_price"), 1212.25)
+
+    def test_combine_moments_matches_direct(self):
+        valores = [3.0, 7.0, 1.0, 9.0, 4.0, 6.0, 2.0]
+
+        def momentos(xs):
+            media = sum(xs) / len(xs)
+            return (len(xs), media, sum((x - media) ** 2 for x in xs))
+
+        combinado = dende_kernels.combinar_momentos(momentos(valores[:3]), momentos(valores[3:]))
+        direto = momentos(valores)
+        self.assertEqual(combinado[0], direto[0])
+        self.assertAlmostEqual(combinado[1], direto[1])
+        self.assertAlmostEqual(combinado[2], direto[2])
+
+    @unittest.skipUnless(dende_kernels.disponivel(), "numpy não instalado")
+    def test_stable_kernels_large_magnitude(self):
+        # valores ~1e12: as médias dos blocos não podem carregar o arredondamento da magnitude
+        aleatorio = random.Random(11)
+        x = [1e12 + aleatorio.uniform(-1e3, 1e3) for _ in range(5000)]
+        y = [2e12 - 3 * v + aleatorio.uniform(-10, 10) for v in x]
+        exatos = [Fraction(v) for v in x], [Fraction(v) for v in y]
+        media_x, media_y = sum(exatos[0]) / len(x), sum(exatos[1]) / len(y)
+        variancia = float(sum((v - media_x) ** 2 for v in exatos[0]) / len(x))
+        covariancia = float(sum((a - media_x) * (b - media_y) for a, b in zip(*exatos)) / len(x))
+
+        with mock.patch.object(dende_kernels, 'TAMANHO_MINIMO_BLOCO', 64):
+            stats = Statistics({"x": x, "y": y}, backend='numpy', threads=4, precision='stable')
+            self.assertAlmostEqual(stats.variance("x") / variancia, 1.0, delta=1e-12)
+            self.assertAlmostEqual(stats.covariance("x", "y") / covariancia, 1.0, delta=1e-12)
+            self.assertAlmostEqual(stats.mean("x") / float(media_x), 1.0, delta=1e-15)
+
+    def test_precision_invalid(self):
+        with self.assertRaises(ValueError):
+            Statistics(self.dataset, precision='exact')
+
+    # ---------- Amostragem ----------
+
+    def test_sample_size_and_seed(self):
+        amostra = self.stats.sample(4, seed=7)
+        self.assertEqual(len(amostra.dataset["event_id"]), 4)
+        self.assertEqual(amostra.population_size, 10)
+        self.assertEqual(list(amostra.dataset["event_id"]),
+                         list(self.stats.sample(4, seed=7).dataset["event_id"]))
+        # as linhas continuam alinhadas entre as colunas
+        for evento, preco in zip(amostra.dataset["event_id"], amostra.dataset["ticket_price"]):
+            self.assertEqual(self.dataset["ticket_price"][evento - 1], preco)
+
+    def test_sample_stratified_proportional(self):
+        # cotas exatas 2.5, 1.0 e 1.5: o resto que sobra vai para o primeiro empate (Show)
+        amostra = self.stats.sample(5, strata="category", seed=1)
+        self.assertEqual(amostra.absolute_frequency("category"),
+                         {"Show": 3, "Palestra": 1, "Workshop": 1})
+        self.assertEqual(len(self.stats.sample(20, strata="category").dataset["event_id"]), 10)
+
+        grupos = {"g": [i % 3000 for i in range(10000)], "b": [i % 2 for i in range(10000)]}
+        stats = Statistics(grupos, backend='python')
+        for estrato, tamanho in (("g", 100), ("b", 10), ("b", 100), ("b", 7)):
+            with self.subTest(estrato=estrato, tamanho=tamanho):
+                amostra = stats.sample(tamanho, strata=estrato, seed=2)
+                self.assertEqual(len(amostra.dataset[estrato]), tamanho)
+        self.assertEqual(stats.sample(10, strata="b", seed=2).absolute_frequency("b"), {0: 5, 1: 5})
+
+    def test_confidence_interval_mean_analytic(self):
+        dados = {"x": [float(i % 100) for i in range(20000)]}
+        populacao = Statistics(dados, backend='python')
+        amostra = populacao.sample(2000, seed=3)
+        ic = amostra.confidence_interval("x", "mean")
+        self.assertLessEqual(ic["lower"], populacao.mean("x"))
+        self.assertGreaterEqual(ic["upper"], populacao.mean("x"))
+        self.assertEqual(ic["method"], "analytic")
+
+    def test_confidence_interval_bootstrap_and_frequency(self):
+        ic = self.stats.confidence_interval("participants", "median", method="bootstrap", seed=5)
+        self.assertEqual(ic["estimate"], 105.0)
+        self.assertLessEqual(ic["lower"], ic["upper"])
+        freq = self.stats.confidence_interval("priority", "relative_frequency")
+        self.assertAlmostEqual(freq["alta"]["estimate"], 0.5)
+        self.assertLess(freq["alta"]["lower"], 0.5)
+        with self.assertRaises(ValueError):
+            self.stats.confidence_interval("participants", "median")
+
+    # ---------- Visões (sem cópia) ----------
+
+    def test_view_mask_shares_source(self):
+        mascara = [c == "Show" for c in self.dataset["category"]]
+        shows = self.stats.view(mascara)
+        self.assertIsInstance(shows.dataset["participants"], ColumnView)
+        self.assertIs(shows.dataset["participants"].source, self.dataset["participants"])
+        self.assertEqual(list(shows.dataset["participants"]), [120, 150, 200, 180, 160])
+        self.assertAlmostEqual(shows.mean("participants"), 162.0)
+        self.assertEqual(shows.median("participants"), 160)
+
+    @unittest.skipUnless(dende_kernels.disponivel(), "numpy não instalado")
+    def test_view_numpy_mask(self):
+        np = dende_kernels.carregar_numpy()
+        participantes = np.array(self.dataset["participants"])
+        for mascara in (participantes > 100, list(participantes > 100)):  # array e lista de np.bool_
+            with self.subTest(tipo=type(mascara).__name__):
+                grandes = self.stats.view(mascara)
+                self.assertEqual(list(grandes.dataset["participants"]), [120, 150, 200, 180, 160])
+        self.assertEqual(list(self.stats.view(np.array([0, 2])).dataset["event_id"]), [1, 3])
+        with self.assertRaises(ValueError):
+            self.stats.view(participantes[:5] > 100)
+
+    def test_view_slice_and_nested(self):
+        primeiros = self.stats.view(slice(0, 6))
+        self.assertEqual(primeiros.dataset["event_id"].indices, range(0, 6))
+        pares = primeiros.view([0, 2, 4])
+        self.assertIs(pares.dataset["event_id"].source, self.dataset["event_id"])
+        self.assertEqual(list(pares.dataset["event_id"]), [1, 3, 5])
+        self.assertEqual(pares.mode("category"), ["Show"])
+
+    def test_where(self):
+        altas = self.stats.where("priority", "alta")
+        self.assertEqual(len(altas.dataset["event_id"]), 5)
+        self.assertAlmostEqual(altas.variance("ticket_price"),
+                               Statistics({"x": [50, 70, 80, 75, 65]}).variance("x"))
+        self.assertAlmostEqual(altas.covariance("participants", "ticket_price"),
+                               Statistics({"a": [120, 150, 200, 180, 160], "b": [50, 70, 80, 75, 65]})
+                               .covariance("a", "b"))
+
+    # ---------- Colunas multivaloradas ----------
+
+    def _generos(self):
+        return Statistics({
+            "genres": MultiValueColumn.from_strings([
+                "country hip hop, southern hip hop", "pop", "pop, dance pop", None, "pop, country hip hop"
+            ]),
+            "popularity": [10.0, 80.0, 60.0, 5.0, 40.0],
+        })
+
+    def test_multivalue_layout(self):
+        coluna = self._generos().dataset["genres"]
+        self.assertEqual(list(coluna.offsets), [0, 2, 3, 5, 5, 7])
+        self.assertEqual(len(coluna.vocabulary), 4)
+        self.assertEqual(coluna[0], ("country hip hop", "southern hip hop"))
+        self.assertEqual(coluna[3], ())
+
+    def test_multivalue_repeated_item_counts_once_per_row(self):
+        stats = Statistics({"genres": MultiValueColumn.from_strings(["a, c, a", "c", "b, b"])})
+        self.assertEqual(stats.dataset["genres"][0], ("a", "c"))
+        self.assertEqual(stats.absolute_frequency("genres"), {"a": 1, "c": 2, "b": 1})
+        self.assertAlmostEqual(stats.relative_frequency("genres")["a"], 1 / 3)  # fração das linhas
+        self.assertEqual(stats.mode("genres"), ["c"])
+        self.assertEqual(stats.cooccurrence("genres"), {("a", "c"): 1})
+        self.assertEqual(stats.joint_frequency(["genres"]), {("a",): 1, ("c",): 2, ("b",): 1})
+
+    def test_multivalue_frequency_and_mode(self):
+        stats = self._generos()
+        self.assertEqual(stats.absolute_frequency("genres"),
+                         {"country hip hop": 2, "southern hip hop": 1, "pop": 3, "dance pop": 1})
+        self.assertEqual(stats.mode("genres"), ["pop"])
+        self.assertAlmostEqual(stats.relative_frequency("genres")["pop"], 0.6)
+        self.assertEqual(stats.itemset("genres"), {"country hip hop", "southern hip hop", "pop", "dance pop"})
+
+    def test_multivalue_cooccurrence(self):
+        pares = self._generos().cooccurrence("genres")
+        self.assertEqual(pares[("country hip hop", "southern hip hop")], 1)
+        self.assertEqual(pares[("pop", "dance pop")], 1)
+        self.assertEqual(pares[("country hip hop", "pop")], 1)
+        self.assertEqual(len(pares), 3)
+
+    def test_group_by_multivalue_and_view(self):
+        stats = self._generos()
+        medias = stats.group_by("genres", "popularity")
+        self.assertAlmostEqual(medias["pop"], 60.0)
+        self.assertAlmostEqual(medias["country hip hop"], 25.0)
+        populares = stats.view([p > 30 for p in stats.dataset["popularity"]])
+        self.assertEqual(populares.absolute_frequency("genres"),
+                         {"country hip hop": 1, "pop": 3, "dance pop": 1})
+        self.assertAlmostEqual(populares.group_by("genres", "popularity")["country hip hop"], 40.0)
+        self.assertEqual(self.stats.group_by("category", "participants", "median")["Palestra"], 85.0)
+
+    def test_crosstab_multivalue_explodes_items(self):
+        for backend in ('python', 'auto'):
+            with self.subTest(backend=backend):
+                dados = dict(self._generos().dataset, tipo=["album", "single", "album", "single", "single"])
+                stats = Statistics(dados, backend=backend)
+                self.assertEqual(stats.joint_frequency(["genres", "tipo"]), {
+                    ("country hip hop", "album"): 1, ("country hip hop", "single"): 1,
+                    ("southern hip hop", "album"): 1, ("pop", "single"): 2,
+                    ("pop", "album"): 1, ("dance pop", "album"): 1,
+                })
+                tabela = stats.crosstab("tipo", "genres")
+                self.assertEqual(tabela["rows"], ["album", "single"])
+                self.assertEqual(tabela["columns"], ["country hip hop", "southern hip hop", "pop", "dance pop"])
+                self.assertEqual(tabela["counts"], [[1, 1, 1, 1], [1, 0, 2, 0]])
+                self.assertEqual(tabela["column_totals"],
+                                 list(stats.absolute_frequency("genres").values()))
+                self.assertEqual(tabela["total"], 7)  # itens, não linhas
+
+                # duas colunas multivaloradas: uma chave por combinação de itens da linha
+                pares = stats.joint_frequency(["genres", "genres"])
+                self.assertEqual(pares[("pop", "dance pop")], 1)
+                self.assertEqual(pares[("pop", "pop")], 3)
+                self.assertEqual(sum(pares.values()), 4 + 1 + 4 + 0 + 4)
+
+                populares = stats.view([p > 30 for p in stats.dataset["popularity"]])
+                self.assertEqual(populares.crosstab("tipo", "genres", sparse=True)["counts"],
+                                 {("album", "pop"): 1, ("album", "dance pop"): 1,
+                                  ("single", "country hip hop"): 1, ("single", "pop"): 2})
+
+    # ---------- Cardinalidade ----------
+
+    def test_cardinality_exact_and_hll_small(self):
+        self.assertEqual(self.stats.cardinality("priority"), 3)
+        self.assertEqual(self.stats.cardinality("participants", method='hll'), 10)
+        self.assertEqual(self.stats.cardinality("category", method='hll', precision=4), 3)
+
+    def test_cardinality_hll_large(self):
+        dados = {"id": [f"track-{i % 50000}" for i in range(80000)]}
+        estimativa = Statistics(dados).cardinality("id", method='hll')
+        self.assertLess(abs(estimativa - 50000) / 50000, 0.05)
+
+    def test_cardinality_sketch_merge(self):
+        a = Statistics({"id": list(range(0, 30000))}).cardinality_sketch("id")
+        b = Statistics({"id": list(range(20000, 50000))}).cardinality_sketch("id")
+        self.assertEqual(len(a.registers), 4096)
+        self.assertLess(abs(a.merge(b).count() - 50000) / 50000, 0.05)
+        with self.assertRaises(ValueError):
+            a.merge(dende_sketches.HyperLogLog(precision=10))
+
+    def test_hash64_int_float_equal(self):
+        self.assertEqual(dende_sketches.hash64(1), dende_sketches.hash64(1.0))
+        self.assertNotEqual(dende_sketches.hash64(1.0), dende_sketches.hash64("1.0"))
+
+    # ---------- Correlação e associação ----------
+
+    def test_pearson_matches_covariance(self):
+        r = self.stats.correlation("participants", "ticket_price")
+        esperado = self.stats.covariance("participants", "ticket_price") / (
+            self.stats.stdev("participants") * self.stats.stdev("ticket_price"))
+        self.assertAlmostEqual(r, esperado)
+        puro = Statistics(self.dataset, backend='python')
+        self.assertAlmostEqual(puro.correlation("participants", "ticket_price"), esperado)
+
+    def test_spearman_monotonic_and_ranks(self):
+        dados = {"x": [1, 2, 3, 4, 5], "y": [1, 8, 27, 64, 125], "z": [3, 1, 3, 2, 5]}
+        stats = Statistics(dados)
+        self.assertAlmostEqual(stats.correlation("x", "y", "spearman"), 1.0)
+        self.assertEqual(list(stats.rank("z")), [3.5, 1.0, 3.5, 2.0, 5.0])
+        self.assertIs(stats.rank("z"), stats.rank("z"))
+
+    def test_kendall_matches_brute_force(self):
+        x = self.dataset["duration_hours"]
+        y = self.dataset["rating"]
+        concordantes = discordantes = empates_x = empates_y = 0
+        for i in range(len(x)):
+            for j in range(i + 1, len(x)):
+                dx, dy = x[i] - x[j], y[i] - y[j]
+                if dx == 0 and dy == 0:
+                    continue
+                if dx == 0:
+                    empates_x += 1
+                elif dy == 0:
+                    empates_y += 1
+                elif dx * dy > 0:
+                    concordantes += 1
+                else:
+                    discordantes += 1
+        esperado = (concordantes - discordantes) / (
+            (concordantes + discordantes + empates_x) * (concordantes + discordantes + empates_y)) ** 0.5
+        self.assertAlmostEqual(self.stats.correlation("duration_hours", "rating", "kendall"), esperado)
+
+    def test_contingency_chi_square_cramers_v(self):
+        tabela = self.stats.contingency_table("category", "priority")
+        self.assertEqual(tabela["rows"], ["Show", "Palestra", "Workshop"])
+        self.assertEqual(tabela["columns"], ["alta", "media", "baixa"])
+        self.assertEqual(tabela["counts"], [[5, 0, 0], [0, 2, 0], [0, 0, 3]])
+        self.assertEqual(self.stats.chi_square("category", "priority")["dof"], 4)
+        self.assertAlmostEqual(self.stats.cramers_v("category", "priority"), 1.0)
+
+    def test_weighted_statistics_match_repeated_rows(self):
+        pesos = [2, 0, 1, 3, 1, 0, 2, 1, 4, 1]
+        expandido = {coluna: [v for v, p in zip(valores, pesos) for _ in range(p)]
+                     for coluna, valores in self.dataset.items()}
+        referencia = Statistics(expandido, backend='python')
+
+        for backend in ("python", "auto"):
+            with self.subTest(backend=backend):
+                stats = Statistics(dict(self.dataset, peso=pesos), backend=backend)
+                self.assertAlmostEqual(stats.mean("participants", weights="peso"), referencia.mean("participants"))
+                self.assertAlmostEqual(stats.variance("rating", weights=pesos), referencia.variance("rating"))
+                self.assertAlmostEqual(stats.covariance("participants", "ticket_price", weights="peso"),
+                                       referencia.covariance("participants", "ticket_price"))
+                self.assertEqual(stats.median("participants", weights="peso"), referencia.median("participants"))
+                self.assertEqual(stats.quartiles("ticket_price", weights="peso"), {"Q1": 20, "Q2": 25, "Q3": 65})
+                self.assertEqual(stats.quartiles("ticket_price", weights=[2] * 10), stats.quartiles("ticket_price"))
+                self.assertEqual(stats.absolute_frequency("category", weights="peso"),
+                                 referencia.absolute_frequency("category"))
+                self.assertEqual(stats.relative_frequency("priority", weights="peso"),
+                                 referencia.relative_frequency("priority"))
+                self.assertEqual(stats.mode("category", weights="peso"), ["Workshop"])
+                histograma = stats.histogram("duration_hours", 4, weights="peso")
+                self.assertEqual(sum(histograma.values()), 15)
+                self.assertEqual(list(histograma.values()), list(referencia.histogram("duration_hours", 4).values()))
+
+        # Pesos reais: sem equivalente por repetição, comparados com a definição
+        reais = [0.5, 1.25, 2.0, 0.0, 3.5, 1.0, 0.75, 2.5, 1.5, 0.5]
+        stats = Statistics(self.dataset)
+        media = sum(p * x for p, x in zip(reais, self.dataset["rating"])) / sum(reais)
+        self.assertAlmostEqual(stats.mean("rating", weights=reais), media)
+        self.assertAlmostEqual(stats.variance("rating", weights=reais),
+                               sum(p * (x - media) ** 2 for p, x in zip(reais, self.dataset["rating"])) / sum(reais))
+        self.assertEqual(stats.median("rating", weights=reais), quantil_por_peso(self.dataset["rating"], reais, 7)[0])
+        self.assertEqual(stats.quartiles("rating", weights=reais), quartis_por_peso(self.dataset["rating"], reais))
+
+        quatro = Statistics({"x": [1, 2, 3, 4]})
+        for peso in (0.1, 0.5):
+            self.assertEqual(quatro.median("x", weights=[peso] * 4), 2.5)
+            self.assertEqual(quatro.quartiles("x", weights=[peso] * 4), {"Q1": 1.5, "Q2": 2.5, "Q3": 3.5})
+
+        with self.assertRaises(ValueError):
+            stats.mean("rating", weights=[1] * 9)
+        with self.assertRaises(ValueError):
+            stats.mean("rating", weights=[-1] + [1] * 9)
+        with self.assertRaises(ValueError):
+            stats.variance("rating", weights=[0] * 10)
+
+    def test_weighted_frequency_multivalue(self):
+        generos = MultiValueColumn.from_strings(["pop, rock", "rock", "", "pop"])
+        stats = Statistics({"generos": generos, "popularidade": [10, 20, 20, 10]})
+        self.assertEqual(stats.absolute_frequency("generos", weights="popularidade"), {"pop": 20.0, "rock": 30.0})
+        self.assertEqual(stats.relative_frequency("generos", weights="popularidade"), {"pop": 1 / 3, "rock": 0.5})
+        self.assertEqual(stats.where("popularidade", 20).absolute_frequency("generos", weights="popularidade"),
+                         {"rock": 20.0})
+
+    def test_joint_frequency_and_crosstab(self):
+        conjunta = self.stats.joint_frequency(["category", "duration_hours"])
+        esperado = {}
+        for chave in zip(self.dataset["category"], self.dataset["duration_hours"]):
+            esperado[chave] = esperado.get(chave, 0) + 1
+        self.assertEqual(conjunta, esperado)
+
+        for backend in ("python", "auto"):
+            stats = Statistics(self.dataset, backend=backend)
+            tabela = stats.crosstab(["category", "priority"], "duration_hours")
+            self.assertEqual(tabela["rows"], [("Show", "alta"), ("Palestra", "media"), ("Workshop", "baixa")])
+            self.assertEqual(tabela["columns"], [2, 3, 4, 5])
+            self.assertEqual(tabela["counts"], [[1, 1, 2, 1], [0, 2, 0, 0], [3, 0, 0, 0]])
+            self.assertEqual(tabela["row_totals"], [5, 2, 3])
+            self.assertEqual(tabela["column_totals"], [4, 3, 2, 1])
+            self.assertEqual(tabela["total"], 10)
+
+            esparsa = stats.crosstab("category", "duration_hours", sparse=True, margins=False)
+            self.assertEqual(esparsa["counts"][("Workshop", 2)], 3)
+            self.assertNotIn(("Workshop", 5), esparsa["counts"])
+            self.assertNotIn("total", esparsa)
+
+    def test_association_matrix_mixed(self):
+        matriz = self.stats.association_matrix(["participants", "ticket_price", "category", "priority"])
+        self.assertAlmostEqual(matriz["participants"]["ticket_price"],
+                               self.stats.correlation("participants", "ticket_price"))
+        self.assertAlmostEqual(matriz["category"]["priority"], 1.0)
+        self.assertEqual(matriz["category"]["category"], 1.0)
+        self.assertGreater(matriz["participants"]["priority"], 0.0)
+
+    def test_correlation_ratio(self):
+        # event_id é único por linha: o V de Cramér daria 1, a razão de correlação não
+        grupos = {}
+        for categoria, valor in zip(self.dataset["category"], self.dataset["event_id"]):
+            grupos.setdefault(categoria, []).append(valor)
+        media = statistics.fmean(self.dataset["event_id"])
+        entre = sum(len(g) * (statistics.fmean(g) - media) ** 2 for g in grupos.values())
+        total = sum((x - media) ** 2 for x in self.dataset["event_id"])
+        esperado = (entre / total) ** 0.5
+
+        for backend in ('python', 'numpy') if dende_kernels.disponivel() else ('python',):
+            with self.subTest(backend=backend):
+                stats = Statistics(self.dataset, backend=backend)
+                self.assertAlmostEqual(stats.correlation_ratio("category", "event_id"), esperado)
+                matriz = stats.association_matrix(["event_id", "category"])
+                self.assertAlmostEqual(matriz["event_id"]["category"], esperado)
+                self.assertAlmostEqual(matriz["category"]["event_id"], esperado)
+                self.assertLess(matriz["event_id"]["category"], 0.5)
+        self.assertEqual(Statistics({"g": ["a", "b"], "x": [3, 3]}).correlation_ratio("g", "x"), 0.0)
+        self.assertAlmostEqual(Statistics({"g": ["a", "a", "b"], "x": [1, 1, 7]}).correlation_ratio("g", "x"), 1.0)
+
+    # ---------- Estatísticas robustas ----------
+
+    def test_sort_order_shared(self):
+        ordem = self.stats.sort_order("participants")
+        self.assertIs(ordem, self.stats.sort_order("participants"))
+        self.assertEqual(list(self.stats.sorted_values("participants")),
+                         sorted(self.dataset["participants"]))
+        self.assertEqual(self.stats.quartiles("participants")["Q2"], self.stats.median("participants"))
+
+    def test_sort_order_follows_column_changes(self):
+        for backend in ('python', 'auto'):
+            with self.subTest(backend=backend):
+                dados = {"x": [5, 1, 4, 2, 3]}
+                stats = Statistics(dados, backend=backend)
+                self.assertEqual(stats.median("x"), 3)
+                self.assertEqual(stats.rank("x")[0], 5)
+
+                dados["x"] = [9, 7]  # coluna trocada por uma menor
+                self.assertEqual(stats.median("x"), 8.0)
+                self.assertEqual(list(stats.rank("x")), [2.0, 1.0])
+                dados["x"].extend([1, 2, 3])  # linhas acrescentadas
+                self.assertEqual(list(stats.sorted_values("x")), [1, 2, 3, 7, 9])
+                self.assertEqual(stats.iqr_outliers("x"), array('q'))
+
+    def test_iqr_and_zscore_outliers(self):
+        dados = {"followers": [10, 12, 11, 13, 12, 11, 10, 5000, 12, 1]}
+        stats = Statistics(dados)
+        outliers = stats.iqr_outliers("followers")
+        self.assertEqual(outliers.typecode, 'q')
+        self.assertEqual(list(outliers), [7, 9])
+        self.assertEqual(list(stats.zscore_outliers("followers", threshold=2.5)), [7])
+
+    def test_mad_trimmed_winsorized(self):
+        dados = {"x": [1, 2, 3, 4, 100]}
+        stats = Statistics(dados)
+        self.assertEqual(stats.mad("x"), 1.0)
+        self.assertAlmostEqual(stats.mad("x", scale=1.4826), 1.4826)
+        self.assertAlmostEqual(stats.trimmed_mean("x", 0.2), 3.0)
+        self.assertAlmostEqual(stats.winsorized_mean("x", 0.2), 3.0)
+        self.assertAlmostEqual(self.stats.mad("participants"), 47.5)
+        with self.assertRaises(ValueError):
+            stats.trimmed_mean("x", 0.5)
+
+    @unittest.skipUnless(dende_kernels.disponivel(), "numpy não instalado")
+    def test_stable_kernel_large_magnitude(self):
+        n = dende_kernels.TAMANHO_MINIMO_BLOCO * 3
+        dados = {"x": [1e8 + (i % 7) for i in range(n)], "y": [float(i % 5) for i in range(n)]}
+        kernel = Statistics(dados, backend='numpy', threads=3, precision='stable')
+        puro = Statistics(dados, backend='python', precision='stable')
+        self.assertAlmostEqual(kernel.mean("x"), puro.mean("x"))
+        self.assertAlmostEqual(kernel.variance("x"), puro.variance("x"), places=6)
+        self.assertAlmostEqual(kernel.covariance("x", "y"), puro.covariance("x", "y"), places=6)
+
+    @unittest.skipUnless(dende_kernels.disponivel(), "numpy não instalado")
+    def test_kernel_large_column_matches_python(self):
+        n = dende_kernels.TAMANHO_MINIMO_BLOCO * 4
+        dados = {"x": [float(i % 997) for i in range(n)], "y": [float(i % 13) for i in range(n)]}
+        kernel = Statistics(dados, backend='numpy', threads=4)
+        puro = Statistics(dados, backend='python')
+        self.assertAlmostEqual(kernel.mean("x"), puro.mean("x"))
+        self.assertAlmostEqual(kernel.variance("x"), puro.variance("x"), places=6)
+        self.assertAlmostEqual(kernel.covariance("x", "y"), puro.covariance("x", "y"), places=6)
+
+
+class TestCarregamento(unittest.TestCase):
+
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        particoes = {
+            "2025-10-01.csv": "track_id,track_popularity\na,10\nb,20\n",
+            "2025-10-02.csv": "track_id,track_popularity,explicit\nc,30,TRUE\n",
+            "2025-10-03.csv": "track_id,track_popularity\nd,40\n",
+        }
+        for nome, conteudo in particoes.items():
+            with open(os.path.join(self.diretorio.name, nome), 'w', encoding='utf-8') as f:
+                f.write(conteudo)
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    # ---------- Partições ----------
+
+    def test_load_directory_unifies_schema(self):
+        dados, colunas = carregar_particoes(self.diretorio.name, processos=2, verbose=False)
+        self.assertEqual(colunas, ["track_id", "track_popularity", "explicit"])
+        self.assertEqual(dados["track_id"], ["a", "b", "c", "d"])
+        self.assertEqual(dados["track_popularity"], [10.0, 20.0, 30.0, 40.0])
+        self.assertEqual(dados["explicit"], [None, None, "TRUE", None])
+        self.assertAlmostEqual(Statistics(dados).mean("track_popularity"), 25.0)
+
+    def test_load_glob_per_partition(self):
+        padrao = os.path.join(self.diretorio.name, "2025-10-0[12].csv")
+        particoes, colunas = carregar_particoes(padrao, por_particao=True, verbose=False)
+        self.assertEqual(len(particoes), 2)
+        self.assertEqual(particoes[0][1]["explicit"], [None, None])
+
+    def test_load_missing_path(self):
+        with self.assertRaises(FileNotFoundError):
+            carregar_particoes(os.path.join(self.diretorio.name, "*.parquet"), verbose=False)
+
+    def test_main_single_partition(self):
+        pasta = os.path.join(self.diretorio.name, "uma")
+        os.mkdir(pasta)
+        with open(os.path.join(pasta, "2025-10-01.csv"), 'w', encoding='utf-8') as f:
+            f.write("track_id,track_popularity\n" + "".join(f"t{i},{i}\n" for i in range(12)))
+
+        atual = os.getcwd()
+        os.chdir(self.diretorio.name)
+        try:
+            for caminho in (pasta, os.path.join(pasta, "*.csv")):
+                with self.subTest(caminho=caminho):
+                    saida = io.StringIO()
+                    with contextlib.redirect_stdout(saida):
+                        main(caminho, formatos=('json',), verbose=False)
+                    self.assertEqual(saida.getvalue(), "")
+                    with open("resultados_analise_spotify.json", encoding='utf-8') as f:
+                        self.assertAlmostEqual(json.load(f)["colunas"]["track_popularity"]["média"], 5.5)
+                    os.remove("resultados_analise_spotify.json")
+        finally:
+            os.chdir(atual)
+
+    # ---------- Checkpoints ----------
+
+    def test_checkpoint_resumes_stages(self):
+        entrada = [os.path.join(self.diretorio.name, "2025-10-01.csv")]
+        pasta = os.path.join(self.diretorio.name, "ck")
+        chamadas = []
+
+        def calcular():
+            chamadas.append(1)
+            return {"média": 15.0}
+
+        checkpoint = Checkpoint(pasta, entrada)
+        self.assertEqual(_etapa(checkpoint, "metricas:x", calcular), {"média": 15.0})
+        _etapa(checkpoint, "numericas", lambda: {"x": [1.0, 2.5]}, parametros=["x"], formato='colunas')
+
+        retomado = Checkpoint(pasta, entrada)
+        self.assertEqual(_etapa(retomado, "metricas:x", calcular), {"média": 15.0})
+        self.assertEqual(len(chamadas), 1)
+        self.assertEqual(list(retomado.carregar("numericas")["x"]), [1.0, 2.5])
+        self.assertFalse(retomado.concluida("numericas", parametros=["x", "y"]))
+
+    def test_checkpoint_invalidated_when_input_changes(self):
+        entrada = os.path.join(self.diretorio.name, "2025-10-01.csv")
+        pasta = os.path.join(self.diretorio.name, "ck")
+        Checkpoint(pasta, [entrada]).salvar("covariancias", [])
+
+        with open(entrada, 'a', encoding='utf-8') as f:
+            f.write("e,50\n")
+        checkpoint = Checkpoint(pasta, [entrada])
+        self.assertFalse(checkpoint.concluida("covariancias"))
+        self.assertEqual(sorted(os.listdir(checkpoint.diretorio)), ["manifesto.json"])
+
+
+class TestRelatorio(unittest.TestCase):
+
+    def setUp(self):
+        self.resultados = {
+            "track_popularity": {
+                "média": 52.3562, "moda": [0.0], "total amostras": 3,
+                "frequência absoluta (top5)": {0.0: 2, 62.0: 1},
+            }
+        }
+        self.covariancias = [
+            {"coluna_a": "a<b", "coluna_b": "c", "covariancia": -1.5, "pearson": -0.2, "spearman": -0.1}
+        ]
+
+    def test_unique_count_exact_from_frequency(self):
+        # 5000 valores distintos: o HLL (erro de ~1.6%) dificilmente acerta o número exato
+        stats = Statistics({"x": [float(i) for i in range(5000)] * 2})
+        self.assertEqual(analisar_coluna(stats, "x", verbose=False)["valores únicos"], 5000)
+        with mock.patch.object(Statistics, 'absolute_frequency', side_effect=MemoryError):
+            estimativa = analisar_coluna(stats, "x", verbose=False)["valores únicos"]
+        self.assertEqual(estimativa, stats.cardinality("x", method='hll'))
+
+    # ---------- Formatos ----------
+
+    def test_render_txt(self):
+        texto = renderizar_relatorio(self.resultados, self.covariancias, 'txt')
+        self.assertIn("COLUNA: track_popularity", texto)
+        self.assertIn("  MÉDIA                    : 52.3562\n", texto)
+        self.assertIn("→ Relação NEGATIVA", texto)
+        self.assertTrue(texto.rstrip().endswith("="*90))
+
+    def test_render_json_csv_html(self):
+        dados = json.loads(renderizar_relatorio(self.resultados, self.covariancias, 'json'))
+        self.assertEqual(dados["colunas"]["track_popularity"]["média"], 52.3562)
+        self.assertEqual(dados["covariancias"][0]["pearson"], -0.2)
+
+        linhas = renderizar_relatorio(self.resultados, self.covariancias, 'csv').splitlines()
+        self.assertEqual(linhas[0], "secao,coluna,metrica,valor")
+        self.assertIn("coluna,track_popularity,frequência absoluta (top5)[62.0],1", linhas)
+        self.assertIn("covariancia,a<b x c,covariancia,-1.5", linhas)
+
+        pagina = renderizar_relatorio(self.resultados, self.covariancias, 'html')
+        self.assertIn("a&lt;b", pagina)
+        self.assertNotIn("<td>a<b</td>", pagina)
+
+        with self.assertRaises(ValueError):
+            renderizar_relatorio(self.resultados, self.covariancias, 'pdf')
+
+    def test_generate_in_background(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            nome = os.path.join(diretorio, "relatorio.json")
+            thread = gerar_relatorio(self.resultados, self.covariancias, nome, formato='json',
+                                     em_segundo_plano=True, verbose=False)
+            thread.join()
+            with open(nome, encoding='utf-8') as f:
+                self.assertIn("track_popularity", json.load(f)["colunas"])
+
+
+class TestCLI(unittest.TestCase):
+
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.arquivo = os.path.join(self.diretorio.name, "dados.csv")
+        with open(self.arquivo, 'w', encoding='utf-8') as f:
+            f.write("track_id,track_popularity,artist_followers\na,10,100\nb,20,300\nc,,200\nd,40,400\n")
+        self.cache = os.path.join(self.diretorio.name, "ck")
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def executar(self, *argumentos):
+        saida, erros = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(saida), contextlib.redirect_stderr(erros):
+            codigo = dende_statistics.main(['analyze', self.arquivo, '--cache-dir', self.cache, *argumentos])
+        return codigo, saida.getvalue(), erros.getvalue()
+
+    def test_analyze_json_uses_cache(self):
+        codigo, saida, erros = self.executar('--metrics', 'mean', 'median', '--format', 'json', '--timing')
+        self.assertEqual(codigo, 0)
+        self.assertIn("carregamento (csv)", erros)
+        resultados = json.loads(saida)
+        self.assertEqual(sorted(resultados), ["artist_followers", "track_popularity"])
+        self.assertAlmostEqual(resultados["track_popularity"]["mean"], 70 / 3)
+        self.assertEqual(resultados["artist_followers"]["median"], 250.0)
+
+        codigo, saida, erros = self.executar('--columns', 'artist_followers', '--timing')
+        self.assertEqual(codigo, 0)
+        self.assertIn("carregamento (cache)", erros)
+        self.assertIn("  mean            : 250.0000", saida)
+
+    def test_cache_per_input(self):
+        primeiro, segundo = self.arquivo, os.path.join(self.diretorio.name, "outro.csv")
+        with open(segundo, 'w', encoding='utf-8') as f:
+            f.write("track_id,artist_followers\na,1\nb,3\n")
+        for arquivo in (primeiro, segundo):
+            self.arquivo = arquivo
+            self.assertEqual(self.executar('--timing')[0], 0)
+
+        for arquivo, media in ((primeiro, 250.0), (segundo, 2.0)):
+            self.arquivo = arquivo
+            codigo, saida, erros = self.executar('--columns', 'artist_followers', '--format', 'json', '--timing')
+            self.assertEqual(codigo, 0)
+            self.assertIn("carregamento (cache)", erros)
+            self.assertEqual(json.loads(saida)["artist_followers"]["mean"], media)
+
+    def test_analyze_single_partition_directory(self):
+        for caminho in (self.diretorio.name, os.path.join(self.diretorio.name, "*.csv")):
+            with self.subTest(caminho=caminho):
+                self.arquivo = caminho
+                codigo, saida, _ = self.executar('--columns', 'artist_followers', '--format', 'json', '--no-cache')
+                self.assertEqual(codigo, 0)
+                self.assertEqual(json.loads(saida)["artist_followers"]["mean"], 250.0)
+
+    def test_analyze_errors(self):
+        codigo, _, erros = self.executar('--columns', 'foo')
+        self.assertEqual(codigo, 1)
+        self.assertIn("Coluna 'foo' não encontrada", erros)
+
+        self.arquivo = os.path.join(self.diretorio.name, "nada.csv")
+        codigo, _, erros = self.executar()
+        self.assertEqual(codigo, 1)
+        self.assertIn("Arquivo não encontrado", erros)
+
+        os.mkdir(os.path.join(self.diretorio.name, "pasta.csv"))
+        self.arquivo = os.path.join(self.diretorio.name, "pasta*.csv")  # o padrão só acha um diretório
+        codigo, _, erros = self.executar('--no-cache')
+        self.assertEqual(codigo, 1)
+        self.assertIn("Erro ao ler", erros)
+
+
+def gerar_coluna(aleatorio, n, tipo):
+    """Gera uma coluna aleatória de um dos tipos usados nos testes diferenciais."""
+    if tipo == 'uniforme':
+        return [aleatorio.uniform(-1000, 1000) for _ in range(n)]
+    if tipo == 'inteiros':  # muitos empates
+        return [aleatorio.randint(0, 20) for _ in range(n)]
+    if tipo == 'assimetrica':  # cauda longa, como seguidores e popularidade
+        return [aleatorio.paretovariate(1.2) * 100 for _ in range(n)]
+    if tipo == 'grande_magnitude':  # valores ~10^12 com pouca variação
+        return [1e12 + aleatorio.uniform(0, 1000) for _ in range(n)]
+    if tipo == 'categorica':  # frequências do tipo Zipf, com nulos
+        niveis = [f"g{i}" for i in range(max(1, n // 4))] + [None]
+        pesos = [1 / (i + 1) for i in range(len(niveis))]
+        return aleatorio.choices(niveis, weights=pesos, k=n)
+    raise ValueError(tipo)
+
+
+def media_exata(valores):
+    return Fraction(sum(Fraction(v) for v in valores), len(valores))
+
+
+def quantil_por_peso(valores, pesos, alvo):
+    """Definição direta: valor em que o peso acumulado (exato) chega a `alvo`; média dos vizinhos na fronteira."""
+    pares = sorted((v, Fraction(p)) for v, p in zip(valores, pesos) if p > 0)
+    acumulado = 0
+    for i, (valor, peso) in enumerate(pares):
+        acumulado += peso
+        if acumulado > alvo:
+            return valor, False
+        if acumulado == alvo and i + 1 < len(pares):
+            return (valor + pares[i + 1][0]) / 2, True
+    return pares[-1][0], False
+
+
+def quartis_por_peso(valores, pesos):
+    total = sum(Fraction(p) for p in pesos)
+    mediana, fronteira = quantil_por_peso(valores, pesos, total / 2)
+    metade = total / 2 - (0 if fronteira else total / sum(1 for p in pesos if p > 0) / 2)
+    return {"Q1": quantil_por_peso(valores, pesos, metade / 2)[0], "Q2": mediana,
+            "Q3": quantil_por_peso(valores, pesos, total - metade / 2)[0]}
+
+
+def co_momento_exato(a, b):
+    media_a, media_b = media_exata(a), media_exata(b)
+    return sum((Fraction(x) - media_a) * (Fraction(y) - media_b) for x, y in zip(a, b)) / len(a)
+
+
+class TestDiferencial(unittest.TestCase):
+    """
+    Compara cada caminho acelerado com a implementação de referência.
+
+    Os datasets são gerados aleatoriamente (com sementes fixas) em vários
+    tamanhos e formatos. A referência é o caminho em Python puro do próprio
+    Statistics (backend='python') e, para os momentos, o valor exato calculado
+    com `fractions`. Tolerâncias (erro relativo):
+
+    - média, variância e covariância no modo 'fast': 1e-6 contra o valor
+      exato (1e-9 fora das colunas de grande magnitude);
+    - os mesmos momentos no modo 'stable': 1e-12 contra o valor exato;
+    - NumPy contra Python puro em mediana, quartis, postos, estatísticas
+      robustas, frequências e tabelas cruzadas: igualdade exata;
+    - correlações (Pearson e Spearman): 1e-9 entre os backends;
+    - HyperLogLog: 4 erros padrão (4 * 1.04 / sqrt(2 ** precision)).
+    """
+
+    TAMANHOS = (2, 3, 17, 256, 3001)
+    TIPOS = ('uniforme', 'inteiros', 'assimetrica', 'grande_magnitude')
+
+    def setUp(self):
+        self.backends = ['python'] + (['numpy'] if dende_kernels.disponivel() else [])
+        # Blocos pequenos para que os kernels paralelos sejam exercitados com poucos dados
+        bloco = mock.patch.object(dende_kernels, 'TAMANHO_MINIMO_BLOCO', 16)
+        bloco.start()
+        self.addCleanup(bloco.stop)
+
+    def casos(self):
+        for n in self.TAMANHOS:
+            for tipo in self.TIPOS:
+                aleatorio = random.Random(f"{tipo}-{n}")
+                yield n, tipo, {"x": gerar_coluna(aleatorio, n, tipo), "y": gerar_coluna(aleatorio, n, tipo),
+                                "c": gerar_coluna(aleatorio, n, 'categorica'),
+                                "d": gerar_coluna(aleatorio, n, 'categorica')}
+
+    def assertRelativo(self, obtido, esperado, tolerancia, escala=None):
+        escala = abs(esperado) if escala is None else escala
+        self.assertLessEqual(abs(obtido - esperado), tolerancia * max(escala, 1e-300),
+                             f"{obtido!r} != {esperado!r} (tolerância {tolerancia})")
+
+    def test_moments_match_exact(self):
+        for n, tipo, dados in self.casos():
+            media = media_exata(dados["x"])
+            variancia = co_momento_exato(dados["x"], dados["x"])
+            covariancia = co_momento_exato(dados["x"], dados["y"])
+            escala_cov = float(variancia * co_momento_exato(dados["y"], dados["y"])) ** 0.5
+            for backend in self.backends:
+                for precisao in ('fast', 'stable'):
+                    tolerancia = 1e-12 if precisao == 'stable' else 1e-6 if tipo == 'grande_magnitude' else 1e-9
+                    with self.subTest(n=n, tipo=tipo, backend=backend, precisao=precisao):
+                        stats = Statistics(dados, backend=backend, threads=4, precision=precisao)
+                        self.assertRelativo(stats.mean("x"), float(media), tolerancia)
+                        self.assertRelativo(stats.variance("x"), float(variancia), tolerancia)
+                        self.assertRelativo(stats.covariance("x", "y"), float(covariancia), tolerancia, escala_cov)
+
+    def test_order_statistics_match_reference(self):
+        for n, tipo, dados in self.casos():
+            referencia = Statistics(dados, backend='python')
+            ordenados = sorted(dados["x"])
+            for backend in self.backends:
+                with self.subTest(n=n, tipo=tipo, backend=backend):
+                    stats = Statistics(dados, backend=backend, threads=4)
+                    self.assertEqual(list(stats.sorted_values("x")), ordenados)
+                    self.assertEqual(stats.median("x"), statistics.median(dados["x"]))
+                    self.assertEqual(stats.quartiles("x"), referencia.quartiles("x"))
+                    self.assertEqual(stats.rank("x"), referencia.rank("x"))
+                    self.assertEqual(stats.mad("x"), referencia.mad("x"))
+                    self.assertEqual(stats.trimmed_mean("x", 0.2), referencia.trimmed_mean("x", 0.2))
+                    self.assertEqual(stats.iqr_outliers("x"), referencia.iqr_outliers("x"))
+                    for metodo in ('pearson', 'spearman', 'kendall'):
+                        self.assertAlmostEqual(stats.correlation("x", "y", metodo),
+                                               referencia.correlation("x", "y", metodo), delta=1e-9)
+
+    def test_views_match_materialized(self):
+        for n, tipo, dados in self.casos():
+            aleatorio = random.Random(n)
+            mascara = [aleatorio.random() < 0.5 for _ in range(n)]
+            mascara[0] = True
+            linhas = [i for i in range(n) if mascara[i]]
+            copia = {coluna: [valores[i] for i in linhas] for coluna, valores in dados.items()}
+            referencia = Statistics(copia, backend='python')
+            for backend in self.backends:
+                with self.subTest(n=n, tipo=tipo, backend=backend):
+                    stats = Statistics(dados, backend=backend)
+                    stats.variance("x")  # a visão reaproveita o buffer da origem
+                    visao = stats.view(mascara)
+                    for coluna in dados:
+                        self.assertEqual(list(visao.dataset[coluna]), copia[coluna])
+                    self.assertAlmostEqual(visao.mean("x"), referencia.mean("x"), delta=1e-9 * abs(referencia.mean("x")))
+                    self.assertAlmostEqual(visao.variance("x"), referencia.variance("x"),
+                                           delta=1e-6 * max(referencia.variance("x"), 1.0))
+                    self.assertEqual(visao.median("x"), referencia.median("x"))
+                    self.assertEqual(visao.absolute_frequency("c"), referencia.absolute_frequency("c"))
+
+                    subvisao = visao.view(slice(0, None, 2))
+                    self.assertEqual(list(subvisao.dataset["x"]), copia["x"][::2])
+
+    def test_numeric_columns_with_nulls(self):
+        for n, tipo, dados in self.casos():
+            aleatorio = random.Random(-n)
+            com_nulos = [None if aleatorio.random() < 0.1 else v for v in dados["x"]]
+            com_nulos[0] = dados["x"][0]
+            limpa, removidos = limpar_coluna_numerica({"x": com_nulos}, "x")
+            preenchidos = [v for v in com_nulos if v is not None]
+            self.assertEqual(removidos, n - len(preenchidos))
+            for backend in self.backends:
+                with self.subTest(n=n, tipo=tipo, backend=backend):
+                    stats = Statistics({"x": limpa}, backend=backend, precision='stable')
+                    self.assertRelativo(stats.mean("x"), float(media_exata(preenchidos)), 1e-12)
+                    self.assertEqual(stats.median("x"), statistics.median(preenchidos))
+
+    def test_categorical_counts_match_reference(self):
+        for n, tipo, dados in self.casos():
+            esperado = Counter(dados["c"])
+            conjunta = Counter(zip(dados["c"], dados["d"]))
+            for backend in self.backends:
+                with self.subTest(n=n, tipo=tipo, backend=backend):
+                    stats = Statistics(dados, backend=backend)
+                    self.assertEqual(stats.absolute_frequency("c"), esperado)
+                    self.assertEqual(stats.cardinality("c"), len(esperado))
+                    self.assertEqual(stats.joint_frequency(["c", "d"]), conjunta)
+                    tabela = stats.crosstab("c", "d", sparse=True)
+                    self.assertEqual(tabela["counts"], conjunta)
+                    self.assertEqual(tabela["total"], n)
+                    self.assertEqual(dict(zip(tabela["rows"], tabela["row_totals"])), esperado)
+                    self.assertEqual(stats.crosstab(["c", "x"], "d"),
+                                     Statistics(dados, backend='python').crosstab(["c", "x"], "d"))
+
+    def test_weighted_match_repeated_rows(self):
+        for n, tipo, dados in self.casos():
+            if n > 256:  # a referência repete as linhas
+                continue
+            aleatorio = random.Random(n * 7)
+            pesos = [aleatorio.choice((0, 1, 1, 2, 5)) for _ in range(n)]
+            pesos[0] = 1
+            expandido = {coluna: [v for v, p in zip(valores, pesos) for _ in range(p)]
+                         for coluna, valores in dados.items()}
+            referencia = Statistics(expandido, backend='python', precision='stable')
+            tolerancia = 1e-6 if tipo == 'grande_magnitude' else 1e-9
+            escala = referencia.variance("x") ** 0.5 * referencia.variance("y") ** 0.5
+            for backend in self.backends:
+                for precisao in ('fast', 'stable'):
+                    with self.subTest(n=n, tipo=tipo, backend=backend, precisao=precisao):
+                        stats = Statistics(dict(dados, peso=array('d', pesos)), backend=backend,
+                                           threads=4, precision=precisao)
+                        self.assertRelativo(stats.mean("x", weights="peso"), referencia.mean("x"), tolerancia)
+                        self.assertRelativo(stats.variance("x", weights="peso"), referencia.variance("x"),
+                                            tolerancia, referencia.variance("x") + 1e-300)
+                        self.assertRelativo(stats.covariance("x", "y", weights="peso"),
+                                            referencia.covariance("x", "y"), tolerancia, escala)
+                        self.assertEqual(stats.median("x", weights="peso"), referencia.median("x"))
+                        self.assertEqual(stats.quartiles("x", weights=[3] * n), stats.quartiles("x"))
+                        self.assertEqual(stats.absolute_frequency("c", weights="peso"),
+                                         Counter(expandido["c"]))
+
+    def test_fractional_weights_quantiles(self):
+        for n, tipo, dados in self.casos():
+            aleatorio = random.Random(n * 11)
+            pesos = [0.0 if aleatorio.random() < 0.1 else aleatorio.uniform(0.01, 3) for _ in range(n)]
+            pesos[0] = 0.25
+            sem_pesos = Statistics(dados, backend='python')
+            for backend in self.backends:
+                with self.subTest(n=n, tipo=tipo, backend=backend):
+                    stats = Statistics(dados, backend=backend)
+                    self.assertEqual(stats.median("x", weights=pesos), quantil_por_peso(dados["x"], pesos, sum(
+                        Fraction(p) for p in pesos) / 2)[0])
+                    self.assertEqual(stats.quartiles("x", weights=pesos), quartis_por_peso(dados["x"], pesos))
+                    for peso in (0.1, 1 / 3, 0.7, 2.5):  # pesos iguais, de qualquer tamanho
+                        self.assertEqual(stats.median("x", weights=[peso] * n), sem_pesos.median("x"))
+                        self.assertEqual(stats.quartiles("x", weights=[peso] * n), sem_pesos.quartiles("x"))
+
+    def test_hll_within_error_bound(self):
+        aleatorio = random.Random(7)
+        for n in (10, 1000, 50_000):
+            valores = [aleatorio.randrange(n) for _ in range(n)]
+            exata = len(set(valores))
+            for precisao in (10, 12, 14):
+                with self.subTest(n=n, precisao=precisao):
+                    estimada = Statistics({"v": valores}).cardinality("v", method='hll', precision=precisao)
+                    limite = 4 * 1.04 / (2 ** precisao) ** 0.5
+                    self.assertLessEqual(abs(estimada - exata), max(1, limite * exata))
+
+    def test_sampling_properties(self):
+        for n, tipo, dados in self.casos():
+            stats = Statistics(dados, backend='python')
+            for tamanho in (1, n // 2, n + 5):
+                with self.subTest(n=n, tipo=tipo, tamanho=tamanho):
+                    amostra = stats.sample(tamanho, seed=3)
+                    linhas = list(amostra._rows)
+                    self.assertEqual(len(linhas), min(tamanho, n))
+                    self.assertEqual(linhas, sorted(set(linhas)))
+                    self.assertEqual(list(amostra.dataset["x"]), [dados["x"][i] for i in linhas])
+                    self.assertEqual(list(stats.sample(tamanho, seed=3)._rows), linhas)
+                    self.assertEqual(amostra.population_size, n)
+
+                    estratificada = stats.sample(tamanho, strata="c", seed=3)
+                    self.assertEqual(len(estratificada.dataset["c"]), min(tamanho, n))
+                    sorteadas = Counter(estratificada.dataset["c"])
+                    for estrato, total in Counter(dados["c"]).items():  # cota proporcional, arredondada
+                        self.assertLess(abs(sorteadas[estrato] - min(tamanho, n) * total / n), 1)
+
+    @unittest.skipUnless(os.environ.get("DENDE_TESTES_ESCALA"),
+                         "defina DENDE_TESTES_ESCALA=1 para medir as curvas de escalabilidade")
+    def test_scaling_is_not_superlinear(self):
+        # Tamanhos espaçados (16x) e 5 repetições, para que o ruído de tempo não mude a inclinação
+        curvas = benchmarks.bench_escalabilidade(tamanhos=(10_000, 40_000, 160_000), repeticoes=5, verbose=False)
+        superlineares = [(c['caso'], c['backend'], c['superlinear']) for c in curvas if c['superlinear']]
+        self.assertEqual(superlineares, [])
+
 
 if __name__ == "__main__":
     unittest.main()